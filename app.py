@@ -6,10 +6,11 @@ PriceHunter - מערכת השוואת מחירים
 """
 
 import logging
+import secrets
 import sys
 import os
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, make_response
 
 # הוספת נתיב הפרויקט
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -17,7 +18,18 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # ייבוא המודולים שלנו
 try:
     from config import Config
-    from core.price_finder import PriceFinder
+    from core.result_aggregator import paginate_products, validate_page
+    from core.admission import CapacityExceeded
+    from core.runtime_config import get_runtime_config
+    from core.result_cache import compute_etag
+    from web.http_cache import (apply_cache_headers, cache_validators, is_not_modified,
+                                not_modified_response, results_validators, variant_etag)
+    from web.compression import init_compression
+    from web.assets import init_assets
+    from web.image_proxy import init_image_proxy
+    from web.throttling import capacity_response, init_rate_limit
+    from web.services import init_services
+    from web.api import api
 except ImportError as e:
     print(f"❌ שגיאת ייבוא: {e}")
     print("💡 ודא שהקבצים config.py ו-core/price_finder.py קיימים")
@@ -34,35 +46,44 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.config.from_object(Config)
 app.config['JSON_AS_ASCII'] = False  # תמיכה בעברית
+if not app.config.get('SECRET_KEY'):
+    logger.warning("⚠️  PRICEHUNTER_SECRET_KEY לא מוגדר - נוצר מפתח אקראי")
+    app.config['SECRET_KEY'] = secrets.token_hex(32)
 
-# אתחול מנוע החיפוש
-logger.info("🔍 מאתחל PriceFinder...")
-try:
-    price_finder = PriceFinder()
-    logger.info(f"✅ PriceFinder מוכן עם {len(price_finder.scrapers)} חנויות")
-except Exception as e:
-    logger.error(f"❌ שגיאה באתחול PriceFinder: {e}")
-    price_finder = None
+# דחיסת תגובות וקבצים סטטיים עם טביעת אצבע (python -m web.assets)
+init_compression(app)
+init_assets(app)
+init_image_proxy(app)
+
+# הגבלת קצב חיפושים לכל לקוח
+init_rate_limit(app)
+
+# מנוע החיפוש ועבודות החיפוש - נוצרים בבקשה הראשונה, לא בזמן import
+services = init_services(app)
+
+# נקודות ה-API המשותפות עם web/app.py (חיפוש מרובה, עבודות, מעקב, ייצוא...)
+app.register_blueprint(api)
 
 # ===== נתיבי האפליקציה =====
 
 @app.route('/')
 def home():
     """עמוד הבית"""
+    price_finder = services.price_finder
     logger.info("👤 משתמש נכנס לעמוד הבית")
     
-    # נתוני סטטיסטיקה לעמוד הבית
-    stats = {
-        'active_stores': len(price_finder.scrapers) if price_finder else 0,
-        'total_searches': 0,  # נוסיף מעקב בעתיד
-        'average_savings': 15  # נוסיף חישוב אמיתי
-    }
+    # נתוני סטטיסטיקה לעמוד הבית (מהזיכרון - בלי שאילתה ל-DB)
+    if price_finder:
+        stats = price_finder.get_stats()
+    else:
+        stats = {'active_stores': 0, 'total_searches': 0, 'average_savings': 0}
     
     return render_template('home.html', stats=stats)
 
 @app.route('/search')
 def search():
     """עמוד תוצאות החיפוש"""
+    price_finder = services.price_finder
     query = request.args.get('q', '').strip()
     
     if not query:
@@ -75,6 +96,13 @@ def search():
     
     logger.info(f"🔍 חיפוש: '{query}'")
     
+    # אם התוצאות כבר במטמון - אפשר לענות 304 בלי לחפש בכלל
+    cache_info = price_finder.peek_cached(query, max_results_per_store=5)
+    if cache_info:
+        etag, max_age = cache_validators(cache_info)
+        if is_not_modified(variant_etag(etag, 'html')):
+            return not_modified_response(variant_etag(etag, 'html'), max_age)
+    
     try:
         # ביצוע החיפוש
         results = price_finder.search_all_stores(query, max_results_per_store=5)
@@ -88,8 +116,13 @@ def search():
             'stores_count': len(results.get('stores_searched', []))
         }
         
-        return render_template('search_results.html', **search_data)
+        etag, max_age = results_validators(results)
+        response = make_response(render_template('search_results.html', **search_data))
+        return apply_cache_headers(response, variant_etag(etag, 'html'), max_age)
         
+    except CapacityExceeded as e:
+        logger.warning(f"🚦 אין מקום לסריקה עבור: '{query}'")
+        return capacity_response(e)
     except Exception as e:
         logger.error(f"❌ שגיאה בחיפוש '{query}': {e}")
         return render_template('error.html',
@@ -97,28 +130,72 @@ def search():
                              message=f"לא הצלחנו לחפש את '{query}'",
                              details=str(e))
 
-@app.route('/api/search', methods=['POST'])
+@app.route('/api/search', methods=['GET', 'POST'])
 def api_search():
-    """API לחיפוש - עבור JavaScript"""
+    """API לחיפוש - עבור JavaScript (GET ניתן לשמירה במטמון HTTP)"""
+    price_finder = services.price_finder
     if not price_finder:
         return jsonify({'error': 'מערכת החיפוש לא זמינה'}), 503
     
-    data = request.get_json()
+    if request.method == 'POST':
+        data = request.get_json()
+    else:
+        data = {
+            'query': request.args.get('q', ''),
+            'max_results': request.args.get('max_results', 5, type=int),
+            'rank_by': request.args.get('rank_by', Config.DEFAULT_RANK_KEY),
+            'cursor': request.args.get('cursor'),
+            'page_size': request.args.get('page_size', type=int),
+            'mode': request.args.get('mode', 'live')
+        }
+    
     if not data or not data.get('query'):
         return jsonify({'error': 'חסרה מחרוזת חיפוש'}), 400
     
     query = data['query'].strip()
     max_results = data.get('max_results', 5)
+    rank_by = data.get('rank_by', Config.DEFAULT_RANK_KEY)
+    mode = data.get('mode', 'live')  # live / index
+    cursor, page_size = data.get('cursor'), data.get('page_size')
+    if cursor or page_size is not None:
+        try:
+            page_size = validate_page(cursor, page_size)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    page_variant = (cursor, page_size)
+    
+    # בקשה מותנית על תוצאות שכבר במטמון - 304 בלי לגעת במנוע החיפוש
+    if mode != 'index':
+        cache_info = price_finder.peek_cached(query, max_results, rank_by)
+        if cache_info:
+            etag, max_age = cache_validators(cache_info)
+            if is_not_modified(variant_etag(etag, *page_variant)):
+                return not_modified_response(variant_etag(etag, *page_variant), max_age)
     
     try:
-        logger.info(f"🔍 API חיפוש: '{query}'")
-        results = price_finder.search_all_stores(query, max_results)
+        logger.info(f"🔍 API חיפוש: '{query}' (mode={mode})")
+        if mode == 'index':
+            results = price_finder.search_catalog(query, rank_by=rank_by)
+        else:
+            results = price_finder.search_all_stores(query, max_results, rank_by)
         
-        return jsonify({
+        # חיתוך לעמוד לפי cursor
+        if cursor or page_size:
+            page = paginate_products(results['products'], rank_by, cursor, page_size)
+            results['products'] = page['items']
+            results['next_cursor'] = page['next_cursor']
+        
+        etag, max_age = results_validators(results)
+        response = jsonify({
             'success': True,
             'data': results
         })
+        return apply_cache_headers(response, variant_etag(etag, *page_variant), max_age)
         
+    except CapacityExceeded as e:
+        return capacity_response(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"❌ API שגיאה: {e}")
         return jsonify({'error': 'שגיאה בביצוע החיפוש'}), 500
@@ -126,15 +203,21 @@ def api_search():
 @app.route('/api/stores')
 def api_stores():
     """מידע על החנויות הזמינות"""
+    price_finder = services.price_finder
     if not price_finder:
         return jsonify({'error': 'מערכת לא זמינה'}), 503
     
     try:
         stores_status = price_finder.get_store_status()
-        return jsonify({
+        etag = compute_etag(stores_status)
+        if is_not_modified(etag):
+            return not_modified_response(etag, Config.STORE_STATUS_TTL)
+        
+        response = jsonify({
             'success': True,
             'stores': stores_status
         })
+        return apply_cache_headers(response, etag, Config.STORE_STATUS_TTL)
     except Exception as e:
         logger.error(f"❌ שגיאה בקבלת סטטוס חנויות: {e}")
         return jsonify({'error': 'שגיאה בקבלת מידע חנויות'}), 500
@@ -142,12 +225,16 @@ def api_stores():
 @app.route('/health')
 def health_check():
     """בדיקת בריאות המערכת"""
+    price_finder = services.price_finder
     status = {
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'version': Config.VERSION,
         'price_finder_active': price_finder is not None,
-        'active_scrapers': len(price_finder.scrapers) if price_finder else 0
+        'active_scrapers': len(price_finder.scrapers) if price_finder else 0,
+        'admission': price_finder.admission.stats() if price_finder else None,
+        'scheduler': price_finder.scheduler.stats() if price_finder else None,
+        'config_version': get_runtime_config().version if price_finder else None
     }
     
     return jsonify(status)
@@ -187,6 +274,7 @@ def service_unavailable(error):
 # ===== הפעלת השרת =====
 
 if __name__ == '__main__':
+    price_finder = services.price_finder
     logger.info(f"""
 🚀 PriceHunter מתחיל...
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
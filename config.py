@@ -29,6 +29,15 @@ class Config:
     # הגדרות מטמון
     CACHE_DURATION = 300  # 5 דקות
     ENABLE_CACHE = True
+    CACHE_MAX_ENTRIES = 1000  # מספר חיפושים שנשמרים בזיכרון
+    CACHE_STALE_GRACE = 600  # שניות אחרי התפוגה שבהן תוצאה ישנה מוגשת מיד ומתרעננת ברקע
+    STORE_STATUS_TTL = 60  # שניות בין בדיקות זמינות של החנויות
+    
+    # הגדרות דירוג תוצאות
+    DEFAULT_RANK_KEY = 'price'  # price / price_per_unit / availability_first
+    MAX_RANKED_RESULTS = 100  # גודל ערימת ה-top-k
+    RESULTS_PAGE_SIZE = 20
+    RESULTS_PAGE_SIZE_MAX = 100  # הגבול העליון ל-page_size מבקשה
     
     # חנויות פעילות
     ACTIVE_STORES = {
@@ -37,31 +46,60 @@ class Config:
             'base_url': 'https://ksp.co.il',
             'search_url': 'https://ksp.co.il/web/cat/573..2',
             'logo': 'K',
-            'enabled': True
+            'enabled': True,
+            'scraper': 'scrapers.ksp_scraper:KSPScraper',
+            'categories': {},  # קטגוריה -> נתיב הרשימה שלה (בלי נתיב - רשימת תוצאות החיפוש)
+            'engine': 'selenium',
+            'concurrency': 2,  # חיפושים במקביל מול החנות
+            'priority': 10
         },
         'bug': {
             'name': 'Bug',
             'base_url': 'https://www.bug.co.il',
             'search_url': 'https://www.bug.co.il/search',
             'logo': 'B', 
-            'enabled': True
+            'enabled': True,
+            'scraper': 'scrapers.bug_scraper:BugScraper',
+            'engine': 'http',
+            'concurrency': 4,  # חיפושים במקביל מול החנות
+            'priority': 20
         },
         'zap': {
             'name': 'זאפ',
             'base_url': 'https://www.zap.co.il',
             'search_url': 'https://www.zap.co.il/search.aspx',
             'logo': 'Z',
-            'enabled': True
+            'enabled': True,
+            'scraper': 'scrapers.zap_scraper:ZapScraper',
+            'engine': 'http',
+            'concurrency': 4,  # חיפושים במקביל מול החנות
+            'priority': 30
         },
         'ivory': {
             'name': 'Ivory',
             'base_url': 'https://www.ivory.co.il',
             'search_url': 'https://www.ivory.co.il/catalog.php',
             'logo': 'I',
-            'enabled': True
+            'enabled': True,
+            'scraper': 'scrapers.ivory_scraper:IvoryScraper',
+            'engine': 'http',
+            'concurrency': 4,  # חיפושים במקביל מול החנות
+            'priority': 20
         }
     }
     
+    # ברירות מחדל לכל חנות (אפשר לדרוס ב-ACTIVE_STORES)
+    # engine: http (requests) / selenium (Chrome) | priority: נמוך = נסרק קודם
+    STORE_DEFAULTS = {
+        'engine': 'http',
+        'concurrency': 2,
+        'timeout': 30,  # שניות - חנות איטית מזה נחשבת כשלון בחיפוש הנוכחי
+        'priority': 100
+    }
+    
+    # scrapers מחבילות חיצוניות (entry points בקבוצה הזו, שם = מזהה החנות)
+    SCRAPER_ENTRY_POINT_GROUP = 'pricehunter.scrapers'
+    
     # קטגוריות מוצרים
     ELECTRONICS_CATEGORIES = [
         'smartphones',
@@ -75,17 +113,138 @@ class Config:
         'audio'
     ]
     
+    # סריקת קטגוריות (python -m core.category_crawler) - לטבלת products ב-DATABASE_PATH
+    CRAWL_CONCURRENCY = None  # עמודים במקביל בכל חנות (None = ה-concurrency של החנות)
+    CRAWL_MAX_PAGES = 200  # גבול עמודים לקטגוריה בסבב אחד
+    CRAWL_PAGE_DELAY = 1.0  # שניות בין קבוצות עמודים - לא להעמיס על החנות
+    
+    # תוספות לטבלאות של core/query_canonicalizer.py (כתיב רגיל - הקיפול אוטומטי)
+    QUERY_TRANSLITERATIONS = {}  # למשל {'מוטורולה': 'motorola'}
+    QUERY_SYNONYMS = {}  # למשל {'מקרן': 'projector'}
+    
     # הגדרות מסד נתונים
     DATABASE_PATH = 'cache.db'
     
+    # קטלוג מקומי (FTS5) - תשובה מיידית למוצרים שכבר נסרקו
+    ENABLE_CATALOG = True
+    CATALOG_MAX_AGE = 7 * 24 * 3600  # מוצרים ישנים מזה לא מוצגים
+    CATALOG_REFRESH_AFTER = CACHE_DURATION  # רענון ברקע אם השאילתה נסרקה לפני יותר מזה
+    
+    # היסטוריית מחירים
+    ENABLE_PRICE_HISTORY = True
+    PRICE_HISTORY_BATCH_SIZE = 500  # כתיבה ל-DB כל 500 תצפיות...
+    PRICE_HISTORY_FLUSH_INTERVAL = 30  # ...או כל 30 שניות
+    PRICE_HISTORY_RAW_DAYS = 30  # תצפיות ישנות מזה נדחסות לשורה יומית
+    PRICE_HISTORY_SERIES_CACHE = 100000  # מספר מזהי סדרות שנשמרים בזיכרון
+    
+    # סטטיסטיקות חיפוש
+    ENABLE_STATS = True
+    STATS_FLUSH_EVERY = 50  # כתיבה ל-DB כל 50 חיפושים...
+    STATS_FLUSH_INTERVAL = 60  # ...או כל דקה
+    STATS_SNAPSHOT_TTL = 5  # הסכומים המוצגים נקראים מה-DB (משותף לכל ה-workers) לכל היותר כל 5 שניות
+    
+    # בקרת עומס - כל סריקה פותחת דפדפן
+    MAX_CONCURRENT_SCRAPES = 4
+    SCRAPE_QUEUE_SIZE = 16  # בקשות שמחכות למקום; מעבר לזה - 503 מיד
+    SCRAPE_QUEUE_TIMEOUT = 10  # שניות המתנה מקסימליות בתור
+    
+    # הגבלת קצב לכל לקוח (חיפושים בלבד)
+    ENABLE_RATE_LIMIT = True
+    RATE_LIMIT_PER_MINUTE = 30
+    RATE_LIMIT_BURST = 10
+    TRUST_PROXY_HEADERS = False  # True מאחורי nginx - הלקוח לפי X-Forwarded-For
+    
+    # עבודות חיפוש אסינכרוניות (/api/jobs)
+    SEARCH_JOB_WORKERS = 4  # סריקות שרצות במקביל - לא תלוי ב-workers של שרת ה-web
+    SEARCH_JOB_TTL = 300  # עבודה שאף אחד לא שאל עליה כל כך הרבה זמן נמחקת
+    SEARCH_JOB_MAX_WAIT = 25  # שניות מקסימום ל-long-poll
+    SEARCH_JOB_CLEANUP_INTERVAL = 30
+    SEARCH_JOB_SHARED_POLL = 0.5  # שניות בין בדיקות של עבודה שרצה ב-worker אחר
+    
+    # סריקה מוקדמת של שאילתות פופולריות לפני שהן פגות במטמון (core/prescraper.py)
+    ENABLE_PRESCRAPE = True
+    PRESCRAPE_TOP_QUERIES = 50
+    PRESCRAPE_INTERVAL = 30  # שניות בין סבבים
+    PRESCRAPE_LEAD_TIME = 60  # סריקה כשנשארו פחות מזה שניות לרשומה במטמון
+    PRESCRAPE_BROWSER_MINUTES_PER_HOUR = 30  # תקציב: משך סריקה × חנויות בדפדפן
+    PRESCRAPE_IDLE_SLOTS = 2  # מקומות פנויים בבקרת העומס שנדרשים כדי להתחיל סריקה
+    PRESCRAPE_HALF_LIFE = 3600  # שניות - חיפוש ישן שווה חצי
+    PRESCRAPE_MIN_SCORE = 2  # שאילתה שחיפשו רק פעם אחת לא נסרקת מראש
+    
+    # מתזמן הסריקות (core/scheduler.py) - תור עדיפויות לכל חנות
+    SCHEDULER_WEIGHTS = {'interactive': 16, 'batch': 4, 'refresh': 2, 'probe': 1}  # נתח יחסי בכל חנות
+    SCHEDULER_RESERVED_SLOTS = 1  # מקומות בכל חנות ששמורים לחיפושים של משתמשים
+    SCHEDULER_QUEUE_SIZE = 100  # משימות ממתינות לכל חנות
+    SCHEDULER_IDLE_TIMEOUT = 60  # worker בלי עבודה יוצא אחרי כך שניות
+    
+    # פרטי מוצר מעמוד המוצר (core/product_details.py) - נטענים רק לפי דרישה
+    DETAILS_TOP_K = 5  # בעמוד התוצאות - לכמה מהמוצרים הראשונים לטעון פרטים
+    DETAILS_MAX_URLS = 20  # קישורים לכל היותר בבקשה אחת
+    DETAILS_TIMEOUT = 20  # שניות מקסימום לכל הטעינות של בקשה
+    DETAILS_CACHE_TTL = 6 * 3600  # תמונה ותיאור כמעט לא משתנים - תוקף ארוך ממטמון החיפוש
+    DETAILS_CACHE_SIZE = 5000  # קישורים במטמון (הישנים נזרקים)
+    DETAILS_ERROR_TTL = 300  # עמוד שלא נטען לא נטען שוב לפני כן
+    
+    # תמונות ממוזערות (web/image_proxy.py) - דורש Pillow, בלעדיו הפניה לתמונה המקורית
+    ENABLE_IMAGE_PROXY = True
+    THUMBNAIL_DIR = 'thumbnails'
+    THUMBNAIL_CACHE_MB = 200  # גודל מקסימלי של התיקייה - התמונות הישנות נמחקות
+    THUMBNAIL_SIZES = (80, 160, 320)  # גדלים מותרים בפיקסלים (הצלע הארוכה)
+    THUMBNAIL_SIZE = 160  # 80px בתצוגה - חד גם במסך retina
+    THUMBNAIL_QUALITY = 75  # איכות WebP
+    THUMBNAIL_MAX_SOURCE_MB = 5  # תמונה מקורית גדולה מזה לא מורדת
+    THUMBNAIL_MAX_AGE = 30 * 24 * 3600  # Cache-Control - הכתובת של תמונה לא משתנה
+    THUMBNAIL_EXTRA_HOSTS = []  # שרתי תמונות (CDN) של החנויות מחוץ לדומיין שלהן
+    
+    # רשימות מעקב והתראות ירידת מחיר (core/watchlist.py)
+    ENABLE_WATCHLIST = True
+    WATCH_NOTIFIER = 'log'  # log / file / 'module:Class' (מחלקה עם send(alert))
+    WATCH_ALERTS_FILE = 'alerts.jsonl'  # ל-notifier מסוג file - שורת JSON לכל התראה
+    WATCH_MAX_PER_OWNER = 100
+    WATCH_SYNC_INTERVAL = 5  # שניות - מעקבים שנוספו ב-worker אחר
+    
+    # ייצוא מלא (python -m core.bulk_export / /api/export) - CSV, NDJSON או Parquet
+    # ה-API מחזיר את כל ה-DB - כבוי כברירת מחדל, ופועל רק עם טוקן מהסביבה
+    # (Authorization: Bearer <token>)
+    ENABLE_EXPORT_API = False
+    EXPORT_API_TOKEN = os.environ.get('PRICEHUNTER_EXPORT_TOKEN')
+    EXPORT_CHUNK_ROWS = 10000  # שורות לכל חלק (ו-row group ב-Parquet) - הזיכרון לא תלוי בגודל הייצוא
+    
+    # חיפוש מרובה (/api/search/batch)
+    BATCH_MAX_QUERIES = 500  # שאילתות בבקשה אחת
+    
+    # דחיסת תגובות
+    ENABLE_COMPRESSION = True
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5  # איכות נמוכה-בינונית - מהיר מספיק לתגובות דינמיות
+    COMPRESSION_MIN_SIZE = 500  # בתים - תגובות קטנות יותר לא נדחסות
+    
     # הגדרות Flask
     FLASK_HOST = '127.0.0.1'
     FLASK_PORT = 5000
     FLASK_DEBUG = DEBUG
+    # מפתח סודי מהסביבה - אף פעם לא בקוד (אם חסר נוצר מפתח אקראי בכל הפעלה)
+    SECRET_KEY = os.environ.get('PRICEHUNTER_SECRET_KEY')
+    
+    # שרת פרודקשן (python -m web.server)
+    SERVER_BIND = os.environ.get('PRICEHUNTER_BIND', '0.0.0.0:8000')
+    SERVER_WORKERS = int(os.environ.get('PRICEHUNTER_WORKERS', 2))
+    SERVER_THREADS = 8  # threads לכל worker - long-poll מחזיק thread
+    SERVER_TIMEOUT = 60
+    SERVER_GRACEFUL_TIMEOUT = 30  # זמן לסיום סריקות שרצות לפני כיבוי worker
+    SERVER_MAX_REQUESTS = 2000  # מחזור workers מדי פעם (דליפות זיכרון של דפדפנים)
+    WARMUP_TOP_QUERIES = 50  # שאילתות פופולריות שנטענות מהקטלוג בחימום worker
+    
+    # הגדרות שמשתנות בזמן ריצה בלי הפעלה מחדש (ראו core/runtime_config.py)
+    RUNTIME_CONFIG_PATH = os.environ.get('PRICEHUNTER_RUNTIME_CONFIG', 'runtime_config.json')
+    RUNTIME_CONFIG_POLL_INTERVAL = 5  # שניות בין בדיקות של הקובץ (0 = בלי מעקב)
+    RUNTIME_CONFIG_HISTORY = 50  # גרסאות אחרונות שנשמרות בזיכרון
     
     # הגדרות Selenium
     SELENIUM_HEADLESS = True
     SELENIUM_TIMEOUT = 15
+    DRIVER_POOL_SIZE = 2  # דפדפנים פתוחים שנשמרים לשימוש חוזר בכל scraper
+    DRIVER_WARM_COUNT = 1  # דפדפנים שנפתחים מראש בחימום worker
     
     @staticmethod
     def get_store_config(store_name):
@@ -6,7 +6,7 @@ Core Package - המוח של PriceHunter
 
 מה יש כאן:
 1. price_finder.py - המנוע הראשי שמחבר כל הscrapers
-2. product_matcher.py - זיהוי מוצרים זהים בחנויות שונות (עתיד)
+2. product_matcher.py - זיהוי מוצרים זהים בחנויות שונות
 3. data_cleaner.py - ניקוי וארגון נתונים (עתיד)
 
 איך זה עובד:
@@ -30,7 +30,6 @@ except ImportError:
 try:
     from .product_matcher import ProductMatcher
 except ImportError:
-    # עתיד
     ProductMatcher = None
 
 try:
@@ -42,7 +41,7 @@ except ImportError:
 # מה ציבורי בחבילה זו
 __all__ = [
     'PriceFinder',      # המנוע הראשי (שלב הבא)
-    'ProductMatcher',   # זיהוי מוצרים זהים (עתיד)
+    'ProductMatcher',   # זיהוי מוצרים זהים
     'DataCleaner'       # ניקוי נתונים (עתיד)
 ]
 
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בקרת עומס - הגבלת מספר הסריקות שרצות במקביל (כל סריקה = דפדפן Chrome)
+ותור המתנה חסום. כשהמערכת מלאה הבקשה נדחית מיד עם זמן המתנה מומלץ,
+במקום לפתוח עוד דפדפנים ולהפיל את השרת
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CapacityExceeded(Exception):
+    """אין מקום לסריקה נוספת (וגם לא בתור)"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """מגביל סריקות במקביל עם תור המתנה חסום"""
+
+    def __init__(self, max_concurrent: Optional[int] = None, max_queue: Optional[int] = None,
+                 queue_timeout: Optional[float] = None):
+        self.max_concurrent = max_concurrent or Config.MAX_CONCURRENT_SCRAPES
+        self.max_queue = Config.SCRAPE_QUEUE_SIZE if max_queue is None else max_queue
+        self.queue_timeout = Config.SCRAPE_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._avg_duration = float(Config.REQUEST_TIMEOUT)  # ממוצע נע של משך סריקה
+
+    def configure(self, max_concurrent: Optional[int] = None, max_queue: Optional[int] = None,
+                  queue_timeout: Optional[float] = None):
+        """שינוי המגבלות בזמן ריצה - בקשות שמחכות בתור נכנסות מיד אם נוסף מקום"""
+        with self._condition:
+            if max_concurrent is not None:
+                self.max_concurrent = max_concurrent
+            if max_queue is not None:
+                self.max_queue = max_queue
+            if queue_timeout is not None:
+                self.queue_timeout = queue_timeout
+            self._condition.notify_all()
+
+    def retry_after(self) -> int:
+        """הערכה לזמן עד שיתפנה מקום - לפי משך סריקה ממוצע ואורך התור"""
+        rounds = (self.waiting + 1) / self.max_concurrent
+        return max(1, int(round(self._avg_duration * rounds)))
+
+    def acquire(self, block: bool = True):
+        """תפיסת מקום לסריקה - זורק CapacityExceeded אם אין מקום"""
+        with self._condition:
+            if self.active < self.max_concurrent and not self.waiting:
+                self.active += 1
+                self.admitted += 1
+                return
+
+            if not block or self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise CapacityExceeded('Scrape capacity exhausted', self.retry_after())
+
+            self.waiting += 1
+            deadline = time.time() + self.queue_timeout
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise CapacityExceeded('Timed out waiting for scrape capacity', self.retry_after())
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+
+            self.active += 1
+            self.admitted += 1
+
+    def release(self, duration: Optional[float] = None):
+        with self._condition:
+            self.active -= 1
+            if duration is not None:
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self, block: bool = True):
+        """with admission.slot(): ... - מקום לסריקה אחת"""
+        self.acquire(block)
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self.release(time.time() - start_time)
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                'active': self.active,
+                'waiting': self.waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'avg_scrape_seconds': round(self._avg_duration, 2)
+            }
+
+
+class RateLimiter:
+    """הגבלת קצב לכל לקוח (token bucket)"""
+
+    def __init__(self, per_minute: Optional[int] = None, burst: Optional[int] = None,
+                 max_clients: int = 10000):
+        self.rate = (per_minute or Config.RATE_LIMIT_PER_MINUTE) / 60.0
+        self.burst = burst or Config.RATE_LIMIT_BURST
+        self.max_clients = max_clients
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # לקוח -> (אסימונים, זמן עדכון)
+        self._lock = threading.Lock()
+
+    def configure(self, per_minute: Optional[int] = None, burst: Optional[int] = None):
+        """שינוי הקצב בזמן ריצה (הדליים הקיימים נשמרים)"""
+        with self._lock:
+            if per_minute is not None:
+                self.rate = per_minute / 60.0
+            if burst is not None:
+                self.burst = burst
+
+    def allow(self, client: str) -> Tuple[bool, int]:
+        """
+        Returns:
+            (האם מותר, שניות עד שיתאפשר שוב)
+        """
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+            if tokens >= 1:
+                self._buckets[client] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[client] = (tokens, now)
+                allowed, retry_after = False, max(1, int((1 - tokens) / self.rate + 0.999))
+
+            if len(self._buckets) > self.max_clients:
+                self._prune(now)
+
+        return allowed, retry_after
+
+    def _prune(self, now: float):
+        """מחיקת לקוחות שהדלי שלהם כבר התמלא מחדש (בתוך המנעול)"""
+        full_after = self.burst / self.rate
+        self._buckets = {client: state for client, state in self._buckets.items()
+                         if now - state[1] < full_after}
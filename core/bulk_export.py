@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ייצוא מלא של הקטלוג והיסטוריית המחירים - CSV, NDJSON או Parquet
+
+הייצוא בהזרמה: השורות נקראות מ-SQLite בחלקים של EXPORT_CHUNK_ROWS, כל חלק
+הופך ל-DataFrame ונכתב מיד (ב-Parquet - row group לכל חלק), כך שהזיכרון
+לא תלוי במספר השורות. הסינון לפי חנות, קטגוריה וטווח תאריכים נעשה בשאילתה
+עצמה. הקריאה בחיבור לקריאה בלבד - הייצוא לא חוסם את הכתיבות של הסריקות
+
+מאגרים:
+    products - טבלת המוצרים מסריקת הקטגוריות (core/product_store.py)
+    catalog  - המוצרים מהחיפושים (core/catalog_index.py)
+    history  - היסטוריית המחירים: תצפיות גולמיות וימים שנדחסו (core/price_history.py)
+
+שימוש:
+    python -m core.bulk_export products --format parquet -o products.parquet
+    python -m core.bulk_export history --store ksp --category laptops --since 2026-01-01 > ksp.csv
+"""
+
+import io
+import hmac
+import time
+import sqlite3
+import logging
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple, Union
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+# סוג התוכן וסיומת הקובץ לכל פורמט
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+# העמודות של כל מאגר וסוגן (str / float / int / time) - סכמה קבועה לכל החלקים
+COLUMNS = {
+    'products': [('store', 'str'), ('category', 'str'), ('name', 'str'), ('price', 'float'),
+                 ('availability', 'str'), ('url', 'str'), ('image_url', 'str'), ('page', 'int'),
+                 ('first_seen', 'time'), ('last_seen', 'time')],
+    'catalog': [('store', 'str'), ('name', 'str'), ('price', 'float'), ('availability', 'str'),
+                ('url', 'str'), ('image_url', 'str'), ('last_updated', 'time')],
+    'history': [('store', 'str'), ('url', 'str'), ('name', 'str'), ('timestamp', 'time'),
+                ('price', 'float'), ('min_price', 'float'), ('max_price', 'float'),
+                ('availability', 'str'), ('resolution', 'str')]
+}
+
+DATASETS = tuple(COLUMNS)
+
+
+class ExportFilters:
+    """הסינון של ייצוא - נבנה ממנו WHERE לכל מאגר"""
+
+    def __init__(self, stores: Optional[List[str]] = None, category: Optional[str] = None,
+                 since: Union[str, float, None] = None, until: Union[str, float, None] = None):
+        self.stores = store_names(stores) if stores else []
+        self.category = category
+        self.since = parse_time(since)
+        self.until = parse_time(until, end_of_day=True)
+
+    def where(self, dataset: str, alias: str) -> Tuple[str, List]:
+        """
+        תנאי ה-WHERE והפרמטרים. בטבלת המוצרים החנות נשמרת לפי המפתח (ksp)
+        ובשאר לפי השם (KSP) - store_names() מחזיר את שניהם. בקטלוג ובהיסטוריה
+        אין קטגוריה - הסינון לפי הקישורים שנסרקו בקטגוריה
+        """
+        clauses, params = [], []
+        if self.stores:
+            clauses.append(f"{alias}.store IN ({','.join('?' * len(self.stores))})")
+            params.extend(self.stores)
+        if self.category:
+            if dataset == 'products':
+                clauses.append(f'{alias}.category = ?')
+            else:
+                clauses.append(f'{alias}.url IN (SELECT url FROM products WHERE category = ?)')
+            params.append(self.category)
+        return ' AND '.join(clauses) or '1', params
+
+    def time_range(self) -> Tuple[float, float]:
+        return self.since or 0, self.until or time.time()
+
+
+def store_names(stores: List[str]) -> List[str]:
+    """כל השמות של החנויות - המפתח בהגדרות והשם שמופיע במוצרים"""
+    names = set()
+    for store in stores:
+        store_config = Config.get_store_config(store)
+        if store_config is None:
+            # אולי זה שם התצוגה
+            for key, candidate in Config.ACTIVE_STORES.items():
+                if candidate['name'].lower() == store.lower():
+                    store_config, store = candidate, key
+                    break
+        names.add(store)
+        if store_config:
+            names.update((store.lower(), store_config['name']))
+    return sorted(names)
+
+
+def parse_time(value: Union[str, float, None], end_of_day: bool = False) -> Optional[float]:
+    """
+    תאריך (2026-01-31), תאריך ושעה ב-ISO או epoch - לשניות (UTC).
+    תאריך בלי שעה כגבול עליון כולל את כל היום
+
+    Raises:
+        ValueError: ערך שלא ניתן לפענח
+    """
+    if value in (None, ''):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    timestamp = parsed.timestamp()
+    if end_of_day and len(value) == 10:
+        timestamp += SECONDS_PER_DAY - 0.001
+    return timestamp
+
+
+def token_matches(token: Optional[str]) -> bool:
+    """הטוקן מבקשת ה-API מול EXPORT_API_TOKEN (השוואה בזמן קבוע) - בלי טוקן מוגדר אין גישה"""
+    expected = Config.EXPORT_API_TOKEN
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.strip().encode('utf-8'), expected.encode('utf-8'))
+
+
+def _query(dataset: str, filters: ExportFilters) -> Tuple[str, List]:
+    """השאילתה של המאגר עם הסינון בתוכה"""
+    start, end = filters.time_range()
+
+    if dataset == 'products':
+        where, params = filters.where(dataset, 'p')
+        return f"""
+            SELECT p.store, p.category, p.name, p.price, p.availability, p.url, p.image_url, p.page,
+                   p.first_seen, p.last_seen
+            FROM products p
+            WHERE {where} AND p.last_seen BETWEEN ? AND ?
+            ORDER BY p.store, p.category, p.page
+        """, params + [start, end]
+
+    if dataset == 'catalog':
+        where, params = filters.where(dataset, 'c')
+        return f"""
+            SELECT c.store, c.name, c.price, c.availability, c.url, c.image_url, c.last_updated
+            FROM catalog_products c
+            WHERE {where} AND c.last_updated BETWEEN ? AND ?
+            ORDER BY c.id
+        """, params + [start, end]
+
+    if dataset == 'history':
+        where, params = filters.where(dataset, 's')
+        # ימים שנדחסו (נקודה יומית עם min/max) ואחריהם התצפיות הגולמיות
+        return f"""
+            SELECT s.store, s.url, s.name, d.day * {SECONDS_PER_DAY} AS timestamp, d.close_price AS price,
+                   d.min_price, d.max_price, NULL AS availability, 'daily' AS resolution
+            FROM price_series s
+            JOIN price_daily d ON d.series_id = s.id
+            WHERE {where} AND d.day BETWEEN ? AND ?
+            UNION ALL
+            SELECT s.store, s.url, s.name, o.observed_at, o.price,
+                   o.price, o.price, o.availability, 'raw'
+            FROM price_series s
+            JOIN price_observations o ON o.series_id = s.id
+            WHERE {where} AND o.observed_at BETWEEN ? AND ?
+        """, (params + [int(start // SECONDS_PER_DAY), int(end // SECONDS_PER_DAY)]
+              + params + [start, end])
+
+    raise ValueError(f"Unknown dataset: {dataset}")
+
+
+def iter_chunks(dataset: str, filters: Optional[ExportFilters] = None, chunk_rows: Optional[int] = None,
+                db_path: Optional[str] = None) -> Iterator['pandas.DataFrame']:
+    """
+    השורות של המאגר כ-DataFrame-ים של עד chunk_rows שורות, עם הסוגים של COLUMNS
+    (זמנים כ-datetime ב-UTC)
+    """
+    import pandas as pd
+
+    sql, params = _query(dataset, filters or ExportFilters())
+    chunk_rows = chunk_rows or Config.EXPORT_CHUNK_ROWS
+    columns = COLUMNS[dataset]
+
+    # חיבור נפרד לקריאה בלבד - לא החיבור המשותף של ה-thread
+    path = db_path or Config.DATABASE_PATH
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True, timeout=30)
+    try:
+        cursor = connection.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            frame = pd.DataFrame.from_records(rows, columns=[name for name, _ in columns])
+            for name, kind in columns:
+                if kind == 'time':
+                    frame[name] = pd.to_datetime(frame[name], unit='s', utc=True)
+                elif kind == 'float':
+                    frame[name] = frame[name].astype('float64')
+                elif kind == 'int':
+                    frame[name] = frame[name].astype('Int64')
+                else:
+                    frame[name] = frame[name].astype('object')
+            yield frame
+    finally:
+        connection.close()
+
+
+def _arrow_schema(dataset: str):
+    import pyarrow as pa
+
+    types = {'str': pa.string(), 'float': pa.float64(), 'int': pa.int64(), 'time': pa.timestamp('ms', tz='UTC')}
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS[dataset]])
+
+
+class _ChunkSink(io.RawIOBase):
+    """קובץ בזיכרון שמתרוקן אחרי כל row group - ה-Parquet יוצא בחלקים"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+def export(dataset: str, fmt: str = 'csv', filters: Optional[ExportFilters] = None,
+           chunk_rows: Optional[int] = None, db_path: Optional[str] = None) -> Iterator[bytes]:
+    """
+    הייצוא עצמו - חלקים של bytes לכתיבה לקובץ או לתשובת HTTP
+
+    Raises:
+        ValueError: מאגר או פורמט לא מוכרים
+        ImportError: Parquet בלי pyarrow
+    """
+    if dataset not in COLUMNS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    chunks = iter_chunks(dataset, filters, chunk_rows, db_path)
+    rows = 0
+    start_time = time.time()
+
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _arrow_schema(dataset)
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema, compression='snappy') as writer:
+            for frame in chunks:
+                # safe=False - זמנים בדיוק של מילישניות
+                table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False, safe=False)
+                writer.write_table(table)
+                rows += len(frame)
+                yield sink.drain()
+        yield sink.drain()
+
+    elif fmt == 'csv':
+        header = True
+        for frame in chunks:
+            yield frame.to_csv(index=False, header=header, date_format='%Y-%m-%dT%H:%M:%SZ').encode('utf-8')
+            header = False
+            rows += len(frame)
+        if header:
+            # בלי שורות - רק הכותרת
+            yield (','.join(name for name, _ in COLUMNS[dataset]) + '\n').encode('utf-8')
+
+    else:
+        for frame in chunks:
+            data = frame.to_json(orient='records', lines=True, force_ascii=False,
+                                 date_format='iso', date_unit='s')
+            yield (data if data.endswith('\n') else data + '\n').encode('utf-8')
+            rows += len(frame)
+
+    logger.info(f"Exported {rows} {dataset} rows as {fmt} in {time.time() - start_time:.1f}s")
+
+
+if __name__ == '__main__':
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description='PriceHunter bulk export')
+    parser.add_argument('dataset', choices=DATASETS)
+    parser.add_argument('--format', choices=tuple(FORMATS), default='csv')
+    parser.add_argument('--store', action='append', dest='stores', help='store key or name (repeatable)')
+    parser.add_argument('--category', help='only products crawled in this category')
+    parser.add_argument('--since', help='ISO date / datetime or epoch seconds')
+    parser.add_argument('--until', help='ISO date / datetime or epoch seconds (a date includes the whole day)')
+    parser.add_argument('--chunk-rows', type=int, default=None)
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    export_filters = ExportFilters(args.stores, args.category, args.since, args.until)
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for data in export(args.dataset, args.format, export_filters, args.chunk_rows):
+            output.write(data)
+    finally:
+        if args.output:
+            output.close()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+קטלוג מוצרים מקומי עם אינדקס חיפוש מלא (SQLite FTS5)
+כל מוצר שנסרק נשמר כאן, כך שחיפוש של מוצר שכבר ראינו עונה תוך מילישניות
+"""
+
+import re
+import time
+import logging
+from typing import List, Dict, Optional, Iterable
+
+from config import Config
+from .database import get_connection
+from .query_canonicalizer import NIQQUD_PATTERN, FINAL_LETTERS, WORD_PATTERN, canonicalize, word_variants
+
+logger = logging.getLogger(__name__)
+
+HEBREW_WORD = re.compile(r'^[א-ת]+$')
+# אותיות שימוש שנצמדות לתחילת מילה (ה, ו, ב, ל, מ, ש, כ וצירופים)
+HEBREW_PREFIXES = ('וכש', 'וה', 'שה', 'מה', 'בה', 'לה', 'כש', 'וב', 'ול', 'ומ',
+                   'ה', 'ו', 'ב', 'ל', 'מ', 'ש', 'כ')
+# סיומות רבים (אחרי המרת אותיות סופיות)
+HEBREW_PLURAL_SUFFIXES = ('ימ', 'ות')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_products (
+    id INTEGER PRIMARY KEY,
+    store TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL,
+    url TEXT,
+    image_url TEXT,
+    store_logo TEXT,
+    availability TEXT,
+    last_updated REAL NOT NULL,
+    search_text TEXT NOT NULL,
+    UNIQUE (store, product_key)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5(
+    search_text,
+    content='catalog_products',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS catalog_products_ai AFTER INSERT ON catalog_products BEGIN
+    INSERT INTO catalog_fts(rowid, search_text) VALUES (new.id, new.search_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_products_ad AFTER DELETE ON catalog_products BEGIN
+    INSERT INTO catalog_fts(catalog_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_products_au AFTER UPDATE OF search_text ON catalog_products BEGIN
+    INSERT INTO catalog_fts(catalog_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+    INSERT INTO catalog_fts(rowid, search_text) VALUES (new.id, new.search_text);
+END;
+
+CREATE TABLE IF NOT EXISTS catalog_queries (
+    query_key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    last_scraped REAL NOT NULL,
+    result_count INTEGER NOT NULL
+);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """נרמול טקסט לאינדקס: אותיות קטנות, בלי ניקוד, בלי אותיות סופיות"""
+    text = NIQQUD_PATTERN.sub('', (text or '').lower())
+    return text.translate(FINAL_LETTERS)
+
+
+def strip_hebrew_prefixes(word: str) -> List[str]:
+    """גרסאות של מילה עברית בלי אותיות השימוש שבתחילתה"""
+    variants = []
+    if HEBREW_WORD.match(word):
+        for prefix in HEBREW_PREFIXES:
+            if word.startswith(prefix) and len(word) - len(prefix) >= 3:
+                variants.append(word[len(prefix):])
+    return variants
+
+
+def strip_hebrew_suffixes(word: str) -> List[str]:
+    """גרסת יחיד של מילה עברית ברבים (מחשבים -> מחשב)"""
+    if HEBREW_WORD.match(word):
+        for suffix in HEBREW_PLURAL_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                return [word[:-len(suffix)]]
+    return []
+
+
+def index_terms(text: str) -> List[str]:
+    """המילים שנכנסות לאינדקס - כל מילה וגם הגרסאות שלה בלי תחיליות"""
+    terms = []
+    for word in WORD_PATTERN.findall(normalize_text(text)):
+        terms.append(word)
+        terms.extend(strip_hebrew_prefixes(word))
+    return terms
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    בניית שאילתת MATCH של FTS5
+
+    כל מילה בשאילתה הופכת לקבוצת OR של הגרסאות שלה (עם/בלי תחיליות וסיומות רבים,
+    ובתעתיק - "אייפון" -> "iphone"), וכל הקבוצות חייבות להתקיים (AND).
+    התאמת תחילית מאפשרת "מחשב" -> "מחשבים".
+    """
+    groups = []
+    for word in WORD_PATTERN.findall(normalize_text(query)):
+        variants = [word] + strip_hebrew_prefixes(word) + word_variants(word)
+        variants += [stem for v in variants for stem in strip_hebrew_suffixes(v)]
+        groups.append('(' + ' OR '.join(f'"{v}"*' for v in dict.fromkeys(variants)) + ')')
+    return ' AND '.join(groups) if groups else None
+
+
+def query_key(query: str) -> str:
+    """מפתח השאילתה לטבלת הרעננות - הצורה הקנונית שלה (core/query_canonicalizer.py)"""
+    return canonicalize(query)
+
+
+class CatalogIndex:
+    """קטלוג מוצרים מקומי עם חיפוש FTS5"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self._ensure_schema()
+
+    @property
+    def connection(self):
+        return get_connection(self.db_path)
+
+    def _ensure_schema(self):
+        self.connection.executescript(SCHEMA)
+
+    def upsert_products(self, products: Iterable[Dict], query: Optional[str] = None) -> int:
+        """הכנסה/עדכון של מוצרים שנסרקו - בטרנזקציה אחת"""
+        now = time.time()
+        rows = []
+        for product in products:
+            if not product or not product.get('name'):
+                continue
+            rows.append((
+                product.get('store') or '',
+                product.get('url') or product['name'],
+                product['name'],
+                product.get('price'),
+                product.get('url'),
+                product.get('image_url'),
+                product.get('store_logo'),
+                product.get('availability'),
+                product.get('last_updated') or now,
+                ' '.join(index_terms(product['name']))
+            ))
+
+        with self.connection as conn:
+            conn.executemany("""
+                INSERT INTO catalog_products
+                    (store, product_key, name, price, url, image_url, store_logo,
+                     availability, last_updated, search_text)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (store, product_key) DO UPDATE SET
+                    name = excluded.name,
+                    price = excluded.price,
+                    image_url = COALESCE(excluded.image_url, image_url),
+                    store_logo = excluded.store_logo,
+                    availability = excluded.availability,
+                    last_updated = excluded.last_updated,
+                    search_text = excluded.search_text
+            """, rows)
+
+            if query is not None:
+                conn.execute("""
+                    INSERT INTO catalog_queries (query_key, query, last_scraped, result_count)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (query_key) DO UPDATE SET
+                        query = excluded.query,
+                        last_scraped = excluded.last_scraped,
+                        result_count = excluded.result_count
+                """, (query_key(query), query, now, len(rows)))
+
+        logger.debug(f"Catalog upserted {len(rows)} products")
+        return len(rows)
+
+    def touch(self, store: str, urls: List[str], when: Optional[float] = None) -> int:
+        """מוצרים שנראו שוב בלי שינוי (סריקה חוזרת) - רק זמן העדכון"""
+        when = when or time.time()
+        with self.connection as conn:
+            cursor = conn.executemany(
+                'UPDATE catalog_products SET last_updated = ? WHERE store = ? AND product_key = ?',
+                [(when, store, url) for url in urls]
+            )
+        return cursor.rowcount
+
+    def search(self, query: str, limit: int = 20, max_age: Optional[float] = None) -> Dict:
+        """
+        חיפוש בקטלוג
+
+        Args:
+            query: מחרוזת החיפוש
+            limit: מספר תוצאות מקסימלי
+            max_age: התעלמות ממוצרים שעודכנו לפני יותר מ-max_age שניות
+
+        Returns:
+            מילון עם המוצרים ומטא-דאטה של רעננות
+        """
+        match_query = build_match_query(query)
+        products = []
+
+        if match_query:
+            min_updated = time.time() - max_age if max_age else 0
+            rows = self.connection.execute("""
+                SELECT p.* FROM catalog_fts
+                JOIN catalog_products p ON p.id = catalog_fts.rowid
+                WHERE catalog_fts MATCH ? AND p.last_updated >= ?
+                ORDER BY bm25(catalog_fts)
+                LIMIT ?
+            """, (match_query, min_updated, limit)).fetchall()
+            products = [self._row_to_product(row) for row in rows]
+
+        return {
+            'products': products,
+            'freshness': self.freshness(query, products)
+        }
+
+    def freshness(self, query: str, products: List[Dict]) -> Dict:
+        """מטא-דאטה על גיל הנתונים"""
+        now = time.time()
+        row = self.connection.execute(
+            'SELECT last_scraped FROM catalog_queries WHERE query_key = ?',
+            (query_key(query),)
+        ).fetchone()
+
+        last_scraped = row['last_scraped'] if row else None
+        updated = [p['last_updated'] for p in products]
+        return {
+            'query_last_scraped': last_scraped,
+            'query_age_seconds': round(now - last_scraped, 1) if last_scraped else None,
+            'oldest_product': min(updated) if updated else None,
+            'newest_product': max(updated) if updated else None
+        }
+
+    def _row_to_product(self, row) -> Dict:
+        """המרת שורה למילון מוצר סטנדרטי (כמו create_product_dict)"""
+        return {
+            'name': row['name'],
+            'price': row['price'],
+            'store': row['store'],
+            'store_logo': row['store_logo'],
+            'url': row['url'],
+            'image_url': row['image_url'],
+            'availability': row['availability'],
+            'last_updated': row['last_updated']
+        }
+
+    def count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM catalog_products').fetchone()[0]
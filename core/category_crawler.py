@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+סריקת קטגוריות שלמות - מעבר על עמודי רשימת המוצרים של כל קטגוריה
+(ELECTRONICS_CATEGORIES) וכתיבה שוטפת לטבלת המוצרים, לקטלוג ולהיסטוריית
+המחירים. סבב אחד ממלא מחירים לקטגוריה שלמה בעלות של כמה עשרות עמודים,
+במקום חיפוש נפרד לכל מוצר
+
+כל עמוד שנכתב מעדכן נקודת המשך (crawl_checkpoints), כך שסריקה שנקטעה
+ממשיכה מהעמוד הבא ולא מההתחלה. כך גם סבב שנעצר בגבול העמודים
+(--max-pages / CRAWL_MAX_PAGES) - רק סוף הרשימה מסיים סבב
+
+סריקה חוזרת היא מצטברת: עמוד שטביעת האצבע שלו לא השתנתה לא מפוענח ולא
+נכתב (רק זמני הראייה מתעדכנים), ובעמוד שהשתנה נכתבים לקטלוג ולהיסטוריית
+המחירים רק הכרטיסים שהשתנו - העלות היא בערך כגודל השינוי
+
+שימוש:
+    python -m core.category_crawler                    # כל החנויות, כל הקטגוריות
+    python -m core.category_crawler ksp --category laptops --max-pages 5
+    python -m core.category_crawler --restart          # סבב חדש מהעמוד הראשון
+    python -m core.category_crawler --full             # פענוח כל העמודים, גם אם לא השתנו
+"""
+
+import time
+import logging
+from typing import List, Dict, Optional
+
+from config import Config
+from .product_store import ProductStore, RUNNING, FAILED, DONE
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryCrawler:
+    """סריקת קטגוריות עם נקודות המשך"""
+
+    def __init__(self, product_store: Optional[ProductStore] = None, catalog=None, price_history=None,
+                 watchlist=None):
+        self.product_store = product_store or ProductStore()
+        self.catalog = catalog
+        self.price_history = price_history
+        self.watchlist = watchlist
+
+    def crawl(self, scraper, category: str, resume: bool = True, max_pages: Optional[int] = None,
+              incremental: bool = True) -> Dict:
+        """
+        סריקת קטגוריה אחת בחנות אחת
+
+        Args:
+            scraper: ה-scraper של החנות (BaseScraper או ScraperHandle)
+            category: שם הקטגוריה (מ-ELECTRONICS_CATEGORIES)
+            resume: להמשיך מנקודת ההמשך של סריקה שלא הסתיימה
+            max_pages: גבול עמודים לסבב הזה (None = CRAWL_MAX_PAGES)
+            incremental: לדלג על עמודים שלא השתנו מאז הסריקה הקודמת
+
+        Returns:
+            סיכום: {'store', 'category', 'status', 'start_page', 'pages', 'unchanged_pages',
+            'products', 'changes', 'elapsed'} - products סופר רק עמודים שפוענחו.
+            status: done (סוף הרשימה), running (נעצר בגבול העמודים) או failed
+        """
+        store = scraper.store_name
+        summary = {'store': store, 'category': category, 'status': DONE, 'start_page': 1,
+                   'pages': 0, 'unchanged_pages': 0, 'products': 0, 'changes': 0, 'elapsed': 0.0}
+        if not scraper.category_url(category):
+            summary['status'] = 'unsupported'
+            return summary
+
+        start_time = time.time()
+        started_at, pages, count = start_time, 0, 0
+        checkpoint = self.product_store.get_checkpoint(store, category) if resume else None
+        if checkpoint and checkpoint['status'] != DONE:
+            summary['start_page'] = checkpoint['next_page']
+            started_at, pages, count = checkpoint['started_at'], checkpoint['pages'], checkpoint['products']
+            logger.info(f"Resuming {store}/{category} from page {checkpoint['next_page']}")
+
+        known = self.product_store.page_fingerprints(store, category) if incremental else None
+        next_page = summary['start_page']
+        listing = scraper.crawl_category(category, next_page, max_pages, known_fingerprints=known)
+        try:
+            while True:
+                try:
+                    page, products, fingerprint = next(listing)
+                except StopIteration as stop:
+                    capped = stop.value  # נעצרה בגבול העמודים - הרשימה לא נגמרה
+                    break
+                if products is None:
+                    self._touch_page(scraper, category, page)
+                    summary['unchanged_pages'] += 1
+                else:
+                    changes = self._store_page(store, category, page, products)
+                    self.product_store.save_page(store, category, page, fingerprint, len(products))
+                    count += len(products)
+                    summary['products'] += len(products)
+                    summary['changes'] += len(changes)
+                pages += 1
+                summary['pages'] += 1
+                next_page = page + 1
+                self.product_store.save_checkpoint(store, category, RUNNING, next_page, pages, count, started_at)
+        except Exception as e:
+            logger.error(f"Crawl of {store}/{category} stopped at page {next_page}: {e}")
+            self.product_store.save_checkpoint(store, category, FAILED, next_page, pages, count, started_at, str(e))
+            summary['status'] = FAILED
+        else:
+            if capped:
+                # הסבב הבא ממשיך מכאן (--max-pages 5 מתקדם 5 עמודים בכל הרצה)
+                self.product_store.save_checkpoint(store, category, RUNNING, next_page, pages, count, started_at)
+                summary['status'] = RUNNING
+            else:
+                self.product_store.save_checkpoint(store, category, DONE, 1, pages, count, started_at)
+                # רק בסוף הרשימה ידוע שהעמודים שאחריו כבר לא קיימים
+                self.product_store.forget_pages(store, category, next_page - 1)
+
+        summary['elapsed'] = round(time.time() - start_time, 2)
+        logger.info(f"Crawled {store}/{category}: {summary['pages']} pages "
+                    f"({summary['unchanged_pages']} unchanged), {summary['changes']} changed products "
+                    f"({summary['elapsed']}s, {summary['status']})")
+        return summary
+
+    def _store_page(self, store: str, category: str, page: int, products: List[Dict]) -> List[Dict]:
+        """
+        עמוד שהשתנה - לטבלת המוצרים, ורק הכרטיסים שהשתנו גם לקטלוג,
+        להיסטוריית המחירים ולרשימות המעקב
+
+        Returns:
+            השינויים (ProductStore.upsert_page)
+        """
+        changes = self.product_store.upsert_page(store, category, page, products)
+        changed = [change['product'] for change in changes]
+        if self.catalog and changed:
+            try:
+                self.catalog.upsert_products(changed)
+            except Exception as e:
+                logger.error(f"Failed to index crawled products: {e}")
+        if self.price_history and changed:
+            try:
+                self.price_history.record(changed)
+            except Exception as e:
+                logger.error(f"Failed to record crawled prices: {e}")
+        if self.watchlist and changed:
+            try:
+                self.watchlist.evaluate(changed)
+            except Exception as e:
+                logger.error(f"Failed to check watches for crawled products: {e}")
+        return changes
+
+    def _touch_page(self, scraper, category: str, page: int):
+        """עמוד שלא השתנה - המוצרים שבו נשארים טריים בקטלוג בלי לכתוב אותם מחדש"""
+        urls = self.product_store.touch_page(scraper.store_name, category, page)
+        if self.catalog and urls:
+            try:
+                self.catalog.touch(scraper.config['name'], urls)
+            except Exception as e:
+                logger.error(f"Failed to refresh crawled products in catalog: {e}")
+
+    def crawl_all(self, scrapers: Dict, categories: Optional[List[str]] = None, resume: bool = True,
+                  max_pages: Optional[int] = None, incremental: bool = True) -> List[Dict]:
+        """כל הקטגוריות בכל החנויות (חנות אחרי חנות - המקביליות היא בתוך כל חנות)"""
+        summaries = []
+        for store_name, scraper in scrapers.items():
+            for category in categories or Config.ELECTRONICS_CATEGORIES:
+                summaries.append(self.crawl(scraper, category, resume, max_pages, incremental))
+        return summaries
+
+
+if __name__ == '__main__':
+    import argparse
+    from scrapers.registry import create_scrapers
+    from .catalog_index import CatalogIndex
+    from .price_history import PriceHistory
+    from .watchlist import Watchlist
+
+    parser = argparse.ArgumentParser(description='PriceHunter category crawler')
+    parser.add_argument('stores', nargs='*', help='stores to crawl (default: all active stores)')
+    parser.add_argument('--category', action='append', dest='categories',
+                        help='category to crawl (repeatable, default: ELECTRONICS_CATEGORIES)')
+    parser.add_argument('--max-pages', type=int, default=None)
+    parser.add_argument('--restart', action='store_true', help='ignore checkpoints and start from page 1')
+    parser.add_argument('--full', action='store_true', help='re-parse pages even if their fingerprint is unchanged')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    price_history = PriceHistory() if Config.ENABLE_PRICE_HISTORY else None
+    watchlist = Watchlist() if Config.ENABLE_WATCHLIST else None
+    crawler = CategoryCrawler(catalog=CatalogIndex() if Config.ENABLE_CATALOG else None,
+                              price_history=price_history, watchlist=watchlist)
+    scrapers = create_scrapers(args.stores or None)
+    try:
+        for summary in crawler.crawl_all(scrapers, args.categories, not args.restart, args.max_pages,
+                                         not args.full):
+            print(f"{summary['store']:8} {summary['category']:14} {summary['status']:11} "
+                  f"pages={summary['pages']:<4} unchanged={summary['unchanged_pages']:<4} "
+                  f"changes={summary['changes']:<6} {summary['elapsed']}s")
+    finally:
+        if price_history:
+            price_history.flush()
+        if watchlist:
+            watchlist.flush()
+        for scraper in scrapers.values():
+            scraper.close()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+חיבור משותף למסד הנתונים המקומי (SQLite בנתיב DATABASE_PATH)
+"""
+
+import sqlite3
+import threading
+import logging
+from typing import Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    חיבור SQLite לכל thread
+
+    כל thread מקבל חיבור משלו (SQLite לא משתף חיבורים בין threads),
+    במצב WAL כדי שקריאות לא ייחסמו בזמן כתיבה.
+    """
+    db_path = db_path or Config.DATABASE_PATH
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    connection = connections.get(db_path)
+    if connection is None:
+        connection = sqlite3.connect(db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connections[db_path] = connection
+        logger.debug(f"Opened SQLite connection to {db_path}")
+
+    return connection
+
+
+def close_connections():
+    """סגירת החיבורים של ה-thread הנוכחי"""
+    connections = getattr(_local, 'connections', {})
+    for connection in connections.values():
+        connection.close()
+    connections.clear()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+סריקה מוקדמת של שאילתות פופולריות - השאילתות המבוקשות ביותר נסרקות מחדש
+ברקע לפני שהרשומה שלהן במטמון פגה, כך שמשתמשים תמיד מקבלים אותן מהמטמון
+
+- הפופולריות נספרת מכל חיפוש של משתמש (ספירה דועכת - חצי משקל כל
+  PRESCRAPE_HALF_LIFE שניות), לפי הצורה הקנונית של השאילתה
+- תור עדיפויות: קודם מה שעומד לפוג (או כבר פג), ובשוויון - הפופולרי יותר
+- תקציב: עד PRESCRAPE_BROWSER_MINUTES_PER_HOUR דקות-דפדפן בשעה (משך סריקה
+  × מספר החנויות שרצות בדפדפן)
+- פינוי מקום למשתמשים: סריקה מתחילה רק כשיש לפחות PRESCRAPE_IDLE_SLOTS
+  מקומות פנויים בבקרת העומס ואין חיפושים של משתמשים בתור של המתזמן, והסריקות
+  עצמן רצות במתזמן בעדיפות refresh
+"""
+
+import time
+import heapq
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from config import Config
+from .admission import CapacityExceeded
+from .scheduler import INTERACTIVE, REFRESH
+from .catalog_index import query_key
+
+logger = logging.getLogger(__name__)
+
+
+class QueryPopularity:
+    """ספירה דועכת של חיפושים לכל שאילתה קנונית"""
+
+    def __init__(self, half_life: Optional[float] = None, max_queries: int = 10000):
+        self.half_life = half_life or Config.PRESCRAPE_HALF_LIFE
+        self.max_queries = max_queries
+        self._scores: Dict[str, List] = {}  # מפתח -> [ניקוד, זמן עדכון, הכתיב האחרון]
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def record(self, query: str, weight: float = 1.0):
+        key = query_key(query)
+        if not key:
+            return
+        now = time.time()
+        with self._lock:
+            entry = self._scores.get(key)
+            if entry is None:
+                self._scores[key] = [weight, now, query]
+            else:
+                entry[0] = self._decayed(entry[0], entry[1], now) + weight
+                entry[1] = now
+                entry[2] = query
+            if len(self._scores) > self.max_queries:
+                self._prune(now)
+
+    def _prune(self, now: float):
+        """השארת החצי הפופולרי (בתוך המנעול)"""
+        ranked = sorted(self._scores.items(), key=lambda item: self._decayed(item[1][0], item[1][1], now),
+                        reverse=True)
+        self._scores = dict(ranked[:self.max_queries // 2])
+
+    def top(self, limit: int) -> List[Dict]:
+        """השאילתות הפופולריות עכשיו - {'key', 'query', 'score'}"""
+        now = time.time()
+        with self._lock:
+            scored = [(self._decayed(score, updated, now), key, query)
+                      for key, (score, updated, query) in self._scores.items()]
+        return [{'key': key, 'query': query, 'score': round(score, 2)}
+                for score, key, query in heapq.nlargest(limit, scored)]
+
+    def __len__(self):
+        return len(self._scores)
+
+
+class PreScraper:
+    """מתזמן הסריקות המוקדמות של PriceFinder אחד"""
+
+    def __init__(self, price_finder, top_n: Optional[int] = None, budget_minutes: Optional[float] = None):
+        self.price_finder = price_finder
+        self._top_n = top_n
+        self._budget_minutes = budget_minutes
+        self.popularity = QueryPopularity()
+        self._spent = deque()  # (זמן, שניות-דפדפן) בשעה האחרונה
+        self._spent_lock = threading.Lock()
+        self._queue = []  # (שניות עד תפוגה, -ניקוד, מפתח, שאילתה)
+        self._thread = None
+        self._stop = threading.Event()
+        self.scraped = 0
+        self.busy_rounds = 0
+        self.over_budget_rounds = 0
+
+    @property
+    def top_n(self) -> int:
+        return self._top_n or Config.PRESCRAPE_TOP_QUERIES
+
+    @property
+    def budget_seconds(self) -> float:
+        """התקציב לשעה (נקרא בכל פעם - אפשר לשנות בזמן ריצה)"""
+        minutes = Config.PRESCRAPE_BROWSER_MINUTES_PER_HOUR if self._budget_minutes is None else self._budget_minutes
+        return minutes * 60
+
+    def record(self, query: str):
+        """חיפוש של משתמש - נספר לפופולריות"""
+        self.popularity.record(query)
+
+    def seed(self):
+        """פופולריות התחלתית מהסטטיסטיקות השמורות (אחרי הפעלה מחדש)"""
+        stats = self.price_finder.stats
+        if not stats or len(self.popularity):
+            return
+        try:
+            for row in stats.top_queries(self.top_n):
+                self.popularity.record(row['query'], weight=min(row['searches'], 10))
+        except Exception as e:
+            logger.error(f"Failed to seed query popularity: {e}")
+
+    def budget_left(self) -> float:
+        """שניות-דפדפן שנשארו בשעה הנוכחית"""
+        cutoff = time.time() - 3600
+        with self._spent_lock:
+            while self._spent and self._spent[0][0] < cutoff:
+                self._spent.popleft()
+            spent = sum(cost for _, cost in self._spent)
+        return self.budget_seconds - spent
+
+    def _browsers(self) -> int:
+        """כמה דפדפנים סריקה אחת מחזיקה - חנויות selenium (לפחות 1)"""
+        scrapers = self.price_finder.scrapers.values()
+        return max(sum(1 for scraper in scrapers
+                       if getattr(scraper, 'options', {}).get('engine') == 'selenium'), 1)
+
+    def _is_idle(self) -> bool:
+        admission = self.price_finder.admission
+        return (not admission.waiting
+                and admission.max_concurrent - admission.active >= Config.PRESCRAPE_IDLE_SLOTS
+                and not self.price_finder.scheduler.queue_depth(INTERACTIVE))
+
+    def plan(self) -> int:
+        """
+        בניית תור העדיפויות מחדש - שאילתות פופולריות שהרשומה שלהן במטמון
+        חסרה או תפוג בתוך PRESCRAPE_LEAD_TIME שניות
+
+        Returns:
+            מספר השאילתות בתור
+        """
+        result_cache = self.price_finder.result_cache
+        queue = []
+        for item in self.popularity.top(self.top_n):
+            if item['score'] < Config.PRESCRAPE_MIN_SCORE:
+                continue
+            info = result_cache.peek_info(self.price_finder.cache_key(item['query'])) if result_cache else None
+            expires_in = info['expires_in'] if info else 0
+            if expires_in <= Config.PRESCRAPE_LEAD_TIME:
+                queue.append((expires_in, -item['score'], item['key'], item['query']))
+        heapq.heapify(queue)
+        self._queue = queue
+        return len(queue)
+
+    def run_once(self) -> int:
+        """
+        סבב אחד - סריקה מהתור כל עוד יש תקציב והמערכת פנויה
+
+        Returns:
+            מספר השאילתות שנסרקו
+        """
+        scraped = 0
+        self.plan()
+        while self._queue and not self._stop.is_set():
+            if self.budget_left() <= 0:
+                self.over_budget_rounds += 1
+                logger.info(f"Pre-scrape budget exhausted, {len(self._queue)} queries left for later")
+                break
+            if not self._is_idle():
+                self.busy_rounds += 1
+                break
+
+            _, _, key, query = heapq.heappop(self._queue)
+            start_time = time.time()
+            try:
+                self.price_finder.search_all_stores(query, track_stats=False, use_cache=False, fallback=False,
+                                                    priority=REFRESH)
+                scraped += 1
+            except CapacityExceeded:
+                # משתמש הקדים אותנו למקום האחרון - ננסה בסבב הבא
+                self.busy_rounds += 1
+                break
+            except Exception as e:
+                logger.error(f"Pre-scrape failed for '{query}': {e}")
+            finally:
+                with self._spent_lock:
+                    self._spent.append((time.time(), (time.time() - start_time) * self._browsers()))
+
+        self.scraped += scraped
+        if scraped:
+            logger.info(f"Pre-scraped {scraped} popular queries ({self.budget_left() / 60:.1f} browser-minutes left)")
+        return scraped
+
+    def start(self, interval: Optional[float] = None):
+        """thread ברקע (פעם אחת לתהליך - ב-gunicorn אחרי ה-fork)"""
+        interval = interval or Config.PRESCRAPE_INTERVAL
+        if self._thread:
+            return
+        self.seed()
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Pre-scraper failed: {e}")
+
+        self._thread = threading.Thread(target=loop, name='prescraper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        return {
+            'tracked_queries': len(self.popularity),
+            'queued': len(self._queue),
+            'scraped': self.scraped,
+            'busy_rounds': self.busy_rounds,
+            'over_budget_rounds': self.over_budget_rounds,
+            'browser_minutes_left': round(max(self.budget_left(), 0) / 60, 1),
+            'top_queries': self.popularity.top(5)
+        }
@@ -6,16 +6,31 @@
 
 import logging
 import time
+import queue
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Optional
+import threading
+from contextlib import ExitStack
+from collections import deque
+from concurrent.futures import wait, CancelledError, FIRST_COMPLETED
+from typing import Callable, Iterator, List, Dict, Optional
 from datetime import datetime
 
 from config import Config
-from scrapers.ksp_scraper import KSPScraper
-from scrapers.bug_scraper import BugScraper  # נבנה בהמשך
-from scrapers.zap_scraper import ZapScraper  # נבנה בהמשך
-from scrapers.ivory_scraper import IvoryScraper  # נבנה בהמשך
+from .result_aggregator import ResultAggregator
+from .product_matcher import ProductMatcher
+from .catalog_index import CatalogIndex
+from .price_history import PriceHistory
+from .search_stats import SearchStats
+from .result_cache import ResultCache
+from .admission import AdmissionController, CapacityExceeded
+from .catalog_index import query_key
+from .database import close_connections
+from .runtime_config import get_runtime_config, subscribe, unsubscribe
+from .prescraper import PreScraper
+from .product_details import DetailEnricher
+from .watchlist import Watchlist
+from .scheduler import ScrapeScheduler, Preempted, INTERACTIVE, BATCH, REFRESH, PROBE
+from scrapers.registry import ScraperHandle, create_scrapers
 
 logger = logging.getLogger(__name__)
 
@@ -24,86 +39,630 @@ class PriceFinder:
     
     def __init__(self):
         self.scrapers = {}
+        get_runtime_config()  # הגדרות מהקובץ / מהסביבה לפני יצירת הרכיבים
+        self.product_matcher = ProductMatcher()
+        self.catalog = self._open_storage('catalog index', CatalogIndex, Config.ENABLE_CATALOG)
+        self.price_history = self._open_storage('price history', PriceHistory, Config.ENABLE_PRICE_HISTORY)
+        self.stats = self._open_storage('search stats', SearchStats, Config.ENABLE_STATS)
+        self.watchlist = self._open_storage('watchlist', Watchlist, Config.ENABLE_WATCHLIST)
+        self.result_cache = ResultCache() if Config.ENABLE_CACHE else None
+        self.admission = AdmissionController()
+        self.scheduler = ScrapeScheduler()
+        self.prescraper = PreScraper(self) if Config.ENABLE_PRESCRAPE else None
+        self.enricher = DetailEnricher(self)
+        self._store_status = None  # (זמן בדיקה, סטטוס)
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
         self._initialize_scrapers()
+        subscribe(self.apply_runtime_config)
+    
+    def _open_storage(self, name: str, storage_class, enabled: bool):
+        """פתיחת רכיב אחסון מקומי (אם מופעל) - כשלון לא מפיל את החיפוש"""
+        if not enabled:
+            return None
+        try:
+            return storage_class()
+        except Exception as e:
+            logger.error(f"Failed to open {name}: {e}")
+            return None
         
     def _initialize_scrapers(self):
-        """אתחול כל מנועי ה-Scraping"""
-        scraper_classes = {
-            'ksp': KSPScraper,
-            # 'bug': BugScraper,      # נוסיף בהמשך
-            # 'zap': ZapScraper,      # נוסיף בהמשך  
-            # 'ivory': IvoryScraper   # נוסיף בהמשך
-        }
+        """
+        רישום מנועי ה-Scraping של החנויות הפעילות (לפי Config.ACTIVE_STORES ו-entry points).
+        כל scraper נוצר רק בחיפוש הראשון בחנות שלו
+        """
+        start_time = time.perf_counter()
+        self.scrapers = create_scrapers()
+        logger.info(f"Loaded {len(self.scrapers)} scrapers in {(time.perf_counter() - start_time) * 1000:.1f}ms")
+    
+    def reload_scrapers(self):
+        """
+        רישום מחדש של החנויות לפי ההגדרות הנוכחיות - חנות שנשארה שומרת את
+        ה-scraper ואת הדפדפנים החמים שלה ומקבלת רק את ההגדרות החדשות
+        """
+        current = self.scrapers
+        scrapers = {}
+        for store_name, handle in create_scrapers().items():
+            existing = current.get(store_name)
+            if isinstance(existing, ScraperHandle):
+                existing.update_options(handle.options)
+                handle = existing
+            scrapers[store_name] = handle
+        
+        # החלפה בבת אחת - חיפוש שכבר רץ ממשיך עם הרשימה שהתחיל איתה
+        self.scrapers = dict(sorted(scrapers.items(), key=lambda item: item[1].priority))
+        self._store_status = None
+        
+        for store_name, scraper in current.items():
+            if store_name not in self.scrapers and getattr(scraper, 'close', None):
+                scraper.close()
+                logger.info(f"Disabled {store_name} scraper")
+    
+    def apply_runtime_config(self, changes: Dict):
+        """שינוי הגדרות בזמן ריצה (נקרא מ-core/runtime_config.py) - בקרת עומס, מטמון, חנויות ודפדפנים"""
+        if {'MAX_CONCURRENT_SCRAPES', 'SCRAPE_QUEUE_SIZE', 'SCRAPE_QUEUE_TIMEOUT'} & set(changes):
+            self.admission.configure(Config.MAX_CONCURRENT_SCRAPES, Config.SCRAPE_QUEUE_SIZE,
+                                     Config.SCRAPE_QUEUE_TIMEOUT)
+        
+        if 'CACHE_DURATION' in changes and self.result_cache:
+            self.result_cache.ttl = Config.CACHE_DURATION
         
-        for store_name, scraper_class in scraper_classes.items():
-            if Config.is_store_enabled(store_name):
+        if any(name.startswith('stores.') for name in changes):
+            self.reload_scrapers()
+        
+        if 'DRIVER_POOL_SIZE' in changes:
+            for scraper in self.scrapers.values():
+                if getattr(scraper, 'created', False):
+                    scraper.trim_driver_pool()
+    
+    def warm_up(self):
+        """
+        חימום אחרי הפעלה (בכל worker אחרי fork) - פתיחת דפדפנים מראש וטעינת
+        השאילתות הפופולריות מהקטלוג, כדי שהבקשות הראשונות לא ישלמו על זה
+        """
+        start_time = time.time()
+        for store_name, scraper in self.scrapers.items():
+            warm_up = getattr(scraper, 'warm_up', None)
+            if not warm_up:
+                continue
+            try:
+                warm_up()
+            except Exception as e:
+                logger.error(f"Failed to warm up {store_name} scraper: {e}")
+        
+        if self.catalog and self.stats:
+            try:
+                for row in self.stats.top_queries(Config.WARMUP_TOP_QUERIES):
+                    self.catalog.search(row['query'], limit=Config.MAX_RANKED_RESULTS)
+            except Exception as e:
+                logger.error(f"Failed to warm up catalog: {e}")
+        
+        logger.info(f"Warm-up finished in {time.time() - start_time:.2f}s")
+    
+    def close(self):
+        """סגירה מסודרת - כתיבת מה שנשאר בזיכרון וסגירת דפדפנים וחיבורים"""
+        unsubscribe(self.apply_runtime_config)
+        if self.prescraper:
+            self.prescraper.stop()
+        self.scheduler.shutdown()
+        for storage in (self.stats, self.price_history, self.watchlist):
+            if storage:
                 try:
-                    self.scrapers[store_name] = scraper_class()
-                    logger.info(f"Initialized {store_name} scraper")
+                    storage.flush()
                 except Exception as e:
-                    logger.error(f"Failed to initialize {store_name} scraper: {e}")
+                    logger.error(f"Failed to flush {storage.__class__.__name__}: {e}")
+        
+        for scraper in self.scrapers.values():
+            close = getattr(scraper, 'close', None)
+            if close:
+                close()
+        
+        close_connections()
     
-    def search_all_stores(self, query: str, max_results_per_store: int = 5) -> Dict:
+    def search_all_stores(self, query: str, max_results_per_store: int = 5,
+                          rank_by: str = None, top_k: Optional[int] = None,
+                          track_stats: bool = True, use_cache: bool = True,
+                          on_store_results: Optional[Callable[[str, List[Dict]], None]] = None,
+                          fallback: bool = True, priority: str = INTERACTIVE) -> Dict:
         """
         חיפוש מוצר בכל החנויות
         
         Args:
             query: מחרוזת החיפוש
             max_results_per_store: מספר תוצאות מקסימלי לכל חנות
+            rank_by: מפתח דירוג (price / price_per_unit / availability_first)
+            top_k: מספר התוצאות המדורגות שיוחזרו (None = ברירת המחדל מההגדרות)
+            track_stats: האם לספור את החיפוש בסטטיסטיקות (לא עבור רענון ברקע)
+            use_cache: האם להחזיר תוצאות מהמטמון אם יש (False = תמיד חיפוש חי)
+            on_store_results: נקרא עם (חנות, מוצרים) כשכל חנות מסיימת - לתוצאות חלקיות
+            fallback: כשאין מקום לסריקה - להחזיר תוצאות ישנות מהמטמון או מהקטלוג
+            priority: מחלקת העדיפות של הסריקות במתזמן (core/scheduler.py)
             
         Returns:
             Dictionary עם תוצאות החיפוש
+            
+        Raises:
+            CapacityExceeded: כשאין מקום לסריקה ואין תוצאות חלופיות
+        """
+        cache_key = self.cache_key(query, max_results_per_store, rank_by, top_k)
+        if use_cache and self.result_cache:
+            cached = self.result_cache.get(cache_key, grace=Config.CACHE_STALE_GRACE)
+            if cached is not None:
+                cached['query'] = query  # הרשומה משותפת לכל הכתיבים - מוצג מה שהמשתמש כתב
+                if cached['cache']['stale']:
+                    # stale-while-revalidate - התוצאה הישנה עכשיו, סריקה אחת ברקע מעדכנת אותה
+                    cached['stale'] = True
+                    self.refresh_in_background(query, max_results_per_store, rank_by, top_k)
+                    with self._refresh_lock:
+                        cached['refreshing'] = cache_key in self._refreshing
+                    logger.info(f"Stale cache hit for: '{query}' (expired {cached['cache']['stale_for']}s ago)")
+                else:
+                    logger.info(f"Cache hit for: '{query}'")
+                if track_stats:
+                    self._record_stats(cached)
+                return cached
+        
+        try:
+            with self.admission.slot():
+                results = self._scrape_stores(query, max_results_per_store, rank_by, top_k, on_store_results,
+                                              priority)
+        except CapacityExceeded as e:
+            degraded = self._fallback_results(query, cache_key, rank_by, top_k, e) if fallback else None
+            if degraded is None:
+                raise
+            if track_stats:
+                self._record_stats(degraded)
+            return degraded
+        
+        self._save_results(query, cache_key, results, track_stats)
+        logger.info(f"Search completed: {results['total_products']} products in {results['search_time']}s")
+        return results
+    
+    def _save_results(self, query: str, cache_key: str, results: Dict, track_stats: bool):
+        """תוצאות של סריקה חיה - למטמון, לקטלוג, להיסטוריית המחירים ולסטטיסטיקות"""
+        if self.result_cache and (results['products'] or not results['errors']):
+            self.result_cache.put(cache_key, results)
+        self._index_results(query, results['products'])
+        self._record_history(results['products'])
+        self._check_watches(query, results['products'])
+        if track_stats:
+            self._record_stats(results)
+    
+    def search_many(self, queries: List[str], max_results_per_store: int = 5, rank_by: str = None,
+                    top_k: Optional[int] = None, use_cache: bool = True,
+                    track_stats: bool = True) -> Iterator[Dict]:
         """
+        חיפוש של הרבה שאילתות (תמחור של רשימת מוצרים)
+        
+        שאילתות עם אותה צורה קנונית נסרקות פעם אחת. הסריקות עוברות במתזמן
+        בעדיפות batch - בכל חנות לכל היותר ה-concurrency שלה פחות
+        SCHEDULER_RESERVED_SLOTS במקביל, וכל חנות מתקדמת בקצב שלה, כך שחנות
+        איטית לא מעכבת את האחרות וחיפושים של משתמשים עוקפים את הרשימה
+        
+        Args:
+            queries: מחרוזות החיפוש (הסדר נשמר ב-index)
+            max_results_per_store / rank_by / top_k / use_cache / track_stats: כמו ב-search_all_stores
+            
+        Yields:
+            {'index', 'query', 'results'} לכל שאילתה ברשימה, לפי סדר הסיום
+        """
+        groups = {}  # מפתח מטמון -> מיקומי השאילתות ברשימה
+        for index, query in enumerate(queries):
+            groups.setdefault(self.cache_key(query, max_results_per_store, rank_by, top_k), []).append(index)
+        
+        pending = {}
+        for key, indexes in groups.items():
+            cached = self.result_cache.get(key) if use_cache and self.result_cache else None
+            if cached is None:
+                pending[key] = indexes
+                continue
+            if track_stats:
+                self._record_stats(cached)
+            yield from self._batch_items(queries, indexes, cached)
+        
+        if not pending:
+            return
+        
+        scrapers = self.scrapers
+        logger.info(f"Batch search: {len(queries)} queries, {len(pending)} to scrape in {len(scrapers)} stores")
+        
+        state = {}
+        for key, indexes in pending.items():
+            results = self._new_results(queries[indexes[0]], rank_by, source='live')
+            state[key] = {
+                'results': results,
+                'aggregator': ResultAggregator(results['rank_by'], top_k or Config.MAX_RANKED_RESULTS),
+                'remaining': len(scrapers),
+                'start_time': time.time()
+            }
+        
+        done_queue = queue.Queue()
+        stop = threading.Event()
+        futures = []
+        backlog = {store_name: deque(pending) for store_name in scrapers}
+        # (מפתח, חנות) -> (future, מועד אחרון, זמן ההמתנה) - לכל זוג בדיוק תוצאה אחת בתור
+        inflight = {}
+        inflight_lock = threading.Lock()
+        
+        def feed(store_name, scraper):
+            """הגשת השאילתה הבאה של החנות למתזמן (בכל חנות יש לכל היותר workers בתור)"""
+            while not stop.is_set():
+                try:
+                    key = backlog[store_name].popleft()
+                except IndexError:
+                    return
+                query = state[key]['results']['query']
+                try:
+                    future = self._submit_store(store_name, scraper, BATCH, scraper.search_product,
+                                                query, max_results_per_store)
+                except (CapacityExceeded, RuntimeError) as e:
+                    # תור מלא / המתזמן נסגר - שגיאה לשאילתה הזו וממשיכים
+                    done_queue.put((key, store_name, [], e))
+                    continue
+                timeout = getattr(scraper, 'timeout', Config.STORE_DEFAULTS['timeout'])
+                with inflight_lock:
+                    inflight[(key, store_name)] = (future, time.time() + timeout, timeout)
+                futures.append(future)
+                future.add_done_callback(lambda f, key=key: on_done(f, key, store_name, scraper))
+                return
+        
+        def on_done(future, key, store_name, scraper):
+            with inflight_lock:
+                current = inflight.get((key, store_name))
+                if current is None or current[0] is not future:
+                    # כבר נרשמה כחריגה מהזמן והחנות עברה לשאילתה הבאה
+                    return
+                del inflight[(key, store_name)]
+            
+            if future.cancelled():
+                error = CancelledError(f'search in {store_name} was cancelled')
+            else:
+                error = future.exception()
+            if isinstance(error, Preempted):
+                # נדחקה מהתור לטובת חיפוש של משתמש - חוזרת לראש הרשימה של החנות
+                backlog[store_name].appendleft(key)
+            else:
+                done_queue.put((key, store_name, [] if error else future.result() or [], error))
+            feed(store_name, scraper)
+        
+        def expire() -> Optional[float]:
+            """
+            סריקות שחרגו מזמן ההמתנה של החנות נרשמות כשגיאה והחנות ממשיכה
+            לשאילתה הבאה. מחזיר את המועד האחרון הקרוב של מה שעוד רץ
+            """
+            now = time.time()
+            with inflight_lock:
+                expired = [(pair, entry) for pair, entry in inflight.items() if entry[1] <= now]
+                for pair, _ in expired:
+                    del inflight[pair]
+            for (key, store_name), (future, _, timeout) in expired:
+                future.cancel()
+                done_queue.put((key, store_name, [], TimeoutError(f'timed out after {timeout:g}s')))
+                feed(store_name, scrapers[store_name])
+            with inflight_lock:
+                return min((entry[1] for entry in inflight.values()), default=None)
+        
+        with ExitStack() as stack:
+            for store_name, scraper in scrapers.items():
+                concurrency = getattr(scraper, 'options', {}).get('concurrency', 1)
+                workers = min(max(concurrency - Config.SCHEDULER_RESERVED_SLOTS, 1), len(pending))
+                hold_drivers = getattr(scraper, 'hold_drivers', None)
+                if hold_drivers:
+                    stack.enter_context(hold_drivers(workers))
+                for _ in range(workers):
+                    feed(store_name, scraper)
+            
+            try:
+                for key in self._collect_batch(state, done_queue, scrapers, expire):
+                    entry = state.pop(key)
+                    results = entry['results']
+                    self._finalize_results(results, entry['aggregator'], entry['start_time'])
+                    self._save_results(results['query'], key, results, track_stats)
+                    yield from self._batch_items(queries, pending[key], results)
+            finally:
+                # הלקוח התנתק / סיום - מה שעוד בתור מבוטל, סריקות שרצות מסתיימות
+                stop.set()
+                for future in futures:
+                    future.cancel()
+    
+    def _collect_batch(self, state: Dict, done_queue: queue.Queue, scrapers: Dict,
+                       expire: Callable[[], Optional[float]]) -> Iterator[str]:
+        """
+        תוצאות החנויות מה-workers - מחזיר כל מפתח ברגע שכל החנויות סיימו אותו.
+        ההמתנה עד המועד האחרון הקרוב, כך שסריקה תקועה לא עוצרת את כל הרשימה
+        """
+        if not scrapers:
+            yield from list(state)
+            return
+        
+        while any(entry['remaining'] for entry in state.values()):
+            deadline = expire()
+            try:
+                timeout = None if deadline is None else max(deadline - time.time(), 0) + 0.01
+                key, store_name, products, error = done_queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            entry = state[key]
+            entry['results']['stores_searched'].append(store_name)
+            if error:
+                error_msg = f"Error searching {store_name}: {str(error)}"
+                logger.error(error_msg)
+                entry['results']['errors'].append(error_msg)
+            elif products:
+                entry['aggregator'].add(products)
+            
+            entry['remaining'] -= 1
+            if not entry['remaining']:
+                yield key
+    
+    def _batch_items(self, queries: List[str], indexes: List[int], results: Dict) -> Iterator[Dict]:
+        """פריט תוצאה לכל שאילתה ברשימה (כל אחת עם הכתיב המקורי שלה)"""
+        for index in indexes:
+            yield {'index': index, 'query': queries[index], 'results': dict(results, query=queries[index])}
+    
+    def _scrape_stores(self, query: str, max_results_per_store: int, rank_by: Optional[str],
+                       top_k: Optional[int], on_store_results=None, priority: str = INTERACTIVE) -> Dict:
+        """הסריקה עצמה - כל החנויות במקביל דרך המתזמן (רץ רק בתוך מקום שהתקבל מבקרת העומס)"""
         logger.info(f"Starting search for: '{query}'")
         start_time = time.time()
         
-        results = {
-            'query': query,
-            'search_time': None,
-            'stores_searched': [],
-            'total_products': 0,
-            'products': [],
-            'best_deal': None,
-            'errors': []
-        }
+        results = self._new_results(query, rank_by, source='live')
         
-        # ביצוע חיפוש במקביל
-        with ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
-            future_to_store = {
-                executor.submit(self._search_single_store, store_name, scraper, query, max_results_per_store): store_name
-                for store_name, scraper in self.scrapers.items()
-            }
+        # הדירוג מתעדכן בכל פעם שחנות מסיימת - בלי מיון מלא בסוף
+        aggregator = ResultAggregator(results['rank_by'], top_k or Config.MAX_RANKED_RESULTS)
+        
+        # ביצוע חיפוש במקביל - לפי סדר העדיפות, ולכל חנות זמן המתנה משלה
+        future_to_store = {}
+        deadlines = {}
+        try:
+            for store_name, scraper in self.scrapers.items():
+                timeout = getattr(scraper, 'timeout', Config.STORE_DEFAULTS['timeout'])
+                try:
+                    future = self._submit_store(store_name, scraper, priority, self._search_single_store,
+                                                store_name, scraper, query, max_results_per_store)
+                except CapacityExceeded as e:
+                    results['stores_searched'].append(store_name)
+                    results['errors'].append(f"Error searching {store_name}: {e}")
+                    continue
+                future_to_store[future] = store_name
+                deadlines[future] = (time.time() + timeout, timeout)
             
-            for future in as_completed(future_to_store):
-                store_name = future_to_store[future]
-                results['stores_searched'].append(store_name)
+            pending = set(future_to_store)
+            while pending:
+                done, pending = wait(pending, timeout=max(min(deadlines[f][0] for f in pending) - time.time(), 0),
+                                     return_when=FIRST_COMPLETED)
                 
-                try:
-                    store_products = future.result(timeout=30)  # מקסימום 30 שניות לכל חנות
+                for future in done:
+                    store_name = future_to_store[future]
+                    results['stores_searched'].append(store_name)
                     
-                    if store_products:
-                        results['products'].extend(store_products)
-                        logger.info(f"Found {len(store_products)} products in {store_name}")
-                    else:
-                        logger.warning(f"No products found in {store_name}")
+                    try:
+                        store_products = future.result()
                         
-                except Exception as e:
-                    error_msg = f"Error searching {store_name}: {str(e)}"
+                        if store_products:
+                            aggregator.add(store_products)
+                            logger.info(f"Found {len(store_products)} products in {store_name}")
+                        else:
+                            logger.warning(f"No products found in {store_name}")
+                        
+                        if on_store_results:
+                            on_store_results(store_name, store_products or [])
+                            
+                    except Exception as e:
+                        error_msg = f"Error searching {store_name}: {str(e)}"
+                        logger.error(error_msg)
+                        results['errors'].append(error_msg)
+                
+                # חנות שחרגה מהזמן שלה לא מעכבת את השאר (סריקה שכבר רצה ממשיכה ברקע)
+                now = time.time()
+                for future in [f for f in pending if deadlines[f][0] <= now]:
+                    pending.discard(future)
+                    store_name = future_to_store[future]
+                    results['stores_searched'].append(store_name)
+                    error_msg = f"Error searching {store_name}: timed out after {deadlines[future][1]:g}s"
                     logger.error(error_msg)
                     results['errors'].append(error_msg)
+        finally:
+            # מה שעוד לא התחיל יוצא מהתור של החנות
+            for future in future_to_store:
+                future.cancel()
         
-        # סיכום התוצאות
-        results['total_products'] = len(results['products'])
-        results['search_time'] = round(time.time() - start_time, 2)
+        self._finalize_results(results, aggregator, start_time)
+        return results
+    
+    def _fallback_results(self, query: str, cache_key: str, rank_by: Optional[str],
+                          top_k: Optional[int], error: CapacityExceeded) -> Optional[Dict]:
+        """תוצאות חלופיות כשהמערכת עמוסה - רשומת מטמון שפג תוקפה, או הקטלוג המקומי"""
+        results = self.result_cache.get_stale(cache_key) if self.result_cache else None
+        if results is not None:
+            results['query'] = query
+        if results is None and self.catalog:
+            results = self.search_catalog(query, top_k or Config.MAX_RANKED_RESULTS, rank_by,
+                                          refresh=False, track_stats=False)
+            if not results['products']:
+                results = None
         
-        # מציאת העסקה הטובה ביותר
-        if results['products']:
-            results['best_deal'] = self._find_best_deal(results['products'])
-            results['products'] = self._sort_products_by_price(results['products'])
+        if results is None:
+            logger.warning(f"Over capacity and no fallback for '{query}'")
+            return None
         
-        logger.info(f"Search completed: {results['total_products']} products in {results['search_time']}s")
+        logger.warning(f"Over capacity - serving {results['source']} results for '{query}'")
+        results['degraded'] = True
+        results['retry_after'] = error.retry_after
         return results
     
+    def search_catalog(self, query: str, max_results: int = 20, rank_by: str = None,
+                       refresh: bool = True, track_stats: bool = True) -> Dict:
+        """
+        חיפוש מיידי בקטלוג המקומי, בלי לפנות לחנויות
+        
+        Args:
+            query: מחרוזת החיפוש
+            max_results: מספר תוצאות מקסימלי
+            rank_by: מפתח דירוג
+            refresh: אם הנתונים ישנים - לרענן מהחנויות ברקע
+            track_stats: האם לספור את החיפוש בסטטיסטיקות
+            
+        Returns:
+            Dictionary באותו מבנה של search_all_stores, עם freshness
+        """
+        start_time = time.time()
+        results = self._new_results(query, rank_by, source='catalog')
+        aggregator = ResultAggregator(results['rank_by'], max_results)
+        
+        if self.catalog:
+            hit = self.catalog.search(query, limit=max_results, max_age=Config.CATALOG_MAX_AGE)
+            aggregator.add(hit['products'])
+            results['freshness'] = hit['freshness']
+            results['stores_searched'] = sorted({p['store'] for p in hit['products']})
+        else:
+            results['errors'].append('Catalog index is disabled')
+        
+        self._finalize_results(results, aggregator, start_time)
+        if track_stats:
+            self._record_stats(results)
+        
+        age = (results.get('freshness') or {}).get('query_age_seconds')
+        if refresh and (age is None or age > Config.CATALOG_REFRESH_AFTER):
+            results['refreshing'] = self.refresh_in_background(query)
+        
+        logger.info(f"Catalog search: {results['total_products']} products in {results['search_time']}s")
+        return results
+    
+    def refresh_in_background(self, query: str, max_results_per_store: int = 5, rank_by: str = None,
+                              top_k: Optional[int] = None) -> bool:
+        """
+        הפעלת חיפוש חי ברקע לעדכון המטמון והקטלוג - לכל היותר אחד לכל מפתח
+        מטמון (כל הכתיבים של אותה שאילתה קנונית)
+        
+        Returns:
+            האם הופעל רענון עכשיו (False אם כבר רץ אחד)
+        """
+        key = self.cache_key(query, max_results_per_store, rank_by, top_k)
+        with self._refresh_lock:
+            if key in self._refreshing or not self.scrapers:
+                return False
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                self.search_all_stores(query, max_results_per_store, rank_by, top_k, track_stats=False,
+                                       use_cache=False, fallback=False, priority=REFRESH)
+            except CapacityExceeded:
+                logger.info(f"Skipped background refresh for '{query}' - over capacity")
+            except Exception as e:
+                logger.error(f"Background refresh failed for '{query}': {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        threading.Thread(target=refresh, name=f'refresh-{query}', daemon=True).start()
+        return True
+    
+    def cache_key(self, query: str, max_results_per_store: int = 5, rank_by: str = None,
+                  top_k: Optional[int] = None) -> str:
+        """מפתח מטמון - הצורה הקנונית של השאילתה וכל מה שמשפיע על התוצאות"""
+        return '|'.join([
+            query_key(query),
+            str(max_results_per_store),
+            rank_by or Config.DEFAULT_RANK_KEY,
+            str(top_k or Config.MAX_RANKED_RESULTS),
+            ','.join(sorted(self.scrapers))
+        ])
+    
+    def peek_cached(self, query: str, max_results_per_store: int = 5, rank_by: str = None,
+                    top_k: Optional[int] = None) -> Optional[Dict]:
+        """פרטי רשומת מטמון בתוקף (ETag, תוקף) בלי לחפש - לבקשות מותנות"""
+        if not self.result_cache:
+            return None
+        return self.result_cache.peek_info(self.cache_key(query, max_results_per_store, rank_by, top_k))
+    
+    def _new_results(self, query: str, rank_by: Optional[str], source: str) -> Dict:
+        """מבנה תוצאות ריק"""
+        return {
+            'query': query,
+            'canonical_query': query_key(query),
+            'source': source,
+            'search_time': None,
+            'stores_searched': [],
+            'total_products': 0,
+            'products': [],
+            'best_deal': None,
+            'rank_by': rank_by or Config.DEFAULT_RANK_KEY,
+            'errors': []
+        }
+    
+    def _finalize_results(self, results: Dict, aggregator: ResultAggregator, start_time: float):
+        """סיכום התוצאות, קיבוץ מוצרים זהים ומציאת העסקה הטובה ביותר"""
+        results['products'] = aggregator.ranked()
+        results['total_products'] = len(results['products'])
+        results['total_found'] = aggregator.total_seen
+        results['search_time'] = round(time.time() - start_time, 2)
+        
+        results['product_groups'] = self.product_matcher.group_products(results['products'])
+        results['best_deal'] = self.product_matcher.best_deal(results['product_groups'])
+    
+    def _index_results(self, query: str, products: List[Dict]):
+        """שמירת המוצרים שנסרקו בקטלוג המקומי"""
+        if not self.catalog:
+            return
+        try:
+            self.catalog.upsert_products(products, query)
+        except Exception as e:
+            logger.error(f"Failed to index results for '{query}': {e}")
+    
+    def _record_history(self, products: List[Dict]):
+        """הוספת המחירים שנסרקו להיסטוריית המחירים"""
+        if not self.price_history:
+            return
+        try:
+            self.price_history.record(products)
+        except Exception as e:
+            logger.error(f"Failed to record price history: {e}")
+    
+    def _check_watches(self, query: str, products: List[Dict]):
+        """המחירים החדשים מול רשימות המעקב (התראות ירידת מחיר)"""
+        if not self.watchlist:
+            return
+        try:
+            self.watchlist.evaluate(products, query)
+        except Exception as e:
+            logger.error(f"Failed to check watches for '{query}': {e}")
+    
+    def _record_stats(self, results: Dict):
+        """עדכון סטטיסטיקות החיפוש (וספירת הפופולריות לסריקה המוקדמת)"""
+        if self.prescraper:
+            self.prescraper.record(results.get('query', ''))
+        if not self.stats:
+            return
+        try:
+            self.stats.record_search(results)
+        except Exception as e:
+            logger.error(f"Failed to record search stats: {e}")
+    
+    def get_stats(self) -> Dict:
+        """סטטיסטיקות לעמוד הבית - מהזיכרון, בלי שאילתה"""
+        stats = self.stats.snapshot() if self.stats else {'total_searches': 0, 'average_savings': 0}
+        stats['active_stores'] = len(self.scrapers)
+        if self.prescraper:
+            stats['prescraper'] = self.prescraper.stats()
+        stats['scheduler'] = self.scheduler.stats()
+        stats['details'] = self.enricher.stats()
+        if self.watchlist:
+            stats['watchlist'] = self.watchlist.stats()
+        return stats
+    
+    def get_price_history(self, url: str, store: Optional[str] = None, days: int = 90) -> List[Dict]:
+        """היסטוריית המחירים של מוצר (לגרפים ולזיהוי ירידות מחיר)"""
+        if not self.price_history:
+            return []
+        return self.price_history.get_history(url, store, start=time.time() - days * 86400)
+    
+    def _submit_store(self, store_name: str, scraper, priority: str, fn: Callable, *args):
+        """משימה לתור של החנות במתזמן, לפי ה-concurrency שלה מההגדרות"""
+        concurrency = getattr(scraper, 'options', {}).get('concurrency', Config.STORE_DEFAULTS['concurrency'])
+        return self.scheduler.submit(store_name, priority, fn, *args, concurrency=concurrency)
+    
     def _search_single_store(self, store_name: str, scraper, query: str, max_results: int) -> List[Dict]:
         """חיפוש בחנות בודדת"""
         try:
@@ -114,50 +673,44 @@ class PriceFinder:
             logger.error(f"Failed to search {store_name}: {e}")
             return []
     
-    def _find_best_deal(self, products: List[Dict]) -> Optional[Dict]:
-        """מציאת העסקה הטובה ביותר"""
-        if not products:
-            return None
-        
-        # מיון לפי מחיר (הכי זול קודם)
-        sorted_products = sorted(products, key=lambda p: p.get('price', float('inf')))
-        best_product = sorted_products[0]
-        
-        # הוספת מידע על החיסכון
-        if len(sorted_products) > 1:
-            most_expensive = sorted_products[-1]
-            savings = most_expensive['price'] - best_product['price']
-            best_product['savings'] = savings
-            best_product['savings_percent'] = round((savings / most_expensive['price']) * 100, 1)
-        
-        return best_product
-    
-    def _sort_products_by_price(self, products: List[Dict]) -> List[Dict]:
-        """מיון מוצרים לפי מחיר"""
-        return sorted(products, key=lambda p: p.get('price', float('inf')))
-    
     def get_store_status(self) -> Dict:
-        """קבלת סטטוס כל החנויות"""
+        """קבלת סטטוס כל החנויות (נשמר ל-STORE_STATUS_TTL שניות)"""
+        if self._store_status and time.time() - self._store_status[0] < Config.STORE_STATUS_TTL:
+            return self._store_status[1]
+        
         status = {}
         
+        # בדיקות הזמינות במקביל, בעדיפות הנמוכה ביותר - לא על חשבון חיפושים
+        probes = {}
         for store_name, scraper in self.scrapers.items():
             try:
-                is_available = scraper.is_available()
+                probes[store_name] = (self._submit_store(store_name, scraper, PROBE, scraper.is_available),
+                                      time.time() + getattr(scraper, 'timeout', Config.STORE_DEFAULTS['timeout']))
+            except Exception as e:
+                status[store_name] = {'name': store_name, 'available': False, 'error': str(e)}
+        
+        for store_name, (future, deadline) in probes.items():
+            scraper = self.scrapers[store_name]
+            try:
+                is_available = future.result(timeout=max(deadline - time.time(), 0))
                 status[store_name] = {
                     'name': scraper.config['name'],
                     'available': is_available,
                     'url': scraper.base_url
                 }
             except Exception as e:
+                future.cancel()
                 status[store_name] = {
                     'name': store_name,
                     'available': False,
-                    'error': str(e)
+                    'error': str(e) or 'timed out'
                 }
         
+        self._store_status = (time.time(), status)
         return status
     
-    def search_specific_stores(self, query: str, store_names: List[str], max_results: int = 5) -> Dict:
+    def search_specific_stores(self, query: str, store_names: List[str], max_results: int = 5,
+                               rank_by: str = None, top_k: Optional[int] = None) -> Dict:
         """חיפוש בחנויות ספציפיות בלבד"""
         # סינון החנויות המבוקשות
         filtered_scrapers = {
@@ -178,7 +731,7 @@ class PriceFinder:
         
         try:
             # ביצוע החיפוש
-            results = self.search_all_stores(query, max_results)
+            results = self.search_all_stores(query, max_results, rank_by, top_k)
             return results
         finally:
             # החזרת הscrpers המקוריים
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+היסטוריית מחירים - סדרות זמן לכל (חנות, קישור מוצר)
+תצפיות נכתבות באצוות, מחיר שלא השתנה לא נשמר שוב,
+ותצפיות ישנות נדחסות לשורה יומית של מינימום/מקסימום/סגירה
+"""
+
+import time
+import atexit
+import logging
+import threading
+from typing import List, Dict, Optional, Iterable, Tuple
+
+from config import Config
+from .database import get_connection
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_series (
+    id INTEGER PRIMARY KEY,
+    store TEXT NOT NULL,
+    url TEXT NOT NULL,
+    name TEXT,
+    last_price REAL,
+    last_availability TEXT,
+    last_observed REAL,
+    UNIQUE (store, url)
+);
+
+CREATE INDEX IF NOT EXISTS price_series_url ON price_series (url);
+
+CREATE TABLE IF NOT EXISTS price_observations (
+    series_id INTEGER NOT NULL,
+    observed_at REAL NOT NULL,
+    price REAL NOT NULL,
+    availability TEXT,
+    PRIMARY KEY (series_id, observed_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS price_daily (
+    series_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    min_price REAL NOT NULL,
+    max_price REAL NOT NULL,
+    close_price REAL NOT NULL,
+    close_at REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (series_id, day)
+) WITHOUT ROWID;
+"""
+
+
+class PriceHistory:
+    """מאגר היסטוריית מחירים עם כתיבה באצוות ודחיסה יומית"""
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.batch_size = batch_size or Config.PRICE_HISTORY_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.PRICE_HISTORY_FLUSH_INTERVAL
+
+        self._buffer: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.time()
+        # מזהי הסדרות: (store, url) -> series_id. המחיר האחרון לא נשמר כאן - תהליכים
+        # אחרים (workers, סורק הקטגוריות) כותבים לאותו DB, ולכן הוא נקרא בכל כתיבה
+        self._series: Dict[Tuple[str, str], int] = {}
+
+        self.connection.executescript(SCHEMA)
+        atexit.register(self.flush)
+
+    @property
+    def connection(self):
+        return get_connection(self.db_path)
+
+    # ===== כתיבה =====
+
+    def record(self, products: Iterable[Dict]):
+        """הוספת תצפיות לחוצץ - נכתבות ל-SQLite באצוות"""
+        with self._lock:
+            for product in products:
+                if not product or not product.get('url') or product.get('price') is None:
+                    continue
+                self._buffer.append((
+                    product.get('store') or '',
+                    product['url'],
+                    product.get('name'),
+                    float(product['price']),
+                    product.get('availability'),
+                    product.get('last_updated') or time.time()
+                ))
+
+            should_flush = (len(self._buffer) >= self.batch_size
+                            or time.time() - self._last_flush >= self.flush_interval)
+
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> int:
+        """כתיבת החוצץ - מדלג על מחירים שלא השתנו. מחזיר כמה תצפיות נכתבו"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            self._last_flush = time.time()
+
+        if not batch:
+            return 0
+
+        observations = []
+        # המצב האחרון של כל סדרה שנגענו בה: series_id -> (price, availability, observed_at, series_id)
+        touched = {}
+        # המצב של כל סדרה בחוצץ: (store, url) -> (series_id, price, availability)
+        states = {}
+        with self.connection as conn:
+            if not conn.in_transaction:
+                # נעילת כתיבה מההתחלה - המחיר האחרון שנקרא לא משתנה בתהליך אחר עד ה-commit
+                conn.execute('BEGIN IMMEDIATE')
+            for store, url, name, price, availability, observed_at in sorted(batch, key=lambda o: o[5]):
+                state = states.get((store, url)) or self._get_series(conn, store, url, name)
+                series_id, last_price, last_availability = state
+
+                if price != last_price or availability != last_availability:
+                    observations.append((series_id, observed_at, price, availability))
+                    last_price, last_availability = price, availability
+
+                states[(store, url)] = (series_id, last_price, last_availability)
+                touched[series_id] = (last_price, last_availability, observed_at, series_id)
+
+            conn.executemany("""
+                INSERT OR REPLACE INTO price_observations (series_id, observed_at, price, availability)
+                VALUES (?, ?, ?, ?)
+            """, observations)
+
+            # תהליך אחר שכבר כתב תצפית מאוחרת יותר נשאר המצב האחרון
+            conn.executemany("""
+                UPDATE price_series
+                SET last_price = ?1, last_availability = ?2, last_observed = ?3
+                WHERE id = ?4 AND (last_observed IS NULL OR last_observed <= ?3)
+            """, touched.values())
+
+        # רק אחרי ה-commit - מזהה של סדרה שנוצרה בטרנזקציה שבוטלה לא נשמר
+        if len(self._series) + len(states) > Config.PRICE_HISTORY_SERIES_CACHE:
+            self._series.clear()
+        self._series.update((key, state[0]) for key, state in states.items())
+
+        logger.debug(f"Price history: {len(observations)} new observations out of {len(batch)}")
+        return len(observations)
+
+    def _get_series(self, conn, store: str, url: str, name: Optional[str]) -> Tuple[int, Optional[float], Optional[str]]:
+        """מזהה הסדרה והמצב האחרון שלה מה-DB (בתוך הטרנזקציה של flush) - סדרה חדשה נוצרת"""
+        series_id = self._series.get((store, url))
+        if series_id is not None:
+            row = conn.execute('SELECT id, last_price, last_availability FROM price_series WHERE id = ?',
+                               (series_id,)).fetchone()
+        else:
+            row = conn.execute(
+                'SELECT id, last_price, last_availability FROM price_series WHERE store = ? AND url = ?',
+                (store, url)
+            ).fetchone()
+
+        if row:
+            return row['id'], row['last_price'], row['last_availability']
+
+        cursor = conn.execute(
+            'INSERT INTO price_series (store, url, name) VALUES (?, ?, ?)',
+            (store, url, name)
+        )
+        return cursor.lastrowid, None, None
+
+    # ===== דחיסה =====
+
+    def compact(self, older_than_days: Optional[int] = None) -> int:
+        """
+        דחיסת תצפיות ישנות לשורה יומית (מינימום / מקסימום / סגירה)
+
+        Returns:
+            מספר התצפיות שנדחסו
+        """
+        older_than_days = older_than_days or Config.PRICE_HISTORY_RAW_DAYS
+        cutoff_day = int(time.time() // SECONDS_PER_DAY) - older_than_days
+        cutoff = cutoff_day * SECONDS_PER_DAY
+
+        with self.connection as conn:
+            conn.execute("""
+                INSERT INTO price_daily
+                    (series_id, day, min_price, max_price, close_price, close_at, samples)
+                SELECT series_id, day, MIN(price), MAX(price), close_price, MAX(observed_at), COUNT(*)
+                FROM (
+                    SELECT series_id, price, observed_at,
+                           CAST(observed_at / ? AS INTEGER) AS day,
+                           FIRST_VALUE(price) OVER (
+                               PARTITION BY series_id, CAST(observed_at / ? AS INTEGER)
+                               ORDER BY observed_at DESC
+                           ) AS close_price
+                    FROM price_observations
+                    WHERE observed_at < ?
+                )
+                WHERE true
+                GROUP BY series_id, day
+                ON CONFLICT (series_id, day) DO UPDATE SET
+                    min_price = MIN(min_price, excluded.min_price),
+                    max_price = MAX(max_price, excluded.max_price),
+                    close_price = CASE WHEN excluded.close_at >= close_at
+                                       THEN excluded.close_price ELSE close_price END,
+                    close_at = MAX(close_at, excluded.close_at),
+                    samples = samples + excluded.samples
+            """, (SECONDS_PER_DAY, SECONDS_PER_DAY, cutoff))
+
+            deleted = conn.execute(
+                'DELETE FROM price_observations WHERE observed_at < ?', (cutoff,)
+            ).rowcount
+
+        logger.info(f"Compacted {deleted} price observations older than {older_than_days} days")
+        return deleted
+
+    # ===== קריאה =====
+
+    def get_history(self, url: str, store: Optional[str] = None,
+                    start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """
+        היסטוריית מחירים של מוצר בטווח זמן
+
+        ימים שנדחסו מוחזרים כנקודה יומית עם min/max, והתקופה האחרונה
+        כתצפיות גולמיות. התוצאה ממוינת לפי זמן.
+        """
+        self.flush()
+        start = start or 0
+        end = end or time.time()
+
+        store_filter = 'AND s.store = ?' if store else ''
+        params = [url] + ([store] if store else [])
+
+        daily = self.connection.execute(f"""
+            SELECT s.store, d.day * {SECONDS_PER_DAY} AS timestamp, d.close_price AS price,
+                   d.min_price, d.max_price, NULL AS availability
+            FROM price_series s
+            JOIN price_daily d ON d.series_id = s.id
+            WHERE s.url = ? {store_filter} AND d.day BETWEEN ? AND ?
+        """, params + [int(start // SECONDS_PER_DAY), int(end // SECONDS_PER_DAY)]).fetchall()
+
+        raw = self.connection.execute(f"""
+            SELECT s.store, o.observed_at AS timestamp, o.price,
+                   o.price AS min_price, o.price AS max_price, o.availability
+            FROM price_series s
+            JOIN price_observations o ON o.series_id = s.id
+            WHERE s.url = ? {store_filter} AND o.observed_at BETWEEN ? AND ?
+        """, params + [start, end]).fetchall()
+
+        points = [dict(row) for row in daily] + [dict(row) for row in raw]
+        points.sort(key=lambda p: p['timestamp'])
+        return points
+
+    def get_series(self, url: str) -> List[Dict]:
+        """המצב האחרון של המוצר בכל חנות"""
+        self.flush()
+        rows = self.connection.execute("""
+            SELECT store, url, name, last_price, last_availability, last_observed
+            FROM price_series WHERE url = ?
+        """, (url,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+if __name__ == '__main__':
+    # הרצה תקופתית (cron): python -m core.price_history
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    PriceHistory().compact()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+העשרת מוצרים מעמוד המוצר - תמונה, מלאי, מותג, מק"ט ותיאור, שבכרטיס
+ברשימת התוצאות חסרים לעתים קרובות
+
+- רק לפי דרישה (הלקוח שולח את הקישורים - בעמוד התוצאות רק ל-DETAILS_TOP_K
+  הראשונים), אחרי שהרשימה עצמה כבר הוצגה - החיפוש הראשי לא מחכה לזה
+- העמודים נטענים במקביל דרך המתזמן, בעדיפות batch
+- מטמון לכל קישור עם תוקף משלו (DETAILS_CACHE_TTL), וקישור שכבר נטען
+  כרגע לא נטען שוב
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, as_completed, TimeoutError as FuturesTimeout
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from config import Config
+from .admission import CapacityExceeded
+from .scheduler import BATCH
+
+logger = logging.getLogger(__name__)
+
+
+def _host(url: str) -> str:
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class DetailEnricher:
+    """טעינת פרטי מוצר מעמודי המוצרים, עם מטמון לכל קישור"""
+
+    def __init__(self, price_finder, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.price_finder = price_finder
+        self.ttl = ttl or Config.DETAILS_CACHE_TTL
+        self.max_entries = max_entries or Config.DETAILS_CACHE_SIZE
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # קישור -> (תפוגה, פרטים)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def store_for_url(self, url: str) -> Optional[str]:
+        """החנות שהקישור שייך לה (לפי base_url) - קישורים לאתרים אחרים לא נטענים"""
+        host = _host(url)
+        if not host:
+            return None
+        for store_name in self.price_finder.scrapers:
+            store_config = Config.get_store_config(store_name) or {}
+            if _host(store_config.get('base_url', '')) == host:
+                return store_name
+        return None
+
+    def cached(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry[0] < time.time():
+                return None
+            self._entries.move_to_end(url)
+            return entry[1]
+
+    def _put(self, url: str, details: Dict, ttl: float):
+        with self._lock:
+            self._entries[url] = (time.time() + ttl, details)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _submit(self, store_name: str, url: str) -> Future:
+        """
+        טעינת עמוד המוצר (או הצטרפות לטעינה שכבר רצה). המקום נתפס תחת
+        המנעול עם Future משלנו, שמקבל את התוצאה של המשימה במתזמן - כך
+        שתי בקשות במקביל לא מגישות את אותו קישור פעמיים
+        """
+        with self._lock:
+            future = self._inflight.get(url)
+            if future is not None:
+                return future
+            future = self._inflight[url] = Future()
+
+        scraper = self.price_finder.scrapers[store_name]
+        try:
+            task = self.price_finder._submit_store(store_name, scraper, BATCH, scraper.fetch_product_details, url)
+        except Exception as e:
+            # התור מלא - גם מי שהצטרף בינתיים מקבל את השגיאה
+            with self._lock:
+                self._inflight.pop(url, None)
+            future.set_exception(e)
+            raise
+
+        def relay(finished: Future):
+            if finished.cancelled():
+                future.cancel()
+            elif future.set_running_or_notify_cancel():
+                error = finished.exception()
+                if error is None:
+                    future.set_result(finished.result())
+                else:
+                    future.set_exception(error)
+
+        def done(finished: Future):
+            with self._lock:
+                self._inflight.pop(url, None)
+            if finished.cancelled():
+                return
+            error = finished.exception()
+            # עמוד שלא נטען נשמר ריק לזמן קצר - לא לנסות שוב בכל בקשה
+            if error is None and finished.result():
+                self._put(url, finished.result(), self.ttl)
+            else:
+                self._put(url, {}, Config.DETAILS_ERROR_TTL)
+
+        future.add_done_callback(done)
+        task.add_done_callback(relay)
+        return future
+
+    def enrich(self, urls: List[str], timeout: Optional[float] = None) -> Iterator[Dict]:
+        """
+        פרטי המוצרים - מהמטמון מיד, והשאר לפי סדר הסיום
+
+        Args:
+            urls: קישורי המוצרים (לכל היותר DETAILS_MAX_URLS)
+            timeout: זמן מקסימלי לכל הטעינות (None = DETAILS_TIMEOUT)
+
+        Yields:
+            {'url', 'store', 'details', 'cached'} או {'url', 'error'}
+        """
+        futures = {}
+        for url in dict.fromkeys(urls[:Config.DETAILS_MAX_URLS]):
+            store_name = self.store_for_url(url)
+            if store_name is None:
+                yield {'url': url, 'error': 'Unknown store'}
+                continue
+
+            details = self.cached(url)
+            if details is not None:
+                self.hits += 1
+                yield {'url': url, 'store': store_name, 'details': details, 'cached': True}
+                continue
+
+            self.misses += 1
+            try:
+                futures[self._submit(store_name, url)] = (url, store_name)
+            except CapacityExceeded as e:
+                yield {'url': url, 'error': str(e)}
+
+        if not futures:
+            return
+
+        try:
+            for future in as_completed(futures, timeout=timeout or Config.DETAILS_TIMEOUT):
+                url, store_name = futures.pop(future)
+                try:
+                    yield {'url': url, 'store': store_name, 'details': future.result() or {}, 'cached': False}
+                except Exception as e:
+                    logger.error(f"Failed to load product details for {url}: {e}")
+                    yield {'url': url, 'error': str(e)}
+        except FuturesTimeout:
+            for url, _ in futures.values():
+                yield {'url': url, 'error': 'timed out'}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'loading': len(self._inflight),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
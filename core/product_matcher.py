@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+זיהוי מוצרים זהים בחנויות שונות
+מקבץ רשומות של אותו מוצר לפי טוקנים מנורמלים, מספרי דגם ונפח אחסון
+"""
+
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+from typing import List, Dict, Optional, Set, FrozenSet
+
+logger = logging.getLogger(__name__)
+
+# מילים שלא עוזרות לזהות מוצר
+STOP_WORDS = {
+    'של', 'עם', 'ללא', 'חדש', 'חדשה', 'יבואן', 'רשמי', 'אחריות', 'שנה', 'שנתיים',
+    'מקורי', 'במבצע', 'new', 'with', 'and', 'the', 'for', 'official', 'warranty'
+}
+
+# נפח אחסון: 256GB, 1TB, 512 ג'יגה וכו'
+STORAGE_PATTERN = re.compile(
+    r'(\d+(?:\.\d+)?)\s*(gb|tb|ג\'?יגה|גיגה|ג"ב|טרה|ט"ב)(?![a-z])'
+)
+TB_UNITS = {'tb', 'טרה', 'ט"ב'}
+
+# מילים שמבדילות בין גרסאות של אותו דגם (iPhone 15 מול iPhone 15 Pro)
+VARIANT_WORDS = {'pro', 'max', 'plus', 'ultra', 'mini', 'lite', 'air', 'se', 'fe', 'neo'}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9֐-׿]+(?:-[a-z0-9]+)*')
+
+
+def normalize_storage(text: str) -> FrozenSet[int]:
+    """חילוץ נפחי אחסון מנורמלים ל-GB"""
+    sizes = set()
+    for amount, unit in STORAGE_PATTERN.findall(text):
+        size = float(amount) * (1024 if unit in TB_UNITS else 1)
+        sizes.add(int(size))
+    return frozenset(sizes)
+
+
+def is_model_number(token: str) -> bool:
+    """טוקן שמכיל גם אותיות וגם ספרות (SM-S918B, A2890, WH1000XM5)"""
+    compact = token.replace('-', '')
+    return (len(compact) >= 3
+            and any(c.isdigit() for c in compact)
+            and any(c.isalpha() for c in compact))
+
+
+def char_ngrams(text: str, n: int = 3) -> Set[str]:
+    """n-grams של תווים לחישוב דמיון"""
+    text = f' {text} '
+    return {text[i:i + n] for i in range(max(len(text) - n + 1, 1))}
+
+
+def jaccard(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ProductSignature:
+    """ייצוג מנורמל של שם מוצר לצורך השוואה"""
+
+    __slots__ = ('tokens', 'models', 'variants', 'storage', 'ngrams')
+
+    def __init__(self, name: str):
+        text = (name or '').lower()
+        storage_free = STORAGE_PATTERN.sub(' ', text)
+
+        self.storage = normalize_storage(text)
+        raw_tokens = TOKEN_PATTERN.findall(storage_free)
+        self.models = frozenset(t.replace('-', '') for t in raw_tokens if is_model_number(t))
+        self.tokens = frozenset(t.replace('-', '') for t in raw_tokens if t not in STOP_WORDS)
+        self.variants = frozenset(t for t in self.tokens if t.isdigit() or t in VARIANT_WORDS)
+        self.ngrams = char_ngrams(' '.join(sorted(self.tokens)))
+
+
+class ProductMatcher:
+    """מקבץ מוצרים זהים מחנויות שונות"""
+
+    def __init__(self, token_threshold: float = 0.5, ngram_threshold: float = 0.7,
+                 max_postings: int = 200):
+        """
+        Args:
+            token_threshold: דמיון Jaccard מינימלי בין קבוצות הטוקנים
+            ngram_threshold: דמיון מינימלי בין ה-n-grams של התווים (לזוגות מועמדים)
+            max_postings: טוקן שמופיע ביותר מוצרים מזה לא משמש למציאת מועמדים
+        """
+        self.token_threshold = token_threshold
+        self.ngram_threshold = ngram_threshold
+        self.max_postings = max_postings
+
+    def is_same_product(self, a: ProductSignature, b: ProductSignature) -> bool:
+        """האם שתי חתימות מייצגות את אותו מוצר"""
+        # נפח אחסון שונה = מוצר שונה
+        if a.storage and b.storage and a.storage != b.storage:
+            return False
+
+        # מספר דור או גרסה שונים (15 / 15 Pro / 14) = מוצר שונה
+        if a.variants != b.variants:
+            return False
+
+        # מספר דגם הוא הראיה החזקה ביותר
+        if a.models and b.models:
+            return bool(a.models & b.models)
+
+        return (jaccard(a.tokens, b.tokens) >= self.token_threshold
+                or jaccard(a.ngrams, b.ngrams) >= self.ngram_threshold)
+
+    def _candidate_pairs(self, signatures: List[ProductSignature]):
+        """
+        מציאת זוגות מועמדים דרך אינדקס הפוך - במקום להשוות כל זוג
+
+        כל מוצר נכנס לאינדקס רק עם הטוקנים הנדירים שלו (prefix filtering):
+        שני מוצרים עם דמיון Jaccard של לפחות token_threshold חייבים לחלוק
+        טוקן אחד לפחות מתוך התחילית הזו. מספרי דגם תמיד נכנסים לאינדקס,
+        וטוקנים נפוצים מ-max_postings (צבע, מותג) לא משמשים לבדם כראיה.
+        כך מספר הזוגות נשאר קטן גם באלפי מוצרים.
+        """
+        frequency = Counter(token for signature in signatures for token in signature.tokens)
+        index = defaultdict(list)
+        seen = set()
+
+        for i, signature in enumerate(signatures):
+            ordered = sorted(signature.tokens, key=lambda t: (frequency[t], t))
+            prefix_length = len(ordered) - math.ceil(self.token_threshold * len(ordered)) + 1
+            prefix = [t for t in ordered[:prefix_length] if frequency[t] <= self.max_postings]
+            keys = set(prefix or ordered[:1]) | signature.models
+
+            for token in keys:
+                postings = index[token]
+                for j in postings:
+                    if (j, i) not in seen:
+                        seen.add((j, i))
+                        yield j, i
+                postings.append(i)
+
+    def group_products(self, products: List[Dict]) -> List[Dict]:
+        """
+        קיבוץ מוצרים זהים
+
+        Returns:
+            רשימת קבוצות, כל אחת עם המוצרים שלה, טווח המחירים והחיסכון
+        """
+        if not products:
+            return []
+
+        signatures = [ProductSignature(p.get('name')) for p in products]
+        parent = list(range(len(products)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in self._candidate_pairs(signatures):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j and self.is_same_product(signatures[i], signatures[j]):
+                parent[root_j] = root_i
+
+        members = defaultdict(list)
+        for i in range(len(products)):
+            members[find(i)].append(products[i])
+
+        groups = [self._build_group(group_id, items)
+                  for group_id, items in enumerate(members.values())]
+        groups.sort(key=lambda g: (-g['savings'], g['min_price'] if g['min_price'] is not None else float('inf')))
+
+        logger.debug(f"Matched {len(products)} products into {len(groups)} groups")
+        return groups
+
+    def _build_group(self, group_id: int, items: List[Dict]) -> Dict:
+        """בניית קבוצת מוצר עם נתוני החיסכון שלה"""
+        priced = sorted((p for p in items if p.get('price') is not None), key=lambda p: p['price'])
+        min_price = priced[0]['price'] if priced else None
+        max_price = priced[-1]['price'] if priced else None
+
+        unpriced = [p for p in items if p.get('price') is None]
+
+        # החנויות שיש בהן מחיר - חיסכון נחשב רק כשאותו מוצר מתומחר ביותר מחנות אחת
+        stores = sorted({p.get('store') for p in (priced or items) if p.get('store')})
+        savings, savings_percent = 0, 0
+        if priced and len(stores) > 1 and max_price:
+            savings = max_price - min_price
+            savings_percent = round((savings / max_price) * 100, 1)
+
+        for product in items:
+            product['match_group'] = group_id
+
+        return {
+            'group_id': group_id,
+            'name': priced[0]['name'] if priced else items[0].get('name'),
+            'products': priced + unpriced,  # הזול ביותר ראשון, בלי מחיר בסוף
+            'stores': stores,
+            'min_price': min_price,
+            'max_price': max_price,
+            'savings': savings,
+            'savings_percent': savings_percent
+        }
+
+    def best_deal(self, groups: List[Dict]) -> Optional[Dict]:
+        """
+        העסקה הזולה ביותר, עם חיסכון מול אותו מוצר בחנויות אחרות
+        (ולא מול המוצר היקר ביותר שנמצא בחיפוש)
+        """
+        best_group = None
+        for group in groups:
+            if group['min_price'] is None:
+                continue
+            if best_group is None or group['min_price'] < best_group['min_price']:
+                best_group = group
+
+        if not best_group:
+            return None
+
+        best_product = best_group['products'][0]
+        if best_group['savings'] > 0:
+            best_product['savings'] = best_group['savings']
+            best_product['savings_percent'] = best_group['savings_percent']
+        return best_product
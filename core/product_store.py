@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+טבלת המוצרים הקבועה - כל מה שנאסף בסריקת קטגוריות (core/category_crawler.py),
+לכל (חנות, מוצר), ונקודות ההמשך של הסריקות כדי שסריקה שנקטעה תמשיך מאותו עמוד
+
+טביעות אצבע לסריקה חוזרת: לכל עמוד רשימה (crawl_pages) ולכל כרטיס מוצר
+(products.fingerprint). עמוד שלא השתנה לא מפוענח בכלל, ובעמוד שהשתנה נכתבים
+רק המוצרים שהכרטיס שלהם השתנה
+"""
+
+import time
+import hashlib
+import logging
+from typing import List, Dict, Optional, Iterable
+
+from config import Config
+from .database import get_connection
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    store TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL,
+    availability TEXT,
+    url TEXT,
+    image_url TEXT,
+    category TEXT,
+    page INTEGER,
+    fingerprint TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (store, product_key)
+);
+
+CREATE INDEX IF NOT EXISTS products_category ON products (store, category, page);
+
+CREATE TABLE IF NOT EXISTS crawl_pages (
+    store TEXT NOT NULL,
+    category TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    products INTEGER NOT NULL,
+    checked_at REAL NOT NULL,
+    changed_at REAL NOT NULL,
+    PRIMARY KEY (store, category, page)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS crawl_checkpoints (
+    store TEXT NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    next_page INTEGER NOT NULL,
+    pages INTEGER NOT NULL,
+    products INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    error TEXT,
+    PRIMARY KEY (store, category)
+);
+"""
+
+# מצבי סריקה בטבלת נקודות ההמשך
+RUNNING = 'running'
+FAILED = 'failed'
+DONE = 'done'
+
+# עמודות שנוספו אחרי הגרסה הראשונה של הטבלה
+_ADDED_COLUMNS = {'page': 'INTEGER', 'fingerprint': 'TEXT'}
+
+
+def card_fingerprint(product: Dict) -> str:
+    """טביעת האצבע של כרטיס מוצר - כל מה שמוצג בו"""
+    fields = (product.get('name'), product.get('price'), product.get('availability'),
+              product.get('url'), product.get('image_url'))
+    return hashlib.sha1(repr(fields).encode('utf-8')).hexdigest()[:16]
+
+
+class ProductStore:
+    """מוצרים מסריקות קטגוריה ונקודות ההמשך שלהן"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self._migrate()
+        self.connection.executescript(SCHEMA)
+
+    def _migrate(self):
+        """הוספת העמודות החדשות לטבלת products שנוצרה בגרסה קודמת"""
+        columns = {row['name'] for row in self.connection.execute('PRAGMA table_info(products)')}
+        if columns:
+            with self.connection as conn:
+                for column, column_type in _ADDED_COLUMNS.items():
+                    if column not in columns:
+                        conn.execute(f'ALTER TABLE products ADD COLUMN {column} {column_type}')
+
+    @property
+    def connection(self):
+        return get_connection(self.db_path)
+
+    # ===== מוצרים =====
+
+    def upsert_page(self, store: str, category: str, page: int, products: Iterable[Dict]) -> List[Dict]:
+        """
+        עמוד מוצרים שהשתנה - רק כרטיסים חדשים או שהשתנו נכתבים במלואם,
+        לשאר מתעדכנים רק זמן הראייה והעמוד
+
+        Returns:
+            השינויים: {'product', 'change' (new/price/availability/details),
+            'old_price', 'old_availability'} לכל כרטיס שהשתנה
+        """
+        now = time.time()
+        cards = {}
+        for product in products:
+            if product and product.get('name'):
+                cards[product.get('url') or product['name']] = product
+
+        known = {}
+        keys = list(cards)
+        for start in range(0, len(keys), 500):  # מגבלת הפרמטרים של SQLite
+            chunk = keys[start:start + 500]
+            rows = self.connection.execute(f"""
+                SELECT product_key, fingerprint, price, availability FROM products
+                WHERE store = ? AND product_key IN ({','.join('?' * len(chunk))})
+            """, [store] + chunk).fetchall()
+            known.update((row['product_key'], row) for row in rows)
+
+        changes, rows, seen = [], [], []
+        for key, product in cards.items():
+            fingerprint = card_fingerprint(product)
+            previous = known.get(key)
+            if previous is not None and previous['fingerprint'] == fingerprint:
+                seen.append((now, page, store, key))
+                continue
+
+            rows.append((store, key, product['name'], product.get('price'), product.get('availability'),
+                         product.get('url'), product.get('image_url'), category, page, fingerprint,
+                         product.get('last_updated') or now))
+            if previous is None:
+                change = 'new'
+            elif previous['price'] != product.get('price'):
+                change = 'price'
+            elif previous['availability'] != product.get('availability'):
+                change = 'availability'
+            else:
+                change = 'details'
+            changes.append({
+                'product': product,
+                'change': change,
+                'old_price': previous['price'] if previous is not None else None,
+                'old_availability': previous['availability'] if previous is not None else None
+            })
+
+        with self.connection as conn:
+            conn.executemany("""
+                INSERT INTO products
+                    (store, product_key, name, price, availability, url, image_url, category, page,
+                     fingerprint, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?11, ?11)
+                ON CONFLICT (store, product_key) DO UPDATE SET
+                    name = excluded.name,
+                    price = excluded.price,
+                    availability = excluded.availability,
+                    image_url = COALESCE(excluded.image_url, image_url),
+                    category = excluded.category,
+                    page = excluded.page,
+                    fingerprint = excluded.fingerprint,
+                    last_seen = excluded.last_seen
+            """, rows)
+            conn.executemany(
+                'UPDATE products SET last_seen = ?, page = ? WHERE store = ? AND product_key = ?', seen
+            )
+        return changes
+
+    def count(self, store: Optional[str] = None, category: Optional[str] = None) -> int:
+        return self.connection.execute("""
+            SELECT COUNT(*) FROM products
+            WHERE (?1 IS NULL OR store = ?1) AND (?2 IS NULL OR category = ?2)
+        """, (store, category)).fetchone()[0]
+
+    # ===== טביעות אצבע של עמודים =====
+
+    def page_fingerprints(self, store: str, category: str) -> Dict[int, str]:
+        """טביעות האצבע של עמודי הקטגוריה מהסריקה הקודמת"""
+        rows = self.connection.execute(
+            'SELECT page, fingerprint FROM crawl_pages WHERE store = ? AND category = ?', (store, category)
+        ).fetchall()
+        return {row['page']: row['fingerprint'] for row in rows}
+
+    def save_page(self, store: str, category: str, page: int, fingerprint: str, products: int):
+        """עמוד שהשתנה (או חדש) - טביעת האצבע החדשה שלו"""
+        now = time.time()
+        with self.connection as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO crawl_pages
+                    (store, category, page, fingerprint, products, checked_at, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (store, category, page, fingerprint, products, now, now))
+
+    def touch_page(self, store: str, category: str, page: int) -> List[str]:
+        """
+        עמוד שלא השתנה - רק זמני הבדיקה וזמני הראייה של המוצרים שבו
+
+        Returns:
+            קישורי המוצרים שבעמוד (לעדכון הרעננות שלהם בקטלוג)
+        """
+        now = time.time()
+        with self.connection as conn:
+            conn.execute('UPDATE crawl_pages SET checked_at = ? WHERE store = ? AND category = ? AND page = ?',
+                         (now, store, category, page))
+            conn.execute('UPDATE products SET last_seen = ? WHERE store = ? AND category = ? AND page = ?',
+                         (now, store, category, page))
+        rows = self.connection.execute(
+            'SELECT url FROM products WHERE store = ? AND category = ? AND page = ? AND url IS NOT NULL',
+            (store, category, page)
+        ).fetchall()
+        return [row['url'] for row in rows]
+
+    def forget_pages(self, store: str, category: str, after_page: int):
+        """עמודים שכבר לא קיימים (הקטגוריה התקצרה) - כדי שלא ייחשבו כמוכרים בסבב הבא"""
+        with self.connection as conn:
+            conn.execute('DELETE FROM crawl_pages WHERE store = ? AND category = ? AND page > ?',
+                         (store, category, after_page))
+
+    # ===== נקודות המשך =====
+
+    def get_checkpoint(self, store: str, category: str) -> Optional[Dict]:
+        row = self.connection.execute(
+            'SELECT * FROM crawl_checkpoints WHERE store = ? AND category = ?', (store, category)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def save_checkpoint(self, store: str, category: str, status: str, next_page: int, pages: int,
+                        products: int, started_at: float, error: Optional[str] = None):
+        """נקודת ההמשך - נשמרת אחרי כל עמוד שנכתב"""
+        with self.connection as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO crawl_checkpoints
+                    (store, category, status, next_page, pages, products, started_at, updated_at, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (store, category, status, next_page, pages, products, started_at, time.time(), error))
+
+    def checkpoints(self) -> List[Dict]:
+        rows = self.connection.execute(
+            'SELECT * FROM crawl_checkpoints ORDER BY store, category'
+        ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+צורה קנונית של שאילתת חיפוש - "iPhone 15", "iphone  15", "15 iPhone" ו-"אייפון 15"
+הם אותו חיפוש. הצורה הקנונית משמשת כמפתח (מטמון, איחוד חיפושים זהים, קטלוג
+וסטטיסטיקות); למשתמש תמיד מוצגת השאילתה המקורית שלו
+
+השלבים:
+1. אותיות קטנות, בלי ניקוד, בלי אותיות סופיות, בלי גרשיים ומקפים בתוך מילה
+2. נפחי אחסון בצורה אחת (256 ג'יגה / 256 GB -> 256gb)
+3. הפרדת מספר דגם קצר שנצמד לשם (iphone15 -> iphone 15)
+4. תעתיק עברית -> אנגלית (אייפון -> iphone) וטבלת מילים נרדפות (ps5 -> playstation 5)
+5. מילים ייחודיות, ממוינות
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+from config import Config
+
+# ניקוד וטעמים
+NIQQUD_PATTERN = re.compile(r'[֑-ׇ]')
+# אותיות סופיות -> רגילות, כדי שתחילית "מחשב" תתאים ל"מחשבים"
+FINAL_LETTERS = str.maketrans('ךםןףץ', 'כמנפצ')
+WORD_PATTERN = re.compile(r'[\w]+', re.UNICODE)
+# גרשיים ומקפים בתוך מילה (ג'יגה, ש"ח, usb-c) - נמחקים
+JOINERS_PATTERN = re.compile(r'(?<=\w)[\'"׳״\-](?=\w)')
+STORAGE_PATTERN = re.compile(r'(\d+)\s*(gb|tb|גיגה|גב|טרה|טב)(?![a-zא-ת])')
+STORAGE_UNITS = {'gb': 'gb', 'גיגה': 'gb', 'גב': 'gb', 'tb': 'tb', 'טרה': 'tb', 'טב': 'tb'}
+# שם דגם שנצמד למספר (iphone15, galaxy23) - לא מספרי דגם כמו a2890 או s23
+GLUED_NUMBER_PATTERN = re.compile(r'^([a-z]{4,})(\d{1,3})$')
+
+# כתיב עברי של מותגים ודגמים -> הכתיב האנגלי (כפי שהוא מופיע בשמות המוצרים בחנויות)
+TRANSLITERATIONS = {
+    'אייפון': 'iphone', 'איפון': 'iphone',
+    'אייפד': 'ipad', 'איפד': 'ipad',
+    'מקבוק': 'macbook', 'איימק': 'imac',
+    'איירפודס': 'airpods', 'אירפודס': 'airpods',
+    'אפל': 'apple',
+    'סמסונג': 'samsung', 'גלקסי': 'galaxy',
+    'שיאומי': 'xiaomi', 'שאומי': 'xiaomi',
+    'לנובו': 'lenovo', 'אסוס': 'asus', 'אייסר': 'acer', 'דל': 'dell',
+    'הייפי': 'hp', 'לוגיטק': 'logitech', 'סוני': 'sony', 'פיליפס': 'philips',
+    'גוגל': 'google', 'פיקסל': 'pixel', 'וואווי': 'huawei', 'וואוויי': 'huawei',
+    'נינטנדו': 'nintendo', 'סוויץ': 'switch', 'פלייסטיישן': 'playstation',
+    'אקסבוקס': 'xbox', 'דייסון': 'dyson', 'בוז': 'bose', 'גייבל': 'jbl',
+    'פרו': 'pro', 'מקס': 'max', 'פלוס': 'plus', 'אולטרה': 'ultra',
+    'מיני': 'mini', 'אייר': 'air', 'לייט': 'lite'
+}
+
+# מילים וצירופים נרדפים -> הצורה הקנונית (אחרי התעתיק)
+SYNONYMS = {
+    'ps5': 'playstation 5', 'ps4': 'playstation 4',
+    'לפטופ': 'laptop', 'notebook': 'laptop', 'מחשב נייד': 'laptop',
+    'טלפון סלולרי': 'smartphone', 'סמארטפון': 'smartphone', 'סמרטפון': 'smartphone',
+    'טלויזיה': 'tv', 'טלוויזיה': 'tv', 'television': 'tv',
+    'אוזניות': 'headphones', 'earphones': 'headphones', 'earbuds': 'headphones',
+    'שעון חכם': 'smartwatch', 'smart watch': 'smartwatch',
+    'טאבלט': 'tablet', 'מסך': 'monitor', 'מקלדת': 'keyboard', 'עכבר': 'mouse'
+}
+
+
+def fold(text: str) -> str:
+    """אותיות קטנות, בלי ניקוד, בלי אותיות סופיות ובלי סימנים בתוך מילים"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    text = NIQQUD_PATTERN.sub('', text).translate(FINAL_LETTERS)
+    return JOINERS_PATTERN.sub('', text)
+
+
+def _folded_table(table):
+    """הטבלאות נכתבות בכתיב רגיל - המפתחות מקופלים כמו השאילתה"""
+    return {fold(key): value for key, value in table.items()}
+
+
+_TRANSLITERATIONS = _folded_table({**TRANSLITERATIONS, **Config.QUERY_TRANSLITERATIONS})
+_SYNONYMS = _folded_table({**SYNONYMS, **Config.QUERY_SYNONYMS})
+_LONGEST_SYNONYM = max(len(key.split()) for key in _SYNONYMS)
+
+
+def _storage(match) -> str:
+    return f"{match.group(1)}{STORAGE_UNITS[match.group(2)]}"
+
+
+def _words(text: str) -> List[str]:
+    """מילים אחרי קיפול, נפחי אחסון, הפרדת מספרים צמודים ותעתיק"""
+    words = []
+    for word in WORD_PATTERN.findall(STORAGE_PATTERN.sub(_storage, fold(text))):
+        glued = GLUED_NUMBER_PATTERN.match(word)
+        parts = glued.groups() if glued else (word,)
+        words.extend(_TRANSLITERATIONS.get(part, part) for part in parts)
+    return words
+
+
+def _apply_synonyms(words: List[str]) -> List[str]:
+    """החלפת צירופים נרדפים - הצירוף הארוך ביותר קודם"""
+    result = []
+    i = 0
+    while i < len(words):
+        for length in range(min(_LONGEST_SYNONYM, len(words) - i), 0, -1):
+            phrase = ' '.join(words[i:i + length])
+            if phrase in _SYNONYMS:
+                result.extend(_SYNONYMS[phrase].split())
+                i += length
+                break
+        else:
+            result.append(words[i])
+            i += 1
+    return result
+
+
+def canonical_tokens(query: str) -> List[str]:
+    """המילים הקנוניות של השאילתה - ייחודיות וממוינות"""
+    return sorted(set(_apply_synonyms(_words(query))))
+
+
+@lru_cache(maxsize=10000)
+def canonicalize(query: str) -> str:
+    """הצורה הקנונית של שאילתה (מחרוזת ריקה לשאילתה בלי מילים)"""
+    return ' '.join(canonical_tokens(query))
+
+
+def word_variants(word: str) -> List[str]:
+    """
+    הכתיבים החלופיים של מילה אחת (מקופלת) - לחיפוש בקטלוג, כך ש"אייפון"
+    מוצא גם מוצרים ששמם "iPhone"
+    """
+    variants = []
+    transliterated = _TRANSLITERATIONS.get(word)
+    if transliterated:
+        variants.append(transliterated)
+    synonym = _SYNONYMS.get(transliterated or word)
+    if synonym and ' ' not in synonym:
+        variants.append(synonym)
+    return variants
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+איחוד ודירוג תוצאות מכל החנויות
+מחזיק ערימה (heap) חסומה של k התוצאות המובילות ומתעדכן בכל פעם שחנות מסיימת
+"""
+
+import re
+import json
+import heapq
+import bisect
+import itertools
+import base64
+import logging
+from typing import List, Dict, Optional, Callable, Tuple, Iterable
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+INF = float('inf')
+
+# סדר העדיפויות של מצבי מלאי (נמוך = עדיף)
+AVAILABILITY_ORDER = {
+    'זמין': 0,
+    'הזמנה מראש': 1,
+    'אזל מהמלאי': 2
+}
+
+# דפוסים לזיהוי כמות יחידות בשם המוצר (מארזים, זוגות וכו')
+UNIT_COUNT_PATTERNS = [
+    r'מארז\s*(?:של\s*)?(\d+)',
+    r'(\d+)\s*יח(?:ידות|\')?',
+    r'(\d+)\s*-?\s*pack\b',
+    r'pack\s*of\s*(\d+)',
+    r'\bx\s*(\d+)\b',
+    r'\b(\d+)\s*x\b'
+]
+
+
+def extract_unit_count(product: Dict) -> int:
+    """חילוץ מספר היחידות במוצר (ברירת מחדל: 1)"""
+    if product.get('unit_count'):
+        return max(int(product['unit_count']), 1)
+
+    name = (product.get('name') or '').lower()
+    if 'זוג' in name:
+        return 2
+
+    for pattern in UNIT_COUNT_PATTERNS:
+        match = re.search(pattern, name)
+        if match:
+            count = int(match.group(1))
+            if 1 <= count <= 100:
+                return count
+    return 1
+
+
+def _price(product: Dict) -> float:
+    price = product.get('price')
+    return float(price) if price is not None else INF
+
+
+def rank_by_price(product: Dict) -> Tuple:
+    """דירוג לפי מחיר"""
+    return (_price(product),)
+
+
+def rank_by_price_per_unit(product: Dict) -> Tuple:
+    """דירוג לפי מחיר ליחידה"""
+    return (round(_price(product) / extract_unit_count(product), 2), _price(product))
+
+
+def rank_by_availability(product: Dict) -> Tuple:
+    """דירוג לפי זמינות קודם ואז לפי מחיר"""
+    availability = AVAILABILITY_ORDER.get(product.get('availability'), 1)
+    return (availability, _price(product))
+
+
+RANK_KEYS: Dict[str, Callable[[Dict], Tuple]] = {
+    'price': rank_by_price,
+    'price_per_unit': rank_by_price_per_unit,
+    'availability_first': rank_by_availability
+}
+
+
+def get_rank_key(rank_by: str) -> Callable[[Dict], Tuple]:
+    """קבלת פונקציית דירוג לפי שם"""
+    try:
+        return RANK_KEYS[rank_by]
+    except KeyError:
+        raise ValueError(f"Unknown rank key '{rank_by}', expected one of {sorted(RANK_KEYS)}")
+
+
+def register_rank_key(name: str, key_func: Callable[[Dict], Tuple]):
+    """רישום פונקציית דירוג חדשה"""
+    RANK_KEYS[name] = key_func
+
+
+class _Reversed:
+    """עטיפה שהופכת את סדר ההשוואה - כדי לקבל max-heap מתוך heapq"""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+class ResultAggregator:
+    """מאחד תוצאות מחנויות לערימת top-k מדורגת"""
+
+    def __init__(self, rank_by: str = 'price', top_k: Optional[int] = None):
+        self.rank_by = rank_by
+        self.rank_key = get_rank_key(rank_by)
+        self.top_k = top_k
+        self.total_seen = 0
+        self._heap = []
+        self._counter = itertools.count()
+        self._cheapest = None
+
+    def sort_key(self, product: Dict) -> Tuple:
+        """מפתח מיון מלא - מפתח הדירוג + שדות יציבים לשבירת שוויון"""
+        return self.rank_key(product) + (
+            product.get('store') or '',
+            product.get('url') or '',
+            product.get('name') or ''
+        )
+
+    def add(self, products: Iterable[Dict]):
+        """הוספת תוצאות של חנות - O(log k) לכל מוצר"""
+        for product in products:
+            if not product:
+                continue
+            self.total_seen += 1
+            self._track_cheapest(product)
+
+            entry = (_Reversed(self.sort_key(product)), next(self._counter), product)
+            if self.top_k is None or len(self._heap) < self.top_k:
+                heapq.heappush(self._heap, entry)
+            elif entry[0].key < self._heap[0][0].key:
+                heapq.heapreplace(self._heap, entry)
+
+    def _track_cheapest(self, product: Dict):
+        price = product.get('price')
+        if price is not None and (self._cheapest is None or price < self._cheapest['price']):
+            self._cheapest = product
+
+    def __len__(self):
+        return len(self._heap)
+
+    def ranked(self) -> List[Dict]:
+        """רשימת המוצרים המדורגת - O(k log k)"""
+        return [product for _, _, product in sorted(self._heap, reverse=True)]
+
+    def cheapest(self) -> Optional[Dict]:
+        """המוצר הזול ביותר שנראה עד כה (גם אם נדחק מה-top-k)"""
+        return self._cheapest
+
+    def page(self, cursor: Optional[str] = None, page_size: int = 20) -> Dict:
+        """עמוד של תוצאות לפי cursor"""
+        return paginate(self.ranked(), self.sort_key, cursor, page_size)
+
+
+def encode_cursor(sort_key: Tuple) -> str:
+    """קידוד מפתח מיון ל-cursor אטום"""
+    raw = json.dumps(list(sort_key), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    """
+    פענוח cursor בחזרה למפתח מיון
+
+    Raises:
+        ValueError: cursor שלא נוצר על ידי encode_cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        sort_key = json.loads(raw.decode('utf-8'))
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(sort_key, list):
+        raise ValueError("Invalid cursor: not a sort key")
+    return tuple(sort_key)
+
+
+def validate_page(cursor: Optional[str] = None, page_size=None) -> int:
+    """
+    בדיקת פרמטרי העמוד מבקשה (גם "5" מ-JSON) - לפני החיפוש עצמו
+
+    Returns:
+        גודל העמוד (RESULTS_PAGE_SIZE אם לא נשלח)
+
+    Raises:
+        ValueError: cursor לא תקין, או page_size שאינו מספר שלם בין 1 ל-RESULTS_PAGE_SIZE_MAX
+    """
+    if cursor:
+        decode_cursor(cursor)
+    if page_size is None:
+        return Config.RESULTS_PAGE_SIZE
+    if isinstance(page_size, str) and page_size.strip().isdigit():
+        page_size = int(page_size)
+    if (not isinstance(page_size, int) or isinstance(page_size, bool)
+            or not 1 <= page_size <= Config.RESULTS_PAGE_SIZE_MAX):
+        raise ValueError(f"page_size must be an integer between 1 and {Config.RESULTS_PAGE_SIZE_MAX}")
+    return page_size
+
+
+def paginate(ranked: List[Dict], sort_key: Callable[[Dict], Tuple],
+             cursor: Optional[str] = None, page_size: int = 20) -> Dict:
+    """
+    חיתוך רשימה מדורגת לעמוד לפי cursor
+
+    ה-cursor מקודד את מפתח המיון של הפריט האחרון בעמוד הקודם,
+    כך שהעמוד הבא יציב גם אם נוספו תוצאות בינתיים.
+
+    Raises:
+        ValueError: cursor או page_size לא תקינים (validate_page)
+    """
+    page_size = validate_page(cursor, page_size)
+    start = 0
+    if cursor:
+        after = list(decode_cursor(cursor))
+        try:
+            start = bisect.bisect_right(ranked, after, key=lambda p: list(sort_key(p)))
+        except TypeError:
+            # רשימה עם ערכים מסוג אחר ממפתח המיון (למשל cursor של דירוג אחר)
+            raise ValueError("Invalid cursor: does not match the ranking")
+
+    items = ranked[start:start + page_size]
+    has_more = start + page_size < len(ranked)
+
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(sort_key(items[-1])) if items and has_more else None
+    }
+
+
+def paginate_products(products: List[Dict], rank_by: str = 'price',
+                      cursor: Optional[str] = None, page_size: int = 20) -> Dict:
+    """עמוד של תוצאות מתוך רשימת מוצרים מדורגת לפי rank_by"""
+    return paginate(products, ResultAggregator(rank_by).sort_key, cursor, page_size)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+מטמון תוצאות חיפוש בזיכרון (TTL לפי CACHE_DURATION)
+כל רשומה נושאת ETag שמחושב פעם אחת, כך ששכבת ה-HTTP יכולה
+לענות 304 בלי להריץ חיפוש
+"""
+
+import copy
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def compute_etag(data) -> str:
+    """ETag חזק לפי תוכן"""
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()[:20]
+
+
+class CacheEntry:
+    """רשומת מטמון - התוצאות, זמן היצירה וה-ETag שלהן"""
+
+    __slots__ = ('results', 'created_at', 'etag')
+
+    def __init__(self, results: Dict, created_at: Optional[float] = None):
+        self.results = results
+        self.created_at = created_at or time.time()
+        # בלי השאילתה עצמה - כל הכתיבים של אותה שאילתה קנונית חולקים רשומה ו-ETag
+        self.etag = compute_etag({k: v for k, v in results.items() if k not in ('query', 'search_time', 'cache')})
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def expires_in(self, ttl: float) -> int:
+        return max(int(ttl - self.age), 0)
+
+
+class ResultCache:
+    """מטמון LRU של תוצאות חיפוש עם תוקף"""
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl or Config.CACHE_DURATION
+        self.max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """רשומה בתוקף (בלי לעדכן סטטיסטיקות)"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry.age < self.ttl:
+            return entry
+        return None
+
+    def peek_info(self, key: str) -> Optional[Dict]:
+        """פרטי המטמון (ETag, גיל, תוקף) בלי להעתיק את התוצאות - לבקשות מותנות"""
+        entry = self.peek(key)
+        return self._cache_info(entry, hit=True) if entry else None
+
+    def get(self, key: str, grace: float = 0) -> Optional[Dict]:
+        """
+        התוצאות השמורות (עותק) או None אם אין/פג תוקף
+
+        Args:
+            grace: כמה שניות אחרי פקיעת התוקף הרשומה עוד מוחזרת - מסומנת
+                   stale, כדי שהקורא ירענן אותה ברקע (stale-while-revalidate)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.age >= self.ttl + grace:
+                self.misses += 1
+                return None
+            stale = entry.age >= self.ttl
+            self.hits += 1
+            self.stale_hits += stale
+            self._entries.move_to_end(key)
+
+        results = copy.deepcopy(entry.results)
+        results['cache'] = self._cache_info(entry, hit=True)
+        results['cache']['stale'] = stale
+        if stale:
+            results['cache']['stale_for'] = round(entry.age - self.ttl, 1)
+        return results
+
+    def get_stale(self, key: str) -> Optional[Dict]:
+        """התוצאות השמורות גם אם פג תוקפן - לשימוש כשאי אפשר לחפש מחדש"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        results = copy.deepcopy(entry.results)
+        results['cache'] = self._cache_info(entry, hit=True)
+        results['cache']['stale'] = entry.age >= self.ttl
+        return results
+
+    def put(self, key: str, results: Dict) -> CacheEntry:
+        """שמירת תוצאות - מוסיף להן את פרטי המטמון"""
+        entry = CacheEntry(copy.deepcopy(results))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        results['cache'] = self._cache_info(entry, hit=False)
+        return entry
+
+    def invalidate(self, key: Optional[str] = None):
+        """מחיקת רשומה אחת או את כל המטמון"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _cache_info(self, entry: CacheEntry, hit: bool) -> Dict:
+        return {
+            'hit': hit,
+            'etag': entry.etag,
+            'cached_at': entry.created_at,
+            'age': round(entry.age, 1),
+            'expires_in': entry.expires_in(self.ttl)
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'stale_hits': self.stale_hits,
+                    'misses': self.misses}
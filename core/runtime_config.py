@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+הגדרות שאפשר לשנות בזמן ריצה - בלי הפעלה מחדש שזורקת את הדפדפנים החמים
+ואת המטמון
+
+מקורות (כל אחד דורס את הקודם):
+1. ערכי ברירת המחדל ב-Config
+2. משתני סביבה: PRICEHUNTER_<הגדרה> (למשל PRICEHUNTER_REQUEST_TIMEOUT=5)
+   ולחנויות PRICEHUNTER_STORE_<חנות>_<הגדרה> (למשל PRICEHUNTER_STORE_KSP_ENABLED=0)
+3. קובץ JSON ב-Config.RUNTIME_CONFIG_PATH - נבדק כל RUNTIME_CONFIG_POLL_INTERVAL שניות:
+       {"REQUEST_TIMEOUT": 8, "stores": {"ksp": {"concurrency": 3}, "zap": {"enabled": false}}}
+
+כל שינוי נבדק במלואו לפני שמשהו מוחל. אחר כך הערכים נכתבים ל-Config
+והרכיבים שנרשמו (scrapers, מאגרי דפדפנים, בקרת עומס, הגבלת קצב) מעודכנים.
+אם אחד מהם נכשל - הכל חוזר לגרסה הקודמת. כל גרסה שהוחלה נשמרת בהיסטוריה
+(בזיכרון ובטבלה config_versions)
+
+    python -m core.runtime_config            # הגרסה הנוכחית וההיסטוריה
+    python -m core.runtime_config --check    # בדיקת הקובץ בלי להחיל
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+from .database import get_connection
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = 'PRICEHUNTER_'
+
+# הגדרה -> (סוג, מינימום, מקסימום)
+RUNTIME_SETTINGS = {
+    'REQUEST_TIMEOUT': (float, 1, 120),
+    'MAX_RETRIES': (int, 1, 10),
+    'DELAY_BETWEEN_REQUESTS': (float, 0, 30),
+    'SELENIUM_TIMEOUT': (float, 1, 120),
+    'CACHE_DURATION': (int, 0, 7 * 24 * 3600),
+    'CACHE_STALE_GRACE': (int, 0, 7 * 24 * 3600),
+    'STORE_STATUS_TTL': (int, 0, 3600),
+    'MAX_CONCURRENT_SCRAPES': (int, 1, 64),
+    'SCRAPE_QUEUE_SIZE': (int, 0, 1000),
+    'SCRAPE_QUEUE_TIMEOUT': (float, 0, 300),
+    'RATE_LIMIT_PER_MINUTE': (int, 1, 100000),
+    'RATE_LIMIT_BURST': (int, 1, 100000),
+    'DRIVER_POOL_SIZE': (int, 0, 16),
+    'PRESCRAPE_TOP_QUERIES': (int, 0, 1000),
+    'PRESCRAPE_BROWSER_MINUTES_PER_HOUR': (float, 0, 6000)
+}
+
+# הגדרות לכל חנות ב-ACTIVE_STORES
+STORE_SETTINGS = {
+    'enabled': (bool, None, None),
+    'engine': (str, None, None),
+    'concurrency': (int, 1, 32),
+    'timeout': (float, 1, 300),
+    'priority': (int, 0, 1000)
+}
+
+ENGINES = ('http', 'selenium')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS config_versions (
+    hash TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    settings TEXT NOT NULL
+);
+"""
+
+
+# רכיבים שמקבלים את השינויים - ברמת המודול, כדי שאפשר יהיה להירשם כבר
+# ביצירת האפליקציה (לפני ה-fork) בלי ליצור את RuntimeConfig עצמו
+_listeners: List[Callable[[Dict], None]] = []
+_listeners_lock = threading.Lock()
+
+
+def subscribe(listener: Callable[[Dict], None]):
+    """
+    רישום רכיב שצריך לדעת על שינויים - נקרא עם {הגדרה: (ישן, חדש)}
+    (חנויות כ-'stores.ksp.enabled'). חריגה מבטלת את כל השינוי
+    """
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[Dict], None]):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+class ConfigError(ValueError):
+    """הגדרות לא חוקיות - שום דבר לא הוחל"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _coerce(value, value_type: type, minimum, maximum, name: str, errors: List[str]):
+    """המרה ובדיקת טווח של ערך אחד (גם ממחרוזת של משתנה סביבה)"""
+    try:
+        if value_type is bool:
+            if isinstance(value, str):
+                lowered = value.strip().lower()
+                if lowered not in ('1', '0', 'true', 'false', 'yes', 'no', 'on', 'off'):
+                    raise ValueError(value)
+                value = lowered in ('1', 'true', 'yes', 'on')
+            elif not isinstance(value, bool):
+                raise ValueError(value)
+        elif value_type is str:
+            value = str(value).strip()
+        else:
+            if isinstance(value, bool):
+                raise ValueError(value)
+            number = float(value)
+            if value_type is int and number != int(number):
+                raise ValueError(value)
+            value = value_type(number)
+    except (TypeError, ValueError):
+        errors.append(f"{name}: expected {value_type.__name__}, got {value!r}")
+        return None
+
+    if minimum is not None and value < minimum or maximum is not None and value > maximum:
+        errors.append(f"{name}: {value} is out of range [{minimum}, {maximum}]")
+        return None
+    return value
+
+
+def validate(overrides: Dict) -> Dict:
+    """
+    בדיקת שינויים - מחזיר אותם מומרים לסוגים הנכונים
+
+    Raises:
+        ConfigError: עם כל השגיאות שנמצאו (לא רק הראשונה)
+    """
+    errors = []
+    clean = {}
+
+    for name, value in overrides.items():
+        if name == 'stores':
+            continue
+        if name not in RUNTIME_SETTINGS:
+            errors.append(f"{name}: not a runtime setting")
+            continue
+        value = _coerce(value, *RUNTIME_SETTINGS[name], name, errors)
+        if value is not None:
+            clean[name] = value
+
+    stores = overrides.get('stores') or {}
+    if not isinstance(stores, dict):
+        errors.append("stores: expected an object")
+        stores = {}
+    for store_name, settings in stores.items():
+        if store_name not in Config.ACTIVE_STORES:
+            errors.append(f"stores.{store_name}: unknown store")
+            continue
+        if not isinstance(settings, dict):
+            errors.append(f"stores.{store_name}: expected an object")
+            continue
+        for key, value in settings.items():
+            name = f"stores.{store_name}.{key}"
+            if key not in STORE_SETTINGS:
+                errors.append(f"{name}: not a runtime setting")
+                continue
+            value = _coerce(value, *STORE_SETTINGS[key], name, errors)
+            if key == 'engine' and value is not None and value not in ENGINES:
+                errors.append(f"{name}: expected one of {ENGINES}, got {value!r}")
+                continue
+            if value is not None:
+                clean.setdefault('stores', {}).setdefault(store_name, {})[key] = value
+
+    if errors:
+        raise ConfigError(errors)
+    return clean
+
+
+def _merge(base: Dict, overrides: Dict) -> Dict:
+    """הגדרות מקור אחד על גבי הקודם (החנויות ממוזגות לפי מפתח)"""
+    merged = dict(base)
+    for name, value in overrides.items():
+        if name == 'stores':
+            stores = {store: dict(settings) for store, settings in merged.get('stores', {}).items()}
+            for store_name, settings in value.items():
+                stores.setdefault(store_name, {}).update(settings)
+            merged['stores'] = stores
+        else:
+            merged[name] = value
+    return merged
+
+
+def env_overrides(environ=None) -> Dict:
+    """ההגדרות ממשתני הסביבה (לפני בדיקה)"""
+    environ = os.environ if environ is None else environ
+    overrides = {}
+    for name in RUNTIME_SETTINGS:
+        if ENV_PREFIX + name in environ:
+            overrides[name] = environ[ENV_PREFIX + name]
+    for store_name in Config.ACTIVE_STORES:
+        for key in STORE_SETTINGS:
+            variable = f"{ENV_PREFIX}STORE_{store_name.upper()}_{key.upper()}"
+            if variable in environ:
+                overrides.setdefault('stores', {}).setdefault(store_name, {})[key] = environ[variable]
+    return overrides
+
+
+def file_overrides(path: str) -> Dict:
+    """
+    ההגדרות מהקובץ (לפני בדיקה) - קובץ שלא קיים = אין שינויים
+
+    Raises:
+        ConfigError: הקובץ לא JSON תקין
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError([f"{path}: {e}"])
+    if not isinstance(data, dict):
+        raise ConfigError([f"{path}: expected a JSON object"])
+    return data
+
+
+class RuntimeConfig:
+    """ההגדרות החיות של התהליך - טעינה, החלה, מאזינים והיסטוריה"""
+
+    def __init__(self, path: Optional[str] = None, db_path: Optional[str] = None):
+        self.path = path or Config.RUNTIME_CONFIG_PATH
+        self.db_path = db_path
+        self.version = 0
+        self.hash = None
+        self.history = deque(maxlen=Config.RUNTIME_CONFIG_HISTORY)
+        self._defaults = self._snapshot()
+        self._lock = threading.RLock()
+        self._mtime = -1  # הבדיקה הראשונה תמיד טוענת (גם בלי קובץ - בשביל משתני הסביבה)
+        self._watcher = None
+        self._stop = threading.Event()
+        self._shared = self._init_db()
+
+    def _init_db(self) -> bool:
+        try:
+            get_connection(self.db_path).executescript(SCHEMA)
+            return True
+        except Exception as e:
+            logger.error(f"Runtime config history will not be persisted: {e}")
+            return False
+
+    def _snapshot(self) -> Dict:
+        """הערכים הנוכחיים ב-Config של כל ההגדרות החיות"""
+        snapshot = {name: getattr(Config, name) for name in RUNTIME_SETTINGS}
+        snapshot['stores'] = {
+            store_name: {key: store_config.get(key, Config.STORE_DEFAULTS.get(key, False))
+                         for key in STORE_SETTINGS}
+            for store_name, store_config in Config.ACTIVE_STORES.items()
+        }
+        return snapshot
+
+    def load(self) -> Dict:
+        """ההגדרות האפקטיביות מכל המקורות (בדוקות)"""
+        effective = _merge(self._defaults, validate(env_overrides()))
+        return _merge(effective, validate(file_overrides(self.path)))
+
+    def reload(self, source: str = 'reload') -> Optional[Dict]:
+        """
+        טעינה מחדש והחלה
+
+        Returns:
+            השינויים שהוחלו ({} אם לא השתנה כלום), או None אם ההגדרות לא חוקיות
+        """
+        try:
+            return self.apply(self.load(), source)
+        except ConfigError as e:
+            logger.error(f"Rejected runtime config change: {e}")
+            return None
+
+    def apply(self, settings: Dict, source: str = 'api') -> Dict:
+        """
+        החלת הגדרות מלאות (כמו ש-load מחזיר) - הכל או כלום
+
+        Raises:
+            ConfigError: ההגדרות לא חוקיות או שרכיב סירב לשינוי
+        """
+        settings = _merge(self._defaults, validate(settings))
+        with self._lock:
+            previous = self._snapshot()
+            changes = self._diff(previous, settings)
+            if not changes:
+                return {}
+
+            self._write(settings)
+            notified = []
+            try:
+                with _listeners_lock:
+                    listeners = list(_listeners)
+                for listener in listeners:
+                    listener(changes)
+                    notified.append(listener)
+            except Exception as e:
+                logger.error(f"Runtime config change failed, rolling back: {e}")
+                self._write(previous)
+                reverse = {name: (new, old) for name, (old, new) in changes.items()}
+                for listener in notified:
+                    try:
+                        listener(reverse)
+                    except Exception as rollback_error:
+                        logger.error(f"Failed to roll back runtime config listener: {rollback_error}")
+                raise ConfigError([f"rolled back: {e}"])
+
+            self._record(settings, changes, source)
+            return changes
+
+    def _diff(self, previous: Dict, settings: Dict) -> Dict:
+        changes = {}
+        for name in RUNTIME_SETTINGS:
+            if previous[name] != settings[name]:
+                changes[name] = (previous[name], settings[name])
+        for store_name, store_settings in settings.get('stores', {}).items():
+            for key, value in store_settings.items():
+                old = previous['stores'][store_name][key]
+                if old != value:
+                    changes[f"stores.{store_name}.{key}"] = (old, value)
+        return changes
+
+    def _write(self, settings: Dict):
+        """כתיבת הערכים ל-Config (ACTIVE_STORES מוחלף בבת אחת - קוראים לא רואים חצי שינוי)"""
+        for name in RUNTIME_SETTINGS:
+            setattr(Config, name, settings[name])
+        stores = copy.deepcopy(Config.ACTIVE_STORES)
+        for store_name, store_settings in settings.get('stores', {}).items():
+            stores[store_name].update(store_settings)
+        Config.ACTIVE_STORES = stores
+
+    def _record(self, settings: Dict, changes: Dict, source: str):
+        """גרסה חדשה בהיסטוריה"""
+        data = json.dumps(settings, sort_keys=True, ensure_ascii=False)
+        self.version += 1
+        self.hash = hashlib.sha1(data.encode('utf-8')).hexdigest()[:12]
+        self.history.append({
+            'version': self.version,
+            'hash': self.hash,
+            'applied_at': time.time(),
+            'source': source,
+            'changes': {name: list(values) for name, values in changes.items()}
+        })
+        logger.info(f"Runtime config v{self.version} ({self.hash}) applied from {source}: "
+                    + ', '.join(f"{name}={new!r}" for name, (old, new) in changes.items()))
+
+        if self._shared:
+            try:
+                # workers שמחילים את אותה גרסה נרשמים פעם אחת
+                with get_connection(self.db_path) as conn:
+                    conn.execute(
+                        'INSERT OR IGNORE INTO config_versions (hash, created_at, source, settings) VALUES (?, ?, ?, ?)',
+                        (self.hash, time.time(), source, data))
+            except Exception as e:
+                logger.error(f"Failed to persist runtime config version: {e}")
+
+    def stored_versions(self, limit: int = 20) -> List[Dict]:
+        """הגרסאות השמורות בטבלה (מכל ה-workers), מהחדשה לישנה"""
+        if not self._shared:
+            return []
+        rows = get_connection(self.db_path).execute(
+            'SELECT hash, created_at, source, settings FROM config_versions ORDER BY created_at DESC LIMIT ?',
+            (limit,)).fetchall()
+        return [{'hash': row['hash'], 'created_at': row['created_at'], 'source': row['source'],
+                 'settings': json.loads(row['settings'])} for row in rows]
+
+    def check_file(self) -> Optional[Dict]:
+        """טעינה מחדש אם הקובץ השתנה מאז הבדיקה הקודמת"""
+        try:
+            mtime = os.stat(self.path).st_mtime if self.path else None
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        return self.reload(source=f"file:{self.path}" if mtime else 'file removed')
+
+    def start_watching(self, interval: Optional[float] = None):
+        """thread שבודק את הקובץ ברקע (פעם אחת לתהליך - ב-gunicorn אחרי ה-fork)"""
+        interval = Config.RUNTIME_CONFIG_POLL_INTERVAL if interval is None else interval
+        if self._watcher or not interval:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.check_file()
+                except Exception as e:
+                    logger.error(f"Runtime config watcher failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='runtime-config', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def status(self) -> Dict:
+        return {
+            'version': self.version,
+            'hash': self.hash,
+            'path': self.path,
+            'settings': self._snapshot(),
+            'history': list(self.history)
+        }
+
+
+_runtime_config = None
+_runtime_config_lock = threading.Lock()
+
+
+def get_runtime_config() -> RuntimeConfig:
+    """ההגדרות החיות של התהליך (נוצר בשימוש הראשון, עם החלת הקובץ והסביבה)"""
+    global _runtime_config
+    if _runtime_config is None:
+        with _runtime_config_lock:
+            if _runtime_config is None:
+                runtime_config = RuntimeConfig()
+                runtime_config.check_file()
+                _runtime_config = runtime_config
+    return _runtime_config
+
+
+if __name__ == '__main__':
+    import sys
+
+    if '--check' in sys.argv:
+        try:
+            validate(env_overrides())
+            validate(file_overrides(Config.RUNTIME_CONFIG_PATH))
+            print(f"✅ {Config.RUNTIME_CONFIG_PATH}: OK")
+        except ConfigError as e:
+            print(f"❌ {Config.RUNTIME_CONFIG_PATH}:")
+            for error in e.errors:
+                print(f"   - {error}")
+            sys.exit(1)
+    else:
+        runtime_config = get_runtime_config()
+        print(json.dumps(runtime_config.status(), indent=2, ensure_ascii=False, default=str))
+        for version in runtime_config.stored_versions():
+            print(f"{version['hash']}  {time.ctime(version['created_at'])}  {version['source']}")
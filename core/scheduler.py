@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+מתזמן הסריקות - כל סריקה של חנות (חיפוש של משתמש, חיפוש מרובה, רענון ברקע
+ובדיקת זמינות) עוברת דרך תור אחד לכל חנות, עם workers לפי ה-concurrency שלה
+
+- מחלקות עדיפות: interactive, batch, refresh, probe
+- תור הוגן משוקלל (WFQ) בכל חנות - לכל מחלקה נתח לפי SCHEDULER_WEIGHTS,
+  כך ש-batch ורענונים מתקדמים גם בעומס אבל לא על חשבון המשתמשים
+- SCHEDULER_RESERVED_SLOTS מקומות בכל חנות שמורים ל-interactive בלבד
+- תור מלא: משימה חדשה דוחקת משימה ממתינה ממחלקה נמוכה יותר (Preempted).
+  סריקה שכבר רצה לא נעצרת - הדפדפן שלה כבר באמצע
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+from .admission import CapacityExceeded
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+REFRESH = 'refresh'
+PROBE = 'probe'
+
+# מהחשובה לפחות חשובה - הסדר קובע גם מי נדחק מהתור
+PRIORITY_CLASSES = (INTERACTIVE, BATCH, REFRESH, PROBE)
+
+
+class Preempted(Exception):
+    """המשימה נדחקה מהתור לטובת משימה בעדיפות גבוהה יותר"""
+
+
+class _Task:
+    __slots__ = ('priority', 'fn', 'args', 'future', 'finish', 'enqueued')
+
+    def __init__(self, priority: str, fn: Callable, args: tuple, finish: float):
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.future = Future()
+        self.finish = finish  # תג הסיום הווירטואלי (WFQ)
+        self.enqueued = time.time()
+
+
+class _StoreQueue:
+    """התור וה-workers של חנות אחת (כל השדות מוגנים במנעול של המתזמן)"""
+
+    def __init__(self, store_name: str, lock: threading.Lock):
+        self.store_name = store_name
+        self.concurrency = 1
+        self.condition = threading.Condition(lock)
+        self.queues = {priority: deque() for priority in PRIORITY_CLASSES}
+        self.last_finish = dict.fromkeys(PRIORITY_CLASSES, 0.0)
+        self.virtual_time = 0.0
+        self.running = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self.workers = 0
+        self.avg_duration = float(Config.REQUEST_TIMEOUT)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(tasks) for tasks in self.queues.values())
+
+    @property
+    def idle(self) -> int:
+        return self.workers - sum(self.running.values())
+
+
+class ScrapeScheduler:
+    """תורי עדיפויות לכל החנויות של PriceFinder אחד"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, max_queue: Optional[int] = None,
+                 reserved_slots: Optional[int] = None):
+        self.weights = {**Config.SCHEDULER_WEIGHTS, **(weights or {})}
+        self.max_queue = max_queue or Config.SCHEDULER_QUEUE_SIZE
+        self.reserved_slots = Config.SCHEDULER_RESERVED_SLOTS if reserved_slots is None else reserved_slots
+
+        self._lock = threading.Lock()
+        self._stores: Dict[str, _StoreQueue] = {}
+        self._closed = False
+
+        self.submitted = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self.completed = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self.preempted = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self.rejected = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self._waits = {priority: deque(maxlen=200) for priority in PRIORITY_CLASSES}  # זמני המתנה אחרונים
+
+    def submit(self, store_name: str, priority: str, fn: Callable, *args,
+               concurrency: Optional[int] = None) -> Future:
+        """
+        משימה לתור של החנות
+
+        Args:
+            store_name: החנות (לכל חנות תור ו-workers משלה)
+            priority: אחת מ-PRIORITY_CLASSES
+            fn, args: הסריקה עצמה - fn(*args)
+            concurrency: כמה סריקות במקביל בחנות (ה-concurrency שלה מההגדרות)
+
+        Returns:
+            Future עם התוצאה - cancel() מוציא משימה שעוד לא התחילה מהתור
+
+        Raises:
+            CapacityExceeded: התור של החנות מלא במשימות בעדיפות זהה או גבוהה יותר
+        """
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        victim = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Scheduler is shut down')
+
+            store = self._stores.get(store_name)
+            if store is None:
+                store = self._stores[store_name] = _StoreQueue(store_name, self._lock)
+            if concurrency:
+                self._resize(store, concurrency)
+
+            if store.queued >= self.max_queue:
+                victim = self._evict(store, priority)
+                if victim is None and store.queued >= self.max_queue:
+                    self.rejected[priority] += 1
+                    raise CapacityExceeded(f'Scrape queue for {store_name} is full', self._retry_after(store))
+
+            # WFQ - תג הסיום של המשימה: מאיפה שהמחלקה שלה הגיעה, פלוס עלות לפי המשקל
+            start = max(store.virtual_time, store.last_finish[priority])
+            task = _Task(priority, fn, args, start + 1.0 / self.weights[priority])
+            store.last_finish[priority] = task.finish
+            store.queues[priority].append(task)
+            self.submitted[priority] += 1
+
+            if store.idle > 0:
+                store.condition.notify()
+            elif store.workers < store.concurrency:
+                self._spawn(store)
+
+        if victim is not None:
+            # מחוץ למנעול - ה-callbacks של הנדחקת עשויים להגיש משימות חדשות.
+            # ייתכן שהיא בוטלה בינתיים - אז אין מה לדווח
+            if victim.future.set_running_or_notify_cancel():
+                victim.future.set_exception(Preempted(f'Preempted by {priority} work in {store_name}'))
+
+        task.future.add_done_callback(lambda future: self._discard(store, task))
+        return task.future
+
+    def _resize(self, store: _StoreQueue, concurrency: int):
+        """concurrency חדש מההגדרות - workers עודפים יוצאים כשהם מסיימים (בתוך המנעול)"""
+        if concurrency != store.concurrency:
+            store.concurrency = concurrency
+            store.condition.notify_all()
+
+    def _evict(self, store: _StoreQueue, priority: str) -> Optional[_Task]:
+        """
+        דחיקת המשימה האחרונה מהמחלקה הנמוכה ביותר שמתחת ל-priority (בתוך המנעול).
+        None - אין את מי לדחוק, או שהתפנה מקום ממשימה שבוטלה
+        """
+        rank = PRIORITY_CLASSES.index(priority)
+        for lower in reversed(PRIORITY_CLASSES[rank + 1:]):
+            while store.queues[lower]:
+                victim = store.queues[lower].pop()
+                if victim.future.cancelled():
+                    # בוטלה ו-_discard עוד מחכה למנעול - התפנה מקום בלי לדחוק אף אחד
+                    if store.queued < self.max_queue:
+                        return None
+                    continue
+                self.preempted[lower] += 1
+                logger.info(f"Preempted queued {lower} scrape in {store.store_name} for {priority} work")
+                return victim
+        return None
+
+    def _discard(self, store: _StoreQueue, task: _Task):
+        """משימה שבוטלה לפני שהתחילה - יוצאת מהתור מיד (כדי שעומק התור יהיה נכון)"""
+        if not task.future.cancelled():
+            return
+        with self._lock:
+            try:
+                store.queues[task.priority].remove(task)
+            except ValueError:
+                pass
+
+    def _retry_after(self, store: _StoreQueue) -> int:
+        rounds = (store.queued + 1) / max(store.concurrency, 1)
+        return max(1, int(round(store.avg_duration * rounds)))
+
+    def _spawn(self, store: _StoreQueue):
+        store.workers += 1
+        thread = threading.Thread(target=self._worker, args=(store,),
+                                  name=f'scrape-{store.store_name}-{store.workers}', daemon=True)
+        thread.start()
+
+    def _next(self, store: _StoreQueue) -> Optional[_Task]:
+        """
+        המשימה הבאה - תג הסיום הנמוך ביותר מבין ראשי המחלקות. מחלקות שאינן
+        interactive לא תופסות את המקומות השמורים (בתוך המנעול)
+        """
+        background = sum(count for priority, count in store.running.items() if priority != INTERACTIVE)
+        background_limit = max(store.concurrency - self.reserved_slots, 1)
+
+        best = None
+        for priority, tasks in store.queues.items():
+            if not tasks or (priority != INTERACTIVE and background >= background_limit):
+                continue
+            if best is None or tasks[0].finish < best.finish:
+                best = tasks[0]
+
+        if best is not None:
+            store.queues[best.priority].popleft()
+            store.virtual_time = best.finish
+        return best
+
+    def _worker(self, store: _StoreQueue):
+        while True:
+            with self._lock:
+                task = None
+                while task is None:
+                    if self._closed or store.workers > store.concurrency:
+                        store.workers -= 1
+                        return
+                    task = self._next(store)
+                    if task is None and not store.condition.wait(Config.SCHEDULER_IDLE_TIMEOUT):
+                        if not store.queued:
+                            store.workers -= 1
+                            return
+                store.running[task.priority] += 1
+
+            wait_time = time.time() - task.enqueued
+            start_time = time.time()
+            ran = task.future.set_running_or_notify_cancel()
+            try:
+                if ran:
+                    try:
+                        task.future.set_result(task.fn(*task.args))
+                    except BaseException as e:
+                        task.future.set_exception(e)
+            finally:
+                with self._lock:
+                    store.running[task.priority] -= 1
+                    if ran:
+                        self.completed[task.priority] += 1
+                        self._waits[task.priority].append(wait_time)
+                        store.avg_duration = 0.8 * store.avg_duration + 0.2 * (time.time() - start_time)
+                    # מקום התפנה - אולי משימת רקע שחיכתה למקום הלא-שמור יכולה לצאת
+                    store.condition.notify_all()
+
+    def shutdown(self):
+        """ביטול כל מה שממתין ועצירת ה-workers (סריקות שרצות מסתיימות)"""
+        with self._lock:
+            self._closed = True
+            pending = []
+            for store in self._stores.values():
+                for tasks in store.queues.values():
+                    pending.extend(tasks)
+                    tasks.clear()
+                store.condition.notify_all()
+        for task in pending:
+            task.future.cancel()
+
+    def queue_depth(self, priority: Optional[str] = None) -> int:
+        """כמה משימות ממתינות (בכל החנויות, או רק במחלקה אחת)"""
+        with self._lock:
+            return sum(len(tasks) for store in self._stores.values()
+                       for name, tasks in store.queues.items() if priority in (None, name))
+
+    @staticmethod
+    def _percentile(values: List[float], fraction: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+    def stats(self) -> Dict:
+        """עומק התורים לכל חנות ומחלקה, ומדדי המתנה לכל מחלקה"""
+        with self._lock:
+            stores = {
+                name: {
+                    'concurrency': store.concurrency,
+                    'workers': store.workers,
+                    'running': dict(store.running),
+                    'queued': {priority: len(tasks) for priority, tasks in store.queues.items()}
+                }
+                for name, store in self._stores.items()
+            }
+            classes = {
+                priority: {
+                    'weight': self.weights[priority],
+                    'queued': sum(s['queued'][priority] for s in stores.values()),
+                    'running': sum(s['running'][priority] for s in stores.values()),
+                    'submitted': self.submitted[priority],
+                    'completed': self.completed[priority],
+                    'preempted': self.preempted[priority],
+                    'rejected': self.rejected[priority],
+                    'wait_p95_seconds': round(self._percentile(list(self._waits[priority]), 0.95), 3)
+                }
+                for priority in PRIORITY_CLASSES
+            }
+        return {
+            'queued': sum(c['queued'] for c in classes.values()),
+            'running': sum(c['running'] for c in classes.values()),
+            'max_queue_per_store': self.max_queue,
+            'classes': classes,
+            'stores': stores
+        }
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+עבודות חיפוש אסינכרוניות - שליחה מחזירה מזהה מיד, והלקוח שואל על
+הסטטוס (poll / long-poll) ומקבל תוצאות חלקיות כל פעם שחנות מסיימת
+
+הסריקה רצה במאגר threads משלה, כך שמספר ה-workers של שרת ה-web
+לא תלוי במספר הסריקות שרצות במקביל. מצב כל עבודה נכתב גם לטבלה ב-SQLite,
+כדי ש-worker אחר (שרת עם כמה תהליכים) יוכל לענות על polling שלה
+
+חיפוש זהה של כמה לקוחות הוא עבודה אחת - כל שליחה מקבלת מזהה מנוי משלה,
+וביטול רק מנתק את המנוי. העבודה עצמה מבוטלת כשהמנוי האחרון עוזב
+"""
+
+import json
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+from config import Config
+from .admission import CapacityExceeded
+from .database import get_connection
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_jobs (
+    job_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+
+class SearchJob:
+    """עבודת חיפוש אחת - המצב שלה, התוצאות החלקיות והסופיות"""
+
+    def __init__(self, query: str, params: Dict, key: str):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.params = params
+        self.key = key
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.finished_at = None
+        self.last_access = self.created_at
+        self.version = 0  # עולה בכל שינוי - ל-long-poll
+        self.stores_done: List[str] = []
+        self.partial_products: List[Dict] = []
+        self.results: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.retry_after: Optional[int] = None
+        self.subscribers = set()  # מזהי המנויים שעוד מחכים לתוצאות
+        self.future = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self, stores_total: int = 0) -> Dict:
+        data = {
+            'job_id': self.id,
+            'query': self.query,
+            'status': self.status,
+            'version': self.version,
+            'created_at': self.created_at,
+            'elapsed': round((self.finished_at or time.time()) - self.created_at, 2),
+            'stores_done': list(self.stores_done),
+            'stores_total': stores_total
+        }
+        if self.status == DONE:
+            data['results'] = self.results
+        else:
+            data['partial_products'] = list(self.partial_products)
+        if self.error:
+            data['error'] = self.error
+        if self.retry_after:
+            data['retry_after'] = self.retry_after
+        return data
+
+
+class StoredJob:
+    """עבודה של worker אחר - המצב האחרון שנכתב לטבלה המשותפת"""
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self.id = data['job_id']
+        self.status = data['status']
+        self.version = data['version']
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self, stores_total: int = 0) -> Dict:
+        return self.data
+
+
+class SearchJobManager:
+    """ניהול עבודות החיפוש - הרצה, איחוד בקשות זהות, long-poll וניקוי לפי TTL"""
+
+    def __init__(self, price_finder, max_workers: Optional[int] = None,
+                 ttl: Optional[float] = None, db_path: Optional[str] = None):
+        self.price_finder = price_finder
+        self.ttl = ttl or Config.SEARCH_JOB_TTL
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.accepting = True
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or Config.SEARCH_JOB_WORKERS,
+                                            thread_name_prefix='search-job')
+        self._jobs: Dict[str, SearchJob] = {}
+        self._active: Dict[str, SearchJob] = {}  # מפתח חיפוש -> עבודה שעוד רצה
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._last_cleanup = time.time()
+        self.shared = self._open_shared_state()
+
+    def _open_shared_state(self) -> bool:
+        """הטבלה המשותפת בין workers - כשלון רק מבטל את השיתוף"""
+        try:
+            get_connection(self.db_path).executescript(SCHEMA)
+            return True
+        except Exception as e:
+            logger.error(f"Search jobs will not be shared between workers: {e}")
+            return False
+
+    def submit(self, query: str, max_results: int = 5, rank_by: Optional[str] = None) -> Tuple[SearchJob, str]:
+        """
+        שליחת חיפוש - חוזר מיד. חיפוש זהה שכבר רץ מחזיר את אותה עבודה
+
+        Returns:
+            (העבודה, מזהה המנוי של השולח - לביטול דרך cancel)
+
+        Raises:
+            CapacityExceeded: כשיש כבר יותר עבודות ממה שמאגר הסריקה ותור ההמתנה מכילים
+        """
+        self.cleanup()
+        key = self.price_finder.cache_key(query, max_results, rank_by)
+        admission = self.price_finder.admission
+
+        subscriber = uuid.uuid4().hex
+        with self._lock:
+            job = self._active.get(key)
+            if job and not job.finished:
+                job.last_access = time.time()
+                job.subscribers.add(subscriber)
+                return job, subscriber
+
+            if not self.accepting:
+                raise CapacityExceeded('Server is shutting down', admission.retry_after())
+            if len(self._active) >= admission.max_concurrent + admission.max_queue:
+                raise CapacityExceeded('Too many pending search jobs', admission.retry_after())
+
+            job = SearchJob(query, {'max_results': max_results, 'rank_by': rank_by}, key)
+            job.subscribers.add(subscriber)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            job.future = self._executor.submit(self._run, job)
+
+        logger.info(f"Submitted search job {job.id} for '{query}'")
+        return job, subscriber
+
+    def get(self, job_id: str):
+        """העבודה לפי מזהה (מעדכן את זמן הגישה האחרון) - מקומית או מהטבלה המשותפת"""
+        self.cleanup()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.last_access = time.time()
+                return job
+        return self._load(job_id)
+
+    def wait(self, job_id: str, since_version: int = -1, timeout: float = 0) -> Optional[SearchJob]:
+        """
+        long-poll - מחכה עד שיש שינוי אחרי since_version, עד שהעבודה מסתיימת או עד timeout
+        """
+        self.cleanup()
+        timeout = min(timeout, Config.SEARCH_JOB_MAX_WAIT)
+        deadline = time.time() + timeout
+        with self._changed:
+            job = self._jobs.get(job_id)
+            while job and not job.finished and job.version <= since_version:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            if job:
+                job.last_access = time.time()
+                return job
+
+        # עבודה של worker אחר - בדיקה חוזרת בטבלה המשותפת
+        job = self._load(job_id)
+        while job and not job.finished and job.version <= since_version and time.time() < deadline:
+            time.sleep(min(Config.SEARCH_JOB_SHARED_POLL, max(deadline - time.time(), 0)))
+            job = self._load(job_id) or job
+        return job
+
+    def cancel(self, job_id: str, subscriber: Optional[str]) -> bool:
+        """
+        ניתוק מנוי מהעבודה. כשהמנוי האחרון עוזב העבודה מבוטלת - עבודה בתור
+        לא תרוץ, ועבודה שרצה לא תעדכן יותר את התוצאות
+
+        Returns:
+            האם המנוי נותק (מזהה לא מוכר - אין שום שינוי)
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if not job or job.finished or subscriber not in job.subscribers:
+                return False
+            job.subscribers.discard(subscriber)
+            if job.subscribers:
+                return True
+            if job.future:
+                job.future.cancel()
+            snapshot = self._finish(job, CANCELLED)
+        self._store(snapshot)
+        return True
+
+    def stores_total(self) -> int:
+        return len(self.price_finder.scrapers)
+
+    def _run(self, job: SearchJob):
+        with self._changed:
+            if job.finished:
+                return
+            job.status = RUNNING
+            snapshot = self._touch(job)
+        self._store(snapshot)
+
+        def on_store_results(store_name, products):
+            with self._changed:
+                if job.finished:
+                    return
+                job.stores_done.append(store_name)
+                job.partial_products.extend(products)
+                snapshot = self._touch(job)
+            self._store(snapshot)
+
+        try:
+            results = self.price_finder.search_all_stores(
+                job.query, job.params['max_results'], job.params['rank_by'],
+                on_store_results=on_store_results)
+        except CapacityExceeded as e:
+            logger.warning(f"Search job {job.id} rejected: {e}")
+            snapshot = None
+            with self._changed:
+                if not job.finished:
+                    job.error = str(e)
+                    job.retry_after = e.retry_after
+                    snapshot = self._finish(job, FAILED)
+            self._store(snapshot)
+            return
+        except Exception as e:
+            logger.error(f"Search job {job.id} failed: {e}")
+            snapshot = None
+            with self._changed:
+                if not job.finished:
+                    job.error = str(e)
+                    snapshot = self._finish(job, FAILED)
+            self._store(snapshot)
+            return
+
+        snapshot = None
+        with self._changed:
+            if not job.finished:
+                job.results = results
+                job.partial_products = []
+                snapshot = self._finish(job, DONE)
+        self._store(snapshot)
+
+    def _touch(self, job: SearchJob) -> Optional[Dict]:
+        """
+        סימון שינוי ויקיצה של כל מי שמחכה (בתוך המנעול)
+
+        Returns:
+            המצב לטבלה המשותפת - נכתב ב-_store אחרי שחרור המנעול, כדי
+            שהכתיבה לדיסק לא תעכב את submit / get / wait
+        """
+        job.version += 1
+        self._changed.notify_all()
+        return job.to_dict(self.stores_total()) if self.shared else None
+
+    def _store(self, snapshot: Optional[Dict]):
+        """כתיבת מצב העבודה לטבלה המשותפת (מחוץ למנעול - גרסה ישנה לא דורסת חדשה)"""
+        if not snapshot:
+            return
+        try:
+            data = json.dumps(snapshot, ensure_ascii=False, default=str)
+            with get_connection(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO search_jobs (job_id, version, status, updated_at, data)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (job_id) DO UPDATE SET
+                        version = excluded.version,
+                        status = excluded.status,
+                        updated_at = excluded.updated_at,
+                        data = excluded.data
+                    WHERE excluded.version > search_jobs.version
+                """, (snapshot['job_id'], snapshot['version'], snapshot['status'], time.time(), data))
+        except Exception as e:
+            logger.error(f"Failed to store search job {snapshot['job_id']}: {e}")
+
+    def _load(self, job_id: str) -> Optional[StoredJob]:
+        """עבודה מהטבלה המשותפת (של worker אחר)"""
+        if not self.shared:
+            return None
+        row = get_connection(self.db_path).execute(
+            'SELECT data FROM search_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return StoredJob(json.loads(row['data'])) if row else None
+
+    def _finish(self, job: SearchJob, status: str) -> Optional[Dict]:
+        job.status = status
+        job.finished_at = time.time()
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+        return self._touch(job)
+
+    def cleanup(self, force: bool = False) -> int:
+        """
+        מחיקת עבודות שאף אחד לא שאל עליהן במשך TTL (וביטול שלהן אם עוד רצות).
+        נקרא מ-submit, get ו-wait - לכל היותר פעם ב-SEARCH_JOB_CLEANUP_INTERVAL
+        """
+        now = time.time()
+        if not force and now - self._last_cleanup < Config.SEARCH_JOB_CLEANUP_INTERVAL:
+            return 0
+
+        snapshots = []
+        with self._changed:
+            if not force and now - self._last_cleanup < Config.SEARCH_JOB_CLEANUP_INTERVAL:
+                return 0  # thread אחר כבר ניקה
+            self._last_cleanup = now
+            expired = [job for job in self._jobs.values() if now - job.last_access > self.ttl]
+            for job in expired:
+                if not job.finished:
+                    if job.future:
+                        job.future.cancel()
+                    snapshots.append(self._finish(job, CANCELLED))
+                del self._jobs[job.id]
+
+        for snapshot in snapshots:
+            self._store(snapshot)
+
+        if self.shared:
+            with get_connection(self.db_path) as conn:
+                conn.execute('DELETE FROM search_jobs WHERE updated_at < ?', (now - self.ttl,))
+
+        if expired:
+            logger.info(f"Cleaned up {len(expired)} abandoned search jobs")
+        return len(expired)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {'jobs': len(jobs), 'by_status': counts}
+
+    def drain(self, timeout: float) -> bool:
+        """
+        הפסקת קבלת עבודות חדשות והמתנה לסיום העבודות שרצות (לכיבוי מסודר)
+
+        Returns:
+            האם כל העבודות הסתיימו בזמן
+        """
+        deadline = time.time() + timeout
+        with self._changed:
+            self.accepting = False
+            while self._active and time.time() < deadline:
+                self._changed.wait(deadline - time.time())
+            drained = not self._active
+        self.shutdown()
+        return drained
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+סטטיסטיקות חיפוש - מונים בזיכרון שנכתבים ל-SQLite באצוות
+הסכומים המוצגים = מה שנשמר ב-DB (מכל התהליכים, נקרא מחדש לכל היותר פעם
+ב-STATS_SNAPSHOT_TTL שניות) + מה שעוד לא נכתב מהתהליך הזה
+"""
+
+import time
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from typing import List, Dict, Optional
+
+from config import Config
+from .database import get_connection
+from .catalog_index import query_key
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_stats_totals (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS search_stats_queries (
+    query_key TEXT PRIMARY KEY,
+    query TEXT,
+    searches INTEGER NOT NULL,
+    savings_samples INTEGER NOT NULL,
+    savings_percent_sum REAL NOT NULL,
+    last_searched REAL NOT NULL
+);
+"""
+
+# כתיב לתצוגה/לסריקה של השאילתה - נוסף לטבלה שנוצרה בגרסה קודמת
+_ADDED_COLUMNS = {'query': 'TEXT'}
+
+COUNTERS = ('searches', 'products_found', 'failed_searches', 'savings_samples', 'savings_percent_sum')
+
+
+class SearchStats:
+    """מונים של חיפושים וחיסכון"""
+
+    def __init__(self, db_path: Optional[str] = None, flush_every: Optional[int] = None,
+                 flush_interval: Optional[float] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.flush_every = flush_every or Config.STATS_FLUSH_EVERY
+        self.flush_interval = flush_interval or Config.STATS_FLUSH_INTERVAL
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # כתיבה אחת בכל פעם, וקריאת הסכומים לא באמצע כתיבה
+        self._persisted = dict.fromkeys(COUNTERS, 0)  # הסכומים ב-DB בקריאה האחרונה
+        self._persisted_at = 0.0
+        self._pending = dict.fromkeys(COUNTERS, 0)
+        self._flushing = dict.fromkeys(COUNTERS, 0)  # האצווה שנכתבת עכשיו
+        self._pending_queries = defaultdict(lambda: [0, 0, 0.0, 0.0, ''])
+        self._last_flush = time.time()
+        self._flush_failed = False  # אחרי כשל - ניסיון חוזר רק לפי הזמן, לא בכל חיפוש
+
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+        self._refresh_persisted()
+        atexit.register(self.flush)
+
+    @property
+    def connection(self):
+        return get_connection(self.db_path)
+
+    def _migrate(self):
+        """הוספת העמודות החדשות לטבלת search_stats_queries שנוצרה בגרסה קודמת"""
+        columns = {row['name'] for row in self.connection.execute('PRAGMA table_info(search_stats_queries)')}
+        with self.connection as conn:
+            for column, column_type in _ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE search_stats_queries ADD COLUMN {column} {column_type}')
+
+    def _refresh_persisted(self):
+        """קריאת הסכומים השמורים מה-DB - כוללים את מה שתהליכים אחרים כתבו"""
+        with self._flush_lock:
+            persisted = dict.fromkeys(COUNTERS, 0)
+            for row in self.connection.execute('SELECT name, value FROM search_stats_totals'):
+                if row['name'] in persisted:
+                    persisted[row['name']] = row['value']
+            with self._lock:
+                self._persisted = persisted
+                self._persisted_at = time.time()
+
+    def record_search(self, results: Dict):
+        """עדכון המונים אחרי חיפוש"""
+        best_deal = results.get('best_deal') or {}
+        savings_percent = best_deal.get('savings_percent')
+        failed = not results.get('products') and bool(results.get('errors'))
+
+        with self._lock:
+            deltas = {
+                'searches': 1,
+                'products_found': results.get('total_products', 0),
+                'failed_searches': 1 if failed else 0,
+                'savings_samples': 1 if savings_percent else 0,
+                'savings_percent_sum': savings_percent or 0
+            }
+            for name, delta in deltas.items():
+                self._pending[name] += delta
+
+            query = (results.get('query') or '').strip()
+            query_stats = self._pending_queries[query_key(query)]
+            query_stats[0] += 1
+            query_stats[1] += deltas['savings_samples']
+            query_stats[2] += deltas['savings_percent_sum']
+            query_stats[3] = time.time()
+            query_stats[4] = query  # הכתיב האחרון - זה שנשלח לחנויות
+
+            should_flush = ((self._pending['searches'] >= self.flush_every and not self._flush_failed)
+                            or time.time() - self._last_flush >= self.flush_interval)
+
+        if should_flush:
+            self.flush()
+
+    def snapshot(self) -> Dict:
+        """הסטטיסטיקות הנוכחיות - הסכומים מה-DB (במטמון קצר) ועוד מה שממתין לכתיבה"""
+        if time.time() - self._persisted_at >= Config.STATS_SNAPSHOT_TTL:
+            try:
+                self._refresh_persisted()
+            except Exception as e:
+                logger.error(f"Failed to read stats totals: {e}")
+
+        with self._lock:
+            totals = {name: self._persisted[name] + self._flushing[name] + self._pending[name]
+                      for name in COUNTERS}
+
+        samples = totals['savings_samples']
+        return {
+            'total_searches': int(totals['searches']),
+            'products_found': int(totals['products_found']),
+            'failed_searches': int(totals['failed_searches']),
+            'average_savings': round(totals['savings_percent_sum'] / samples, 1) if samples else 0
+        }
+
+    def flush(self):
+        """
+        כתיבת השינויים שהצטברו ל-SQLite בטרנזקציה אחת - אם הכתיבה נכשלת
+        המונים חוזרים לתור וייכתבו בפעם הבאה
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._last_flush = time.time()
+                if not self._pending['searches']:
+                    return
+                pending, self._pending = self._pending, dict.fromkeys(COUNTERS, 0)
+                pending_queries, self._pending_queries = self._pending_queries, defaultdict(lambda: [0, 0, 0.0, 0.0, ''])
+                self._flushing = pending
+
+            try:
+                self._write(pending, pending_queries)
+            except Exception as e:
+                logger.error(f"Failed to flush stats for {pending['searches']} searches: {e}")
+                with self._lock:
+                    self._flushing = dict.fromkeys(COUNTERS, 0)
+                    self._requeue(pending, pending_queries)
+                    self._flush_failed = True
+                return
+
+            with self._lock:
+                self._flushing = dict.fromkeys(COUNTERS, 0)
+                self._flush_failed = False
+                for name, value in pending.items():
+                    self._persisted[name] += value
+
+        logger.debug(f"Flushed stats for {pending['searches']} searches")
+
+    def _requeue(self, pending: Dict, pending_queries: Dict):
+        """החזרת אצווה שלא נכתבה לתור (בתוך המנעול) - נוספת למה שהצטבר בינתיים"""
+        for name, value in pending.items():
+            self._pending[name] += value
+        for key, values in pending_queries.items():
+            query_stats = self._pending_queries[key]
+            query_stats[0] += values[0]
+            query_stats[1] += values[1]
+            query_stats[2] += values[2]
+            if values[3] > query_stats[3]:
+                query_stats[3], query_stats[4] = values[3], values[4]
+
+    def _write(self, pending: Dict, pending_queries: Dict):
+        """כתיבת אצווה אחת - הכל או כלום"""
+        with self.connection as conn:
+            conn.executemany("""
+                INSERT INTO search_stats_totals (name, value) VALUES (?, ?)
+                ON CONFLICT (name) DO UPDATE SET value = value + excluded.value
+            """, pending.items())
+
+            conn.executemany("""
+                INSERT INTO search_stats_queries
+                    (query_key, searches, savings_samples, savings_percent_sum, last_searched, query)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (query_key) DO UPDATE SET
+                    query = excluded.query,
+                    searches = searches + excluded.searches,
+                    savings_samples = savings_samples + excluded.savings_samples,
+                    savings_percent_sum = savings_percent_sum + excluded.savings_percent_sum,
+                    last_searched = excluded.last_searched
+            """, [(key,) + tuple(values) for key, values in pending_queries.items()])
+
+    def top_queries(self, limit: int = 10) -> List[Dict]:
+        """
+        השאילתות הפופולריות עם החיסכון הממוצע שלהן - query הוא הכתיב האחרון
+        שחיפשו (query_key הוא הצורה הקנונית, לא מחרוזת שאפשר לשלוח לחנות)
+        """
+        self.flush()
+        rows = self.connection.execute("""
+            SELECT query_key, COALESCE(query, query_key) AS query, searches, last_searched,
+                   CASE WHEN savings_samples > 0
+                        THEN ROUND(savings_percent_sum / savings_samples, 1) ELSE 0 END AS average_savings
+            FROM search_stats_queries
+            ORDER BY searches DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+רשימות מעקב והתראות ירידת מחיר
+
+מעקב הוא קישור למוצר או שאילתה (בצורה הקנונית שלה) עם מחיר יעד. כל תוצאה
+חדשה מסריקה (חיפוש, רענון, סריקת קטגוריה) נבדקת רק מול המעקבים הרלוונטיים
+לה - דרך אינדקס בזיכרון לפי קישור ולפי שאילתה, בלי לעבור על כל המעקבים.
+ה-DB נכתב רק כשמעקב מופעל או מתאפס, כך שהבדיקה עומדת בקצב של סריקת קטגוריות
+
+התראה נשלחת פעם אחת כשהמחיר יורד אל מתחת ליעד, ושוב רק אם הוא ממשיך לרדת
+(או אחרי שחזר מעל היעד). ההתראות נשלחות ל-notifier מתוך thread ברקע -
+WATCH_NOTIFIER: log, file (WATCH_ALERTS_FILE, שורת JSON לכל התראה) או
+'module:Class' משלכם
+
+אין משתמשים רשומים - owner הוא מזהה שהלקוח בוחר (מייל, מזהה מכשיר). המעקב
+הראשון של owner מחזיר טוקן אקראי (נשמר רק ה-hash שלו), ובלעדיו אי אפשר לראות,
+להוסיף או למחוק את המעקבים שלו
+"""
+
+import hmac
+import json
+import math
+import time
+import hashlib
+import secrets
+import queue
+import logging
+import importlib
+import threading
+from typing import List, Dict, Optional, Iterable
+
+from config import Config
+from .database import get_connection
+from .catalog_index import query_key
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watches (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL,
+    label TEXT,
+    store TEXT,
+    target_price REAL NOT NULL,
+    alert_price REAL,
+    created_at REAL NOT NULL,
+    triggered_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS watches_owner ON watches (owner);
+
+CREATE TABLE IF NOT EXISTS watch_alerts (
+    id INTEGER PRIMARY KEY,
+    watch_id INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    price REAL NOT NULL,
+    target_price REAL NOT NULL,
+    store TEXT,
+    name TEXT,
+    url TEXT,
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS watch_alerts_owner ON watch_alerts (owner, created_at);
+
+CREATE TABLE IF NOT EXISTS watch_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO watch_meta (id, version) VALUES (1, 0);
+
+CREATE TABLE IF NOT EXISTS watch_owners (
+    owner TEXT PRIMARY KEY,
+    token_hash TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# סוגי מעקב
+PRODUCT = 'product'
+QUERY = 'query'
+
+OUT_OF_STOCK = 'אזל מהמלאי'
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class Watch:
+    """מעקב אחד (שורה בטבלת watches)"""
+
+    __slots__ = ('id', 'owner', 'kind', 'target', 'label', 'store', 'target_price', 'alert_price',
+                 'created_at', 'triggered_at')
+
+    def __init__(self, row):
+        for field in self.__slots__:
+            setattr(self, field, row[field])
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+# ===== notifiers =====
+
+class LogNotifier:
+    """התראות ללוג"""
+
+    def send(self, alert: Dict):
+        logger.info(f"Price alert for {alert['owner']}: {alert['name'] or alert['label']} "
+                    f"at {alert['price']} in {alert['store']} (target {alert['target_price']})")
+
+
+class FileNotifier:
+    """התראות לקובץ - שורת JSON לכל התראה"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.WATCH_ALERTS_FILE
+        self._lock = threading.Lock()
+
+    def send(self, alert: Dict):
+        line = json.dumps(alert, ensure_ascii=False) + '\n'
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+NOTIFIERS = {'log': LogNotifier, 'file': FileNotifier}
+
+
+def create_notifier(spec: Optional[str] = None):
+    """notifier לפי WATCH_NOTIFIER - שם מובנה או 'module:Class' (מחלקה עם send(alert))"""
+    spec = spec or Config.WATCH_NOTIFIER
+    if spec in NOTIFIERS:
+        return NOTIFIERS[spec]()
+    module_name, _, class_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class Watchlist:
+    """המעקבים, האינדקס שלהם בזיכרון ובדיקת תוצאות חדשות מולם"""
+
+    def __init__(self, db_path: Optional[str] = None, notifier=None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.notifier = notifier or create_notifier()
+        self.connection.executescript(SCHEMA)
+
+        self._lock = threading.Lock()
+        self._by_product: Dict[str, Dict[int, Watch]] = {}
+        self._by_query: Dict[str, Dict[int, Watch]] = {}
+        self._version = None
+        self._synced_at = 0.0
+        self._reload()
+
+        self.checked = 0
+        self.triggered = 0
+        self._alerts = queue.Queue()
+        self._sender = threading.Thread(target=self._send_alerts, name='watch-alerts', daemon=True)
+        self._sender.start()
+
+    @property
+    def connection(self):
+        return get_connection(self.db_path)
+
+    # ===== האינדקס =====
+
+    def _reload(self):
+        """בניית האינדקס מחדש מה-DB"""
+        version = self.connection.execute('SELECT version FROM watch_meta').fetchone()[0]
+        by_product, by_query = {}, {}
+        for row in self.connection.execute('SELECT * FROM watches'):
+            watch = Watch(row)
+            index = by_product if watch.kind == PRODUCT else by_query
+            index.setdefault(watch.target, {})[watch.id] = watch
+        with self._lock:
+            self._by_product, self._by_query = by_product, by_query
+            self._version = version
+            self._synced_at = time.time()
+
+    def _sync(self):
+        """
+        workers אחרים (gunicorn) מוסיפים ומוחקים מעקבים - בדיקת מספר הגרסה
+        לכל היותר פעם ב-WATCH_SYNC_INTERVAL, ובנייה מחדש רק אם השתנה
+        """
+        if time.time() - self._synced_at < Config.WATCH_SYNC_INTERVAL:
+            return
+        version = self.connection.execute('SELECT version FROM watch_meta').fetchone()[0]
+        if version != self._version:
+            self._reload()
+        else:
+            self._synced_at = time.time()
+
+    def _bump_version(self, conn):
+        conn.execute('UPDATE watch_meta SET version = version + 1')
+
+    # ===== ניהול מעקבים =====
+
+    def authorize(self, owner: str, token: Optional[str]) -> bool:
+        """האם הטוקן שייך ל-owner (השוואה בזמן קבוע)"""
+        if not owner or not token:
+            return False
+        row = self.connection.execute('SELECT token_hash FROM watch_owners WHERE owner = ?', (owner,)).fetchone()
+        return row is not None and hmac.compare_digest(row['token_hash'], _hash_token(token))
+
+    def add(self, owner: str, target_price: float, url: Optional[str] = None, query: Optional[str] = None,
+            store: Optional[str] = None, token: Optional[str] = None) -> Dict:
+        """
+        מעקב חדש - על קישור מוצר או על שאילתה
+
+        Returns:
+            המעקב. במעקב הראשון של owner גם 'token' - הפעם היחידה שהוא מוחזר
+
+        Raises:
+            ValueError: חסר קישור / שאילתה, מחיר יעד לא חוקי, או שלבעלים כבר יש WATCH_MAX_PER_OWNER מעקבים
+            PermissionError: ל-owner כבר יש טוקן והטוקן שנשלח לא תואם
+        """
+        if not owner:
+            raise ValueError('Missing owner')
+        if bool(url) == bool(query):
+            raise ValueError('Watch either a product url or a query')
+        try:
+            target_price = float(target_price)
+        except (TypeError, ValueError):
+            raise ValueError('Target price must be a number')
+        if not math.isfinite(target_price) or target_price <= 0:
+            raise ValueError('Target price must be a positive number')
+
+        if url:
+            kind, target, label = PRODUCT, url.strip(), url.strip()
+        else:
+            kind, target, label = QUERY, query_key(query), query.strip()
+        if not target:
+            raise ValueError('Empty query')
+        if store:
+            # המפתח בהגדרות (ksp) -> השם שמופיע במוצרים (KSP)
+            store = (Config.get_store_config(store) or {}).get('name', store)
+
+        issued = secrets.token_urlsafe(24)
+        with self.connection as conn:
+            # INSERT OR IGNORE - רק הבקשה הראשונה של owner מקבלת את הטוקן
+            claimed = conn.execute("""
+                INSERT OR IGNORE INTO watch_owners (owner, token_hash, created_at) VALUES (?, ?, ?)
+            """, (owner, _hash_token(issued), time.time())).rowcount
+            if not claimed:
+                issued = None
+                row = conn.execute('SELECT token_hash FROM watch_owners WHERE owner = ?', (owner,)).fetchone()
+                if not token or not hmac.compare_digest(row['token_hash'], _hash_token(token)):
+                    raise PermissionError('Invalid token for this owner')
+
+            count = conn.execute('SELECT COUNT(*) FROM watches WHERE owner = ?', (owner,)).fetchone()[0]
+            if count >= Config.WATCH_MAX_PER_OWNER:
+                raise ValueError(f'Up to {Config.WATCH_MAX_PER_OWNER} watches per owner')
+            cursor = conn.execute("""
+                INSERT INTO watches (owner, kind, target, label, store, target_price, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (owner, kind, target, label, store, target_price, time.time()))
+            self._bump_version(conn)
+            row = conn.execute('SELECT * FROM watches WHERE id = ?', (cursor.lastrowid,)).fetchone()
+
+        watch = Watch(row)
+        with self._lock:
+            index = self._by_product if kind == PRODUCT else self._by_query
+            index.setdefault(target, {})[watch.id] = watch
+        result = watch.to_dict()
+        if issued:
+            result['token'] = issued
+        return result
+
+    def remove(self, watch_id: int, owner: str) -> bool:
+        with self.connection as conn:
+            row = conn.execute('SELECT kind, target FROM watches WHERE id = ? AND owner = ?',
+                               (watch_id, owner)).fetchone()
+            if row is None:
+                return False
+            conn.execute('DELETE FROM watches WHERE id = ?', (watch_id,))
+            self._bump_version(conn)
+
+        with self._lock:
+            index = self._by_product if row['kind'] == PRODUCT else self._by_query
+            watches = index.get(row['target'], {})
+            watches.pop(watch_id, None)
+            if not watches:
+                index.pop(row['target'], None)
+        return True
+
+    def watches(self, owner: str) -> List[Dict]:
+        rows = self.connection.execute(
+            'SELECT * FROM watches WHERE owner = ? ORDER BY created_at', (owner,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def alerts(self, owner: str, since: float = 0, limit: int = 100) -> List[Dict]:
+        rows = self.connection.execute("""
+            SELECT * FROM watch_alerts WHERE owner = ? AND created_at > ?
+            ORDER BY created_at DESC LIMIT ?
+        """, (owner, since, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    # ===== בדיקת תוצאות =====
+
+    def evaluate(self, products: Iterable[Dict], query: Optional[str] = None) -> int:
+        """
+        תוצאות חדשות מול המעקבים הרלוונטיים - מעקבי מוצר לפי הקישור של כל
+        מוצר, ומעקבי שאילתה (אם יש query) מול המוצר הזול ביותר שבמלאי
+
+        Returns:
+            כמה התראות נוצרו
+        """
+        self._sync()
+        candidates = []  # (מעקב, המוצר שנבדק מולו)
+        cheapest = {}  # חנות (או None לכל החנויות) -> המוצר הזול ביותר במלאי
+        with self._lock:
+            for product in products:
+                if not product or product.get('price') is None:
+                    continue
+                watches = self._by_product.get(product.get('url'))
+                if watches:
+                    candidates.extend((watch, product) for watch in watches.values())
+                if query and product.get('availability') != OUT_OF_STOCK:
+                    for store in (None, product.get('store')):
+                        best = cheapest.get(store)
+                        if best is None or product['price'] < best['price']:
+                            cheapest[store] = product
+
+            if query and cheapest:
+                for watch in self._by_query.get(query_key(query), {}).values():
+                    product = cheapest.get(watch.store)
+                    if product is not None:
+                        candidates.append((watch, product))
+
+        self.checked += len(candidates)
+        triggered = 0
+        for watch, product in candidates:
+            if watch.store and watch.store != product.get('store'):
+                continue
+            triggered += self._check(watch, product)
+        return triggered
+
+    def _check(self, watch: Watch, product: Dict) -> int:
+        """מעקב אחד מול מחיר חדש - כתיבה ל-DB רק כשהמצב שלו משתנה"""
+        price = float(product['price'])
+        in_stock = product.get('availability') != OUT_OF_STOCK
+
+        if price > watch.target_price or not in_stock:
+            if watch.alert_price is not None:
+                # חזר מעל היעד - הירידה הבאה תתריע שוב
+                watch.alert_price = None
+                with self.connection as conn:
+                    conn.execute('UPDATE watches SET alert_price = NULL WHERE id = ?', (watch.id,))
+            return 0
+
+        if watch.alert_price is not None and price >= watch.alert_price:
+            return 0
+
+        now = time.time()
+        with self.connection as conn:
+            # תנאי ב-UPDATE - worker אחר שכבר התריע על המחיר הזה מנצח
+            cursor = conn.execute("""
+                UPDATE watches SET alert_price = ?, triggered_at = ?
+                WHERE id = ? AND (alert_price IS NULL OR alert_price > ?)
+            """, (price, now, watch.id, price))
+            watch.alert_price = price
+            if cursor.rowcount == 0:
+                return 0
+            alert = {
+                'watch_id': watch.id,
+                'owner': watch.owner,
+                'price': price,
+                'target_price': watch.target_price,
+                'store': product.get('store'),
+                'name': product.get('name'),
+                'url': product.get('url'),
+                'created_at': now
+            }
+            conn.execute("""
+                INSERT INTO watch_alerts (watch_id, owner, price, target_price, store, name, url, created_at)
+                VALUES (:watch_id, :owner, :price, :target_price, :store, :name, :url, :created_at)
+            """, alert)
+
+        watch.triggered_at = now
+        self.triggered += 1
+        self._alerts.put({**alert, 'kind': watch.kind, 'label': watch.label})
+        return 1
+
+    def _send_alerts(self):
+        """שליחת ההתראות ל-notifier - מחוץ למסלול הסריקה, כדי ש-notifier איטי לא יעכב אותה"""
+        while True:
+            alert = self._alerts.get()
+            if alert is None:
+                return
+            try:
+                self.notifier.send(alert)
+            except Exception as e:
+                logger.error(f"Failed to send price alert for watch {alert['watch_id']}: {e}")
+            finally:
+                self._alerts.task_done()
+
+    def flush(self):
+        """המתנה עד שכל ההתראות שבתור נשלחו"""
+        self._alerts.join()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            products = sum(len(watches) for watches in self._by_product.values())
+            queries = sum(len(watches) for watches in self._by_query.values())
+        return {
+            'product_watches': products,
+            'query_watches': queries,
+            'checked': self.checked,
+            'triggered': self.triggered,
+            'pending_alerts': self._alerts.qsize()
+        }
@@ -6,6 +6,7 @@ Scrapers Package
 
 תיקייה זו מכילה:
 - base_scraper.py: המחלקה הבסיסית לכל הscrapers
+- registry.py: מאיפה נטען ה-scraper של כל חנות, ההגדרות שלו ויצירה עצלה
 - ksp_scraper.py: מנוע חילוץ מ-KSP
 - bug_scraper.py: מנוע חילוץ מ-Bug (עתיד)
 - zap_scraper.py: מנוע חילוץ מ-זאפ (עתיד)
@@ -14,34 +15,30 @@ Scrapers Package
 איך זה עובד:
 1. כל חנות = קובץ נפרד
 2. כל scraper יורש מ-BaseScraper
-3. המערכת טוענת את כולם אוטומטית
-4. קל להוסיף חנות חדשה - רק קובץ אחד!
+3. המערכת טוענת את כל החנויות שב-Config.ACTIVE_STORES (או מ-entry points)
+4. קל להוסיף חנות חדשה - קובץ אחד ורשומה ב-ACTIVE_STORES:
+   'scraper': 'scrapers.bug_scraper:BugScraper', 'engine': 'http', ...
 """
 
 # imports - מה מהתיקייה הזו אפשר להשתמש בו מבחוץ
 from .base_scraper import BaseScraper
 
-# ייבוא scrapers נוספים כשהם יהיו מוכנים
-try:
-    from .ksp_scraper import KSPScraper
-except ImportError:
-    # אם עוד לא קיים הקובץ - לא נורא
-    KSPScraper = None
-
-try:
-    from .bug_scraper import BugScraper
-except ImportError:
-    BugScraper = None
-
-try:
-    from .zap_scraper import ZapScraper  
-except ImportError:
-    ZapScraper = None
-
-try:
-    from .ivory_scraper import IvoryScraper
-except ImportError:
-    IvoryScraper = None
+# ה-scrapers של החנויות נטענים רק כשמבקשים אותם (ראו registry.py)
+_STORE_CLASSES = {
+    'KSPScraper': 'ksp',
+    'BugScraper': 'bug',
+    'ZapScraper': 'zap',
+    'IvoryScraper': 'ivory'
+}
+
+
+def __getattr__(name):
+    if name in _STORE_CLASSES:
+        from .registry import load_scraper_class
+        # אם עוד לא קיים הקובץ - None, לא נורא
+        value = globals()[name] = load_scraper_class(_STORE_CLASSES[name])
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # רשימת כל מה שאפשר להשתמש בו מהחבילה הזו
 __all__ = [
@@ -4,24 +4,46 @@
 מחלקת בסיס לכל מנועי ה-Scraping
 """
 
+import re
+import json
 import time
+import queue
+import hashlib
+import random
 import logging
+import threading
 import requests
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from fake_useragent import UserAgent
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Generator, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import urljoin
+
+# selenium ו-bs4 כבדים לייבוא - נטענים רק בשימוש הראשון (ראו get_selenium_driver / parse_html)
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from bs4 import BeautifulSoup
 
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# חלקים בעמוד שמשתנים בכל טעינה בלי קשר למוצרים (סקריפטים, סגנונות, הערות)
+VOLATILE_HTML_PATTERN = re.compile(r'<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->', re.S | re.I)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# זמינות לפי schema.org (ב-JSON-LD של עמודי מוצר) -> הסטטוס שמוצג באתר
+SCHEMA_AVAILABILITY = {
+    'instock': 'זמין',
+    'limitedavailability': 'זמין',
+    'instoreonly': 'זמין',
+    'outofstock': 'אזל מהמלאי',
+    'soldout': 'אזל מהמלאי',
+    'discontinued': 'אזל מהמלאי',
+    'preorder': 'הזמנה מראש',
+    'backorder': 'הזמנה מראש'
+}
+
 class BaseScraper(ABC):
     """מחלקת בסיס לכל מנועי ה-Scraping"""
     
@@ -36,24 +58,28 @@ class BaseScraper(ABC):
         self.search_url = self.config['search_url']
         self.store_logo = self.config['logo']
         
+        # הגדרות ריצה לחנות (engine / concurrency / timeout / priority)
+        from .registry import store_options
+        self.options = store_options(store_name)
+        self.engine = self.options['engine']
+        
+        # User-Agent מהרשימה המקומית (בלי להוריד מאגר מהרשת)
+        self.user_agent = random.choice(Config.USER_AGENTS)
+        
         # הגדרות HTTP
         self.session = requests.Session()
-        self.ua = UserAgent()
         self.session.headers.update({
-            'User-Agent': self.ua.random,
+            'User-Agent': self.user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'he-IL,he;q=0.8,en-US;q=0.5,en;q=0.3',
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         })
         
-        # הגדרות Selenium
-        self.selenium_options = Options()
-        self.selenium_options.add_argument('--headless' if Config.SELENIUM_HEADLESS else '')
-        self.selenium_options.add_argument('--no-sandbox')
-        self.selenium_options.add_argument('--disable-dev-shm-usage')
-        self.selenium_options.add_argument('--disable-gpu')
-        self.selenium_options.add_argument(f'--user-agent={self.ua.random}')
+        # דפדפנים פתוחים לשימוש חוזר - פתיחת Chrome היא החלק האיטי בחיפוש
+        self._driver_pool = queue.LifoQueue()
+        self._held_drivers = 0  # דפדפנים נוספים שנשמרים בזמן חיפוש מרובה (hold_drivers)
+        self._held_lock = threading.Lock()
         
     @abstractmethod
     def search_product(self, query: str, max_results: int = 10) -> List[Dict]:
@@ -76,7 +102,7 @@ class BaseScraper(ABC):
                 response = self.session.get(
                     url, 
                     params=params, 
-                    timeout=Config.REQUEST_TIMEOUT
+                    timeout=min(Config.REQUEST_TIMEOUT, self.options['timeout'])
                 )
                 
                 if response.status_code == 200:
@@ -96,21 +122,324 @@ class BaseScraper(ABC):
         
         return None
     
-    def get_selenium_driver(self) -> webdriver.Chrome:
+    def fetch_html(self, url: str, params: Dict = None) -> Optional[str]:
+        """
+        ה-HTML של עמוד לפי ה-engine של החנות - requests ל-http, דפדפן מהמאגר
+        ל-selenium (לאתרים שמרנדרים את התוצאות ב-JavaScript)
+        """
+        if self.engine == 'http':
+            response = self.make_request(url, params)
+            return response.text if response is not None else None
+        
+        if params:
+            from urllib.parse import urlencode
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params)}"
+        
+        driver = self.acquire_driver()
+        healthy = False
+        try:
+            driver.get(url)
+            html = driver.page_source
+            healthy = True
+            return html
+        except Exception as e:
+            logger.error(f"Failed to load {url} in browser for {self.store_name}: {e}")
+            return None
+        finally:
+            self.release_driver(driver, healthy)
+    
+    # ===== סריקת קטגוריות (core/category_crawler.py) =====
+    
+    def category_url(self, category: str) -> Optional[str]:
+        """
+        כתובת רשימת המוצרים של קטגוריה, לפי 'categories' בהגדרות החנות
+        (None = לחנות אין רשימה לקטגוריה הזו)
+        """
+        path = self.config.get('categories', {}).get(category)
+        return urljoin(self.base_url + '/', path) if path else None
+    
+    def listing_params(self, page: int) -> Optional[Dict]:
+        """פרמטרי העמוד בכתובת הרשימה (העמוד הראשון - בלי פרמטר)"""
+        return {'page': page} if page > 1 else None
+    
+    def parse_listing(self, html: str) -> List[Dict]:
+        """המוצרים בעמוד רשימה אחד - כל חנות שתומכת בסריקת קטגוריות מממשת"""
+        raise NotImplementedError(f"{self.store_name} does not support category crawling")
+    
+    def listing_fingerprint(self, html: str) -> str:
+        """
+        טביעת האצבע של עמוד רשימה - בלי פענוח, ובלי החלקים שמשתנים בכל טעינה.
+        חנות שמוסיפה לעמוד תוכן משתנה אחר (טוקנים, שעה) יכולה לדרוס
+        """
+        content = WHITESPACE_PATTERN.sub(' ', VOLATILE_HTML_PATTERN.sub('', html))
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+    
+    def fetch_listing_page(self, url: str, page: int,
+                           known_fingerprint: Optional[str] = None) -> Optional[Tuple[str, Optional[List[Dict]]]]:
+        """
+        עמוד רשימה אחד
+        
+        Returns:
+            (טביעת אצבע, מוצרים) - המוצרים None אם העמוד זהה ל-known_fingerprint
+            (לא מפוענח), ורשימה ריקה אחרי העמוד האחרון. None אם הטעינה נכשלה
+        """
+        html = self.fetch_html(url, self.listing_params(page))
+        if html is None:
+            return None
+        fingerprint = self.listing_fingerprint(html)
+        if fingerprint == known_fingerprint:
+            return fingerprint, None
+        return fingerprint, self.parse_listing(html)
+    
+    def crawl_category(self, category: str, start_page: int = 1, max_pages: Optional[int] = None,
+                       concurrency: Optional[int] = None, known_fingerprints: Optional[Dict[int, str]] = None
+                       ) -> Generator[Tuple[int, Optional[List[Dict]], str], None, bool]:
+        """
+        מעבר על עמודי הרשימה של קטגוריה - כמה עמודים במקביל (לפי ה-concurrency
+        של החנות), והתוצאות לפי סדר העמודים
+        
+        Args:
+            known_fingerprints: טביעות האצבע מהסריקה הקודמת (עמוד -> טביעה) -
+                                עמוד זהה לא מפוענח
+        
+        Yields:
+            (מספר עמוד, מוצרים או None לעמוד שלא השתנה, טביעת אצבע) עד העמוד
+            הריק הראשון או max_pages עמודים
+        
+        Returns:
+            (ערך ה-StopIteration) True אם הסריקה נעצרה בגבול העמודים ולא בסוף
+            הרשימה - יש עוד עמודים להמשיך מהם
+        
+        Raises:
+            ValueError: לחנות אין רשימה לקטגוריה
+            RuntimeError: עמוד לא נטען - הסריקה נעצרת לפניו (ואפשר להמשיך ממנו)
+        """
+        url = self.category_url(category)
+        if not url:
+            raise ValueError(f"No listing for category '{category}' in {self.store_name}")
+        
+        concurrency = concurrency or Config.CRAWL_CONCURRENCY or self.options['concurrency']
+        known_fingerprints = known_fingerprints or {}
+        last_page = start_page + (max_pages or Config.CRAWL_MAX_PAGES) - 1
+        previous_fingerprint = None
+        page = start_page
+        
+        with self.hold_drivers(concurrency), ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while page <= last_page:
+                window = list(range(page, min(page + concurrency, last_page + 1)))
+                futures = [executor.submit(self.fetch_listing_page, url, number, known_fingerprints.get(number))
+                           for number in window]
+                
+                for number, future in zip(window, futures):
+                    result = future.result()
+                    if result is None:
+                        raise RuntimeError(f"Failed to load page {number} of {category} from {self.store_name}")
+                    
+                    # עמוד ריק, או אתר שמחזיר שוב את העמוד האחרון למספר עמוד גבוה מדי
+                    fingerprint, products = result
+                    if products == [] or fingerprint == previous_fingerprint:
+                        return False
+                    previous_fingerprint = fingerprint
+                    yield number, products, fingerprint
+                
+                page = window[-1] + 1
+                time.sleep(Config.CRAWL_PAGE_DELAY)
+        return True
+    
+    # ===== עמוד מוצר (core/product_details.py) =====
+    
+    def fetch_product_details(self, url: str) -> Optional[Dict]:
+        """פרטי המוצר מעמוד המוצר (None אם העמוד לא נטען)"""
+        html = self.fetch_html(url)
+        if html is None:
+            return None
+        return self.parse_product_page(html)
+    
+    def parse_product_page(self, html: str) -> Dict:
+        """
+        פרטים מעמוד מוצר לפי הסימון הסטנדרטי - JSON-LD של schema.org ותגיות
+        Open Graph - כך שזה עובד ברוב החנויות בלי סלקטורים. חנות עם סימון
+        אחר יכולה לדרוס
+        
+        Returns:
+            חלק מ: image_url, availability, price, brand, sku, description
+        """
+        soup = self.parse_html(html)
+        details = {}
+        
+        for script in soup.find_all('script', type='application/ld+json'):
+            try:
+                product = self._json_ld_product(json.loads(script.string or ''))
+            except ValueError:
+                continue
+            if product:
+                details.update(self._json_ld_details(product))
+                break
+        
+        for prop, key in (('og:image', 'image_url'), ('og:description', 'description'),
+                          ('product:price:amount', 'price')):
+            meta = soup.find('meta', property=prop)
+            if meta and meta.get('content') and key not in details:
+                details[key] = meta['content'].strip()
+        
+        if isinstance(details.get('price'), str):
+            details['price'] = self.extract_price_from_text(details['price'])
+        if details.get('image_url'):
+            details['image_url'] = urljoin(self.base_url, details['image_url'])
+        if details.get('description'):
+            details['description'] = ' '.join(details['description'].split())[:500]
+        return {key: value for key, value in details.items() if value}
+    
+    def _json_ld_product(self, data) -> Optional[Dict]:
+        """צומת ה-Product בתוך JSON-LD (רשימה, @graph או אובייקט בודד)"""
+        if isinstance(data, list):
+            for item in data:
+                product = self._json_ld_product(item)
+                if product:
+                    return product
+            return None
+        if not isinstance(data, dict):
+            return None
+        types = data.get('@type')
+        if types == 'Product' or (isinstance(types, list) and 'Product' in types):
+            return data
+        return self._json_ld_product(data.get('@graph', []))
+    
+    def _json_ld_details(self, product: Dict) -> Dict:
+        image = product.get('image')
+        if isinstance(image, list):
+            image = image[0] if image else None
+        if isinstance(image, dict):
+            image = image.get('url')
+        
+        brand = product.get('brand')
+        if isinstance(brand, dict):
+            brand = brand.get('name')
+        
+        offers = product.get('offers') or {}
+        if isinstance(offers, list):
+            offers = offers[0] if offers else {}
+        availability = str(offers.get('availability') or '').rsplit('/', 1)[-1].lower()
+        
+        return {
+            'image_url': image,
+            'availability': SCHEMA_AVAILABILITY.get(availability),
+            'price': str(offers.get('price') or offers.get('lowPrice') or '') or None,
+            'brand': brand,
+            'sku': product.get('sku') or product.get('mpn'),
+            'description': product.get('description')
+        }
+    
+    def selenium_options(self):
+        """הגדרות Chrome (selenium נטען רק כאן - לא בזמן import)"""
+        from selenium.webdriver.chrome.options import Options
+        
+        options = Options()
+        if Config.SELENIUM_HEADLESS:
+            options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-gpu')
+        options.add_argument(f'--user-agent={self.user_agent}')
+        return options
+    
+    def get_selenium_driver(self) -> 'webdriver.Chrome':
         """יצירת driver של Selenium"""
         try:
-            from webdriver_manager.chrome import ChromeDriverManager
+            from selenium import webdriver
             from selenium.webdriver.chrome.service import Service
             
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=self.selenium_options)
-            driver.set_page_load_timeout(Config.SELENIUM_TIMEOUT)
+            service = Service(self._chromedriver_path())
+            driver = webdriver.Chrome(service=service, options=self.selenium_options())
+            driver.set_page_load_timeout(min(Config.SELENIUM_TIMEOUT, self.options['timeout']))
             return driver
             
         except Exception as e:
             logger.error(f"Failed to create Selenium driver: {e}")
             raise
     
+    _driver_path = None
+    _driver_path_lock = threading.Lock()
+    
+    @classmethod
+    def _chromedriver_path(cls) -> str:
+        """נתיב ה-chromedriver - ההתקנה/בדיקה של webdriver-manager רצה פעם אחת בתהליך"""
+        with cls._driver_path_lock:
+            if BaseScraper._driver_path is None:
+                from webdriver_manager.chrome import ChromeDriverManager
+                BaseScraper._driver_path = ChromeDriverManager().install()
+            return BaseScraper._driver_path
+    
+    def acquire_driver(self) -> 'webdriver.Chrome':
+        """driver מהמאגר, או חדש אם אין פנוי"""
+        try:
+            return self._driver_pool.get_nowait()
+        except queue.Empty:
+            return self.get_selenium_driver()
+    
+    def release_driver(self, driver, healthy: bool = True):
+        """החזרת driver למאגר (או סגירה אם נכשל / המאגר מלא)"""
+        if healthy and self._driver_pool.qsize() < self.driver_pool_size:
+            try:
+                driver.delete_all_cookies()
+                self._driver_pool.put(driver)
+                return
+            except Exception as e:
+                logger.debug(f"Discarding broken driver for {self.store_name}: {e}")
+        
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    def warm_up(self, drivers: Optional[int] = None):
+        """פתיחת דפדפנים מראש - כדי שהחיפוש הראשון אחרי הפעלה לא יחכה ל-Chrome"""
+        count = min(Config.DRIVER_WARM_COUNT if drivers is None else drivers, Config.DRIVER_POOL_SIZE)
+        for _ in range(count - self._driver_pool.qsize()):
+            self._driver_pool.put(self.get_selenium_driver())
+        logger.info(f"Warmed up {self.store_name} with {self._driver_pool.qsize()} drivers")
+    
+    @property
+    def driver_pool_size(self) -> int:
+        return max(Config.DRIVER_POOL_SIZE, self._held_drivers)
+    
+    @contextmanager
+    def hold_drivers(self, count: int):
+        """
+        with scraper.hold_drivers(n): ... - עד n דפדפנים נשארים פתוחים בין
+        חיפושים (חיפוש מרובה), גם מעבר ל-DRIVER_POOL_SIZE. בסוף - חזרה לגודל הרגיל
+        """
+        with self._held_lock:
+            self._held_drivers += count
+        try:
+            yield
+        finally:
+            with self._held_lock:
+                self._held_drivers -= count
+            self.trim_driver_pool()
+    
+    def trim_driver_pool(self, size: Optional[int] = None):
+        """סגירת דפדפנים פנויים מעבר לגודל המאגר (אחרי הקטנת DRIVER_POOL_SIZE)"""
+        size = self.driver_pool_size if size is None else size
+        while self._driver_pool.qsize() > size:
+            try:
+                driver = self._driver_pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    
+    def close(self):
+        """סגירת כל הדפדפנים הפתוחים"""
+        self.trim_driver_pool(0)
+    
+    def parse_html(self, html: str) -> 'BeautifulSoup':
+        """פענוח HTML (bs4 נטען רק בשימוש הראשון)"""
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, 'lxml')
+    
     def extract_price_from_text(self, text: str) -> Optional[float]:
         """חילוץ מחיר מטקסט עברי/אנגלי"""
         import re
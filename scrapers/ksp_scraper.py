@@ -6,12 +6,8 @@ KSP Scraper - חילוץ מחירים מאתר KSP
 
 import time
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 from urllib.parse import urljoin, quote
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from .base_scraper import BaseScraper
 
@@ -20,26 +16,68 @@ logger = logging.getLogger(__name__)
 class KSPScraper(BaseScraper):
     """Scraper עבור אתר KSP - ksp.co.il"""
     
+    # סלקטורים של כרטיס מוצר - משותפים לחיפוש (Selenium) ולסריקת קטגוריות (HTML)
+    PRODUCT_SELECTORS = ['.product-item', '.item', '.product', '.result-item', '[data-product]']
+    NAME_SELECTORS = ['.product-title', '.item-name', 'h3', 'h4', '.name', '.title', 'a[title]']
+    PRICE_SELECTORS = ['.price', '.current-price', '.item-price', '.cost', '.price-current', '[data-price]']
+    AVAILABILITY_SELECTORS = ['.availability', '.stock-status', '.in-stock', '.out-of-stock']
+    
+    # קטגוריות בלי נתיב ב-'categories' נסרקות דרך רשימת תוצאות החיפוש של המונח
+    CATEGORY_SEARCH_TERMS = {
+        'smartphones': 'סמארטפון',
+        'laptops': 'מחשב נייד',
+        'tablets': 'טאבלט',
+        'headphones': 'אוזניות',
+        'smartwatches': 'שעון חכם',
+        'cameras': 'מצלמה',
+        'gaming': 'קונסולה',
+        'tv': 'טלוויזיה',
+        'audio': 'רמקול'
+    }
+    
     def __init__(self):
         super().__init__('ksp')
     
     def search_product(self, query: str, max_results: int = 10) -> List[Dict]:
-        """חיפוש מוצר באתר KSP"""
-        logger.info(f"Searching KSP for: {query}")
+        """
+        חיפוש מוצר באתר KSP - לפי ה-engine של החנות: selenium (ברירת המחדל)
+        מקליד בתיבת החיפוש, http טוען את רשימת תוצאות החיפוש ישירות
+        (מהיר, אבל בלי רינדור JavaScript)
+        """
+        logger.info(f"Searching KSP for: {query} ({self.engine})")
         
         try:
+            if self.engine == 'http':
+                return self._search_listing(query, max_results)
             return self._search_with_selenium(query, max_results)
         except Exception as e:
             logger.error(f"KSP search failed for '{query}': {e}")
             return []
     
+    def _search_listing(self, query: str, max_results: int) -> List[Dict]:
+        """חיפוש דרך רשימת התוצאות (fetch_html + parse_listing) - בלי דפדפן"""
+        html = self.fetch_html(self._results_url(query))
+        if html is None:
+            return []
+        return self.parse_listing(html)[:max_results]
+    
+    def _results_url(self, term: str) -> str:
+        """כתובת רשימת תוצאות החיפוש של מונח"""
+        return f"{self.base_url}/web/cat/?search={quote(term)}"
+    
     def _search_with_selenium(self, query: str, max_results: int) -> List[Dict]:
         """ביצוע חיפוש עם Selenium"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException, NoSuchElementException
+        
         driver = None
+        healthy = True
         products = []
         
         try:
-            driver = self.get_selenium_driver()
+            driver = self.acquire_driver()
             
             # מעבר לעמוד הראשי
             driver.get(self.base_url)
@@ -115,16 +153,8 @@ class KSPScraper(BaseScraper):
             time.sleep(2)  # המתנה נוספת לטעינה מלאה
             
             # חילוץ מוצרים
-            product_selectors = [
-                '.product-item',
-                '.item',
-                '.product',
-                '.result-item',
-                '[data-product]'
-            ]
-            
             product_elements = []
-            for selector in product_selectors:
+            for selector in self.PRODUCT_SELECTORS:
                 elements = driver.find_elements(By.CSS_SELECTOR, selector)
                 if elements:
                     product_elements = elements[:max_results]
@@ -141,28 +171,22 @@ class KSPScraper(BaseScraper):
             
         except Exception as e:
             logger.error(f"Selenium search failed on KSP: {e}")
+            healthy = False
             return []
         
         finally:
             if driver:
-                driver.quit()
+                self.release_driver(driver, healthy)
     
     def _extract_product_data(self, element) -> Dict:
         """חילוץ נתוני מוצר מאלמנט HTML"""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException
+        
         try:
             # שם המוצר
-            name_selectors = [
-                '.product-title',
-                '.item-name', 
-                'h3',
-                'h4',
-                '.name',
-                '.title',
-                'a[title]'
-            ]
-            
             product_name = None
-            for selector in name_selectors:
+            for selector in self.NAME_SELECTORS:
                 try:
                     name_element = element.find_element(By.CSS_SELECTOR, selector)
                     product_name = name_element.text.strip() or name_element.get_attribute('title')
@@ -176,17 +200,8 @@ class KSPScraper(BaseScraper):
                 return None
             
             # מחיר
-            price_selectors = [
-                '.price',
-                '.current-price',
-                '.item-price',
-                '.cost',
-                '.price-current',
-                '[data-price]'
-            ]
-            
             price = None
-            for selector in price_selectors:
+            for selector in self.PRICE_SELECTORS:
                 try:
                     price_element = element.find_element(By.CSS_SELECTOR, selector)
                     price_text = price_element.text.strip()
@@ -223,22 +238,10 @@ class KSPScraper(BaseScraper):
             # זמינות
             availability = "זמין"
             try:
-                availability_selectors = [
-                    '.availability',
-                    '.stock-status',
-                    '.in-stock',
-                    '.out-of-stock'
-                ]
-                
-                for selector in availability_selectors:
+                for selector in self.AVAILABILITY_SELECTORS:
                     try:
                         avail_element = element.find_element(By.CSS_SELECTOR, selector)
-                        avail_text = avail_element.text.strip().lower()
-                        
-                        if any(word in avail_text for word in ['אזל', 'לא זמין', 'out of stock']):
-                            availability = "אזל מהמלאי"
-                        elif any(word in avail_text for word in ['הזמנה', 'order']):
-                            availability = "הזמנה מראש"
+                        availability = self._availability_from_text(avail_element.text)
                         break
                     except NoSuchElementException:
                         continue
@@ -257,3 +260,78 @@ class KSPScraper(BaseScraper):
         except Exception as e:
             logger.error(f"Error extracting product data from KSP: {e}")
             return None
+    
+    def _availability_from_text(self, text: str) -> str:
+        """סטטוס מלאי מהטקסט שבכרטיס המוצר"""
+        text = (text or '').strip().lower()
+        if any(word in text for word in ['אזל', 'לא זמין', 'out of stock']):
+            return "אזל מהמלאי"
+        if any(word in text for word in ['הזמנה', 'order']):
+            return "הזמנה מראש"
+        return "זמין"
+    
+    # ===== סריקת קטגוריות =====
+    
+    def category_url(self, category: str) -> Optional[str]:
+        """נתיב מ-'categories' בהגדרות, ואם אין - רשימת תוצאות החיפוש של הקטגוריה"""
+        url = super().category_url(category)
+        if url:
+            return url
+        term = self.CATEGORY_SEARCH_TERMS.get(category)
+        return self._results_url(term) if term else None
+    
+    def parse_listing(self, html: str) -> List[Dict]:
+        """המוצרים בעמוד רשימה (HTML מלא - אחרי רינדור בדפדפן)"""
+        soup = self.parse_html(html)
+        cards = []
+        for selector in self.PRODUCT_SELECTORS:
+            cards = soup.select(selector)
+            if cards:
+                break
+        
+        products = []
+        for card in cards:
+            product = self._parse_listing_card(card)
+            if product:
+                products.append(product)
+        return products
+    
+    def _parse_listing_card(self, card) -> Optional[Dict]:
+        """כרטיס מוצר אחד מהרשימה - אותם סלקטורים כמו ב-_extract_product_data"""
+        name = None
+        for selector in self.NAME_SELECTORS:
+            element = card.select_one(selector)
+            if element:
+                name = element.get_text(strip=True) or element.get('title')
+                if name:
+                    break
+        
+        price = None
+        for selector in self.PRICE_SELECTORS:
+            element = card.select_one(selector)
+            if element:
+                price = self.extract_price_from_text(element.get_text(strip=True) or element.get('data-price'))
+                if price:
+                    break
+        
+        if not name or not price:
+            return None
+        
+        link = card.select_one('a[href]')
+        image = card.select_one('img')
+        image_url = image and (image.get('src') or image.get('data-src'))
+        
+        availability = "זמין"
+        for selector in self.AVAILABILITY_SELECTORS:
+            element = card.select_one(selector)
+            if element:
+                availability = self._availability_from_text(element.get_text())
+                break
+        
+        return self.create_product_dict(
+            name=name,
+            price=price,
+            url=urljoin(self.base_url, link['href']) if link else None,
+            image_url=urljoin(self.base_url, image_url) if image_url else None,
+            availability=availability
+        )
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+רישום ה-scrapers - מאיפה מגיעה המחלקה של כל חנות, עם אילו הגדרות היא רצה,
+ומתי היא נוצרת בפועל
+
+מקור המחלקה (לפי הסדר):
+1. המפתח 'scraper' של החנות ב-Config.ACTIVE_STORES ("מודול:מחלקה")
+2. entry point בקבוצה Config.SCRAPER_ENTRY_POINT_GROUP בשם החנות - חבילה
+   חיצונית יכולה להוסיף חנות בלי לגעת בקוד כאן:
+       [project.entry-points."pricehunter.scrapers"]
+       bug = "pricehunter_bug:BugScraper"
+
+הגדרות לכל חנות (ברירות מחדל ב-Config.STORE_DEFAULTS):
+- engine: http / selenium
+- concurrency: כמה חיפושים רצים מול החנות בו-זמנית (השאר מחכים בתור)
+- timeout: כמה שניות מחכים לחנות בחיפוש אחד
+- priority: סדר השליחה לסריקה (נמוך = קודם)
+
+חנות שהמודול שלה עוד לא קיים מדולגת, והמודול עצמו (ו-selenium איתו) נטען
+רק בחיפוש הראשון בחנות - לא בזמן import של core.price_finder
+
+בדיקת זמני טעינה:
+    python -m scrapers.registry
+"""
+
+import sys
+import time
+import logging
+import importlib
+import importlib.util
+import threading
+from typing import Dict, List, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('http', 'selenium')
+
+# ספריות כבדות שאסור שייטענו לפני החיפוש הראשון
+HEAVY_MODULES = ('selenium', 'bs4', 'fake_useragent', 'webdriver_manager')
+
+_classes: Dict[str, type] = {}
+_import_times: Dict[str, float] = {}
+_entry_points = None
+
+
+def store_options(store_name: str) -> Dict:
+    """
+    הגדרות הריצה של חנות - ברירות המחדל עם מה שהוגדר לחנות עצמה
+
+    Raises:
+        ValueError: ערך לא חוקי בהגדרות החנות
+    """
+    store_config = Config.get_store_config(store_name) or {}
+    options = {key: store_config.get(key, default) for key, default in Config.STORE_DEFAULTS.items()}
+
+    if options['engine'] not in ENGINES:
+        raise ValueError(f"Unknown engine for {store_name}: {options['engine']!r} (expected one of {ENGINES})")
+    if int(options['concurrency']) < 1:
+        raise ValueError(f"concurrency for {store_name} must be at least 1")
+    if float(options['timeout']) <= 0:
+        raise ValueError(f"timeout for {store_name} must be positive")
+
+    options['concurrency'] = int(options['concurrency'])
+    options['timeout'] = float(options['timeout'])
+    return options
+
+
+def _discover_entry_points() -> Dict[str, object]:
+    """entry points של scrapers מחבילות מותקנות (נסרק פעם אחת, בלי לטעון אותם)"""
+    global _entry_points
+    if _entry_points is None:
+        _entry_points = {}
+        try:
+            from importlib.metadata import entry_points
+            for entry_point in entry_points(group=Config.SCRAPER_ENTRY_POINT_GROUP):
+                _entry_points.setdefault(entry_point.name, entry_point)
+        except Exception as e:
+            logger.warning(f"Failed to read scraper entry points: {e}")
+    return _entry_points
+
+
+def scraper_source(store_name: str) -> Optional[str]:
+    """מאיפה תיטען מחלקת החנות ("מודול:מחלקה"), או None אם אין לה scraper"""
+    store_config = Config.get_store_config(store_name) or {}
+    if store_config.get('scraper'):
+        return store_config['scraper']
+    entry_point = _discover_entry_points().get(store_name)
+    return entry_point.value if entry_point else None
+
+
+def has_scraper(store_name: str) -> bool:
+    """האם יש לחנות מודול - בלי לייבא אותו"""
+    source = scraper_source(store_name)
+    if not source:
+        return False
+    module_name = source.split(':')[0]
+    try:
+        return module_name in sys.modules or importlib.util.find_spec(module_name) is not None
+    except ModuleNotFoundError:  # חבילת האב לא קיימת
+        return False
+
+
+def load_scraper_class(store_name: str) -> Optional[type]:
+    """
+    מחלקת ה-scraper של החנות (ייבוא המודול בפעם הראשונה)
+
+    Returns:
+        המחלקה, או None אם אין לחנות scraper
+    """
+    if store_name in _classes:
+        return _classes[store_name]
+
+    source = scraper_source(store_name)
+    if not source:
+        logger.debug(f"No scraper registered for {store_name}")
+        return None
+
+    module_name, _, class_name = source.partition(':')
+    start_time = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        if e.name != module_name:
+            raise
+        logger.debug(f"Scraper module {module_name} not implemented yet")
+        return None
+
+    _import_times[store_name] = time.perf_counter() - start_time
+    scraper_class = _classes[store_name] = getattr(module, class_name)
+    logger.debug(f"Imported {module_name} in {_import_times[store_name] * 1000:.1f}ms")
+    return scraper_class
+
+
+class ScraperHandle:
+    """
+    ה-scraper של חנות אחת כפי שה-PriceFinder רואה אותו: המחלקה נטענת והמופע
+    נוצר רק בשימוש הראשון, וחיפושים מעבר ל-concurrency של החנות מחכים בתור.
+    שאר התכונות (config, base_url, is_available, ...) מועברות למופע עצמו
+    """
+
+    def __init__(self, store_name: str, options: Optional[Dict] = None):
+        self.store_name = store_name
+        self.options = options or store_options(store_name)
+        self._scraper = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.options['concurrency'])
+
+    @property
+    def priority(self) -> int:
+        return self.options['priority']
+
+    @property
+    def timeout(self) -> float:
+        return self.options['timeout']
+
+    @property
+    def created(self) -> bool:
+        return self._scraper is not None
+
+    @property
+    def scraper(self):
+        """המופע עצמו - נוצר בגישה הראשונה"""
+        if self._scraper is None:
+            with self._lock:
+                if self._scraper is None:
+                    scraper_class = load_scraper_class(self.store_name)
+                    if scraper_class is None:
+                        raise RuntimeError(f"No scraper available for {self.store_name}")
+                    start_time = time.perf_counter()
+                    self._scraper = scraper_class()
+                    logger.info(f"Initialized {self.store_name} scraper "
+                                f"({self.options['engine']}) in {(time.perf_counter() - start_time) * 1000:.1f}ms")
+        return self._scraper
+
+    def update_options(self, options: Dict):
+        """
+        הגדרות חדשות בזמן ריצה (core/runtime_config.py) - המופע והדפדפנים החמים
+        נשמרים. חיפושים שכבר רצים משחררים את המקום שלהם בתור הישן
+        """
+        with self._lock:
+            previous, self.options = self.options, options
+            if options['concurrency'] != previous['concurrency']:
+                self._slots = threading.BoundedSemaphore(options['concurrency'])
+            if self._scraper is not None:
+                self._scraper.options = options
+                self._scraper.engine = options['engine']
+                if previous['engine'] == 'selenium' and options['engine'] != 'selenium':
+                    self.close()
+
+    def search_product(self, query: str, max_results: int = 10) -> List[Dict]:
+        """חיפוש בחנות - לכל היותר concurrency חיפושים במקביל"""
+        with self._slots:
+            return self.scraper.search_product(query, max_results)
+
+    def warm_up(self, drivers: Optional[int] = None):
+        """חימום - רק לחנויות שרצות עם דפדפן"""
+        if self.options['engine'] == 'selenium':
+            warm_up = getattr(self.scraper, 'warm_up', None)
+            if warm_up:
+                warm_up(drivers)
+
+    def close(self):
+        """סגירה - scraper שלא נוצר לא נוצר בשביל זה"""
+        if self._scraper is not None:
+            close = getattr(self._scraper, 'close', None)
+            if close:
+                close()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.scraper, name)
+
+    def __repr__(self):
+        state = 'created' if self.created else 'lazy'
+        return f"ScraperHandle({self.store_name}, {self.options['engine']}, {state})"
+
+
+def create_scrapers(store_names=None) -> Dict[str, ScraperHandle]:
+    """
+    ה-scrapers של כל החנויות הפעילות שיש להן מודול, לפי סדר העדיפות.
+    שום מודול חנות לא מיובא כאן - רק בחיפוש הראשון בה
+    """
+    handles = []
+    for store_name in store_names or Config.ACTIVE_STORES:
+        if not Config.is_store_enabled(store_name):
+            continue
+        if not has_scraper(store_name):
+            logger.debug(f"Skipping {store_name} - scraper not implemented yet")
+            continue
+        try:
+            handles.append(ScraperHandle(store_name))
+        except ValueError as e:
+            logger.error(f"Invalid configuration for {store_name} scraper: {e}")
+
+    handles.sort(key=lambda handle: handle.priority)
+    return {handle.store_name: handle for handle in handles}
+
+
+def import_timings() -> Dict[str, float]:
+    """זמני הייבוא של מודולי החנויות (שניות)"""
+    return dict(_import_times)
+
+
+def loaded_heavy_modules():
+    """אילו ספריות כבדות כבר נטענו בתהליך"""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    import core.price_finder  # noqa: F401
+    core_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    created = create_scrapers()
+    registry_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for handle in created.values():
+        handle.scraper
+    scrapers_time = time.perf_counter() - start
+
+    print(f"import core.price_finder: {core_time * 1000:.1f}ms")
+    print(f"create_scrapers ({', '.join(created) or '-'}): {registry_time * 1000:.1f}ms")
+    print(f"scraper instances: {scrapers_time * 1000:.1f}ms")
+    for store_name, seconds in import_timings().items():
+        print(f"  {store_name}: {seconds * 1000:.1f}ms")
+    for store_name, handle in created.items():
+        print(f"  {store_name}: {handle.options}")
+    print(f"heavy modules loaded: {', '.join(loaded_heavy_modules()) or 'none'}")
@@ -7,7 +7,15 @@ Web Package - ממשק המשתמש של PriceHunter
 מבנה התיקייה:
 ├── web/
 │   ├── __init__.py          ← זה הקובץ
-│   ├── app.py               ← שרת Flask הראשי
+│   ├── app.py               ← שרת Flask הראשי (create_app)
+│   ├── api.py               ← נקודות API משותפות (blueprint לשתי האפליקציות)
+│   ├── server.py            ← שרת פרודקשן (gunicorn, workers מחוממים)
+│   ├── services.py          ← PriceFinder ועבודות חיפוש לכל worker
+│   ├── http_cache.py        ← כותרות ETag / Cache-Control
+│   ├── compression.py       ← דחיסת gzip / brotli לתגובות
+│   ├── assets.py            ← build של קבצים סטטיים (hash + דחיסה מראש)
+│   ├── throttling.py        ← הגבלת קצב ותגובות עומס (429 / 503)
+│   ├── image_proxy.py       ← תמונות ממוזערות WebP עם מטמון בדיסק
 │   ├── templates/           ← דפי HTML
 │   │   ├── index.html       ← עמוד הבית
 │   │   ├── results.html     ← עמוד תוצאות
@@ -34,13 +42,22 @@ Web Package - ממשק המשתמש של PriceHunter
 - PriceFinder = המטבח (מכין את האוכל)
 """
 
-# ייבוא הרכיבים הראשיים
-try:
-    from .app import app, create_app
-except ImportError:
-    # עוד לא קיים - נוסיף בשלב הבא
-    app = None
-    create_app = None
+# ייבוא הרכיבים הראשיים - בטעינה עצלה, כדי שייבוא של מודול עזר
+# (למשל web.http_cache) לא יעלה את כל שרת ה-Flask
+def __getattr__(name):
+    if name in ('app', 'create_app'):
+        try:
+            from .app import create_app
+        except ImportError:
+            return None
+        globals()['create_app'] = create_app
+        # הייבוא קושר את המודול web.app לשם app - מפנים אותו לאפליקציה עצמה
+        globals().pop('app', None)
+        if name == 'app':
+            # אפליקציה אחת ברירת מחדל (למשל flask --app web:app)
+            globals()['app'] = create_app()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # מידע על החבילה
 __version__ = '1.0.0'
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+נקודות ה-API המשותפות - חיפוש מרובה, עבודות חיפוש, היסטוריית מחירים, פרטי
+מוצר, רשימות מעקב, ייצוא, סטטיסטיקות והגדרות. blueprint אחד שנרשם גם
+ב-create_app() (web/app.py) וגם באפליקציה הישנה (app.py), כדי שלא יהיו
+שני עותקים של אותם נתיבים
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+
+from flask import Blueprint, Response, request, jsonify, url_for, stream_with_context
+
+from config import Config
+from core.admission import CapacityExceeded
+from core.runtime_config import get_runtime_config
+from core import bulk_export
+from .image_proxy import thumbnail_url
+from .throttling import bearer_token, capacity_response
+from .services import get_job_manager, get_price_finder
+
+logger = logging.getLogger(__name__)
+
+# שמות ה-endpoints נשארים כמו שהיו (api.api_batch_search וכו') - הגבלת הקצב
+# משווה רק את החלק שאחרי הנקודה
+api = Blueprint('api', __name__)
+
+@api.route('/api/search/batch', methods=['POST'])
+def api_batch_search():
+    """חיפוש מרובה - כל שאילתה חוזרת כשורת JSON (NDJSON) ברגע שהיא מוכנה"""
+    price_finder = get_price_finder()
+    if not price_finder:
+        return jsonify({
+            'success': False,
+            'error': 'מערכת החיפוש לא זמינה כרגע'
+        }), 503
+    
+    data = request.get_json(silent=True) or {}
+    queries = data.get('queries')
+    if not isinstance(queries, list) or not queries:
+        return jsonify({
+            'success': False,
+            'error': 'חסרה רשימת שאילתות'
+        }), 400
+    
+    queries = [str(query).strip() for query in queries]
+    if len(queries) > Config.BATCH_MAX_QUERIES:
+        return jsonify({
+            'success': False,
+            'error': f'אפשר עד {Config.BATCH_MAX_QUERIES} שאילתות בבקשה'
+        }), 400
+    if not all(queries):
+        return jsonify({
+            'success': False,
+            'error': 'שאילתה ריקה ברשימה'
+        }), 400
+    
+    max_results = data.get('max_results', 5)
+    rank_by = data.get('rank_by', Config.DEFAULT_RANK_KEY)
+    top_k = data.get('top_k')
+    logger.info(f"📦 חיפוש מרובה: {len(queries)} שאילתות")
+    
+    def generate():
+        start_time = time.time()
+        completed = 0
+        try:
+            for item in price_finder.search_many(queries, max_results, rank_by, top_k):
+                completed += 1
+                yield json.dumps({
+                    'index': item['index'],
+                    'query': item['query'],
+                    'success': True,
+                    'data': item['results']
+                }, ensure_ascii=False, default=str) + '\n'
+        except ValueError as e:
+            yield json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False) + '\n'
+        except Exception as e:
+            logger.error(f"❌ שגיאה בחיפוש מרובה: {e}")
+            yield json.dumps({'success': False, 'error': 'שגיאה בביצוע החיפוש'}, ensure_ascii=False) + '\n'
+        
+        yield json.dumps({
+            'done': True,
+            'total': len(queries),
+            'completed': completed,
+            'elapsed': round(time.time() - start_time, 2)
+        }) + '\n'
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx - בלי לאגור את הזרם
+    return response
+
+@api.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """שליחת חיפוש אסינכרוני - מחזיר מזהה עבודה מיד, בלי להחזיק את ה-worker"""
+    job_manager = get_job_manager()
+    if not job_manager:
+        return jsonify({
+            'success': False,
+            'error': 'מערכת החיפוש לא זמינה כרגע'
+        }), 503
+    
+    data = request.get_json(silent=True) or {}
+    query = str(data.get('query', '')).strip()
+    if not query:
+        return jsonify({
+            'success': False,
+            'error': 'חסרה מחרוזת חיפוש'
+        }), 400
+    
+    try:
+        job, subscriber = job_manager.submit(query, data.get('max_results', 5),
+                                             data.get('rank_by', Config.DEFAULT_RANK_KEY))
+    except CapacityExceeded as e:
+        return capacity_response(e)
+    logger.info(f"📨 עבודת חיפוש {job.id} עבור: '{query}'")
+    
+    response = jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'poll_url': url_for('api.api_job_status', job_id=job.id),
+        # DELETE לכתובת הזו מנתק רק את השולח - העבודה נעצרת כשאף אחד לא מחכה לה
+        'cancel_url': url_for('api.api_job_status', job_id=job.id, subscriber=subscriber)
+    })
+    response.status_code = 202
+    response.headers['Location'] = url_for('api.api_job_status', job_id=job.id)
+    return response
+
+@api.route('/api/jobs/<job_id>', methods=['GET', 'DELETE'])
+def api_job_status(job_id):
+    """
+    סטטוס עבודת חיפוש ותוצאות חלקיות
+    ?wait=N&since=V - long-poll: מחכה עד N שניות לשינוי אחרי גרסה V
+    """
+    job_manager = get_job_manager()
+    if not job_manager:
+        return jsonify({
+            'success': False,
+            'error': 'מערכת החיפוש לא זמינה כרגע'
+        }), 503
+    
+    if request.method == 'DELETE':
+        detached = job_manager.cancel(job_id, request.args.get('subscriber'))
+        return jsonify({'success': detached})
+    
+    wait = request.args.get('wait', 0, type=float)
+    since = request.args.get('since', -1, type=int)
+    job = job_manager.wait(job_id, since, wait) if wait > 0 else job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'עבודת החיפוש לא נמצאה או שפג תוקפה'
+        }), 404
+    
+    response = jsonify({
+        'success': True,
+        'job': job.to_dict(job_manager.stores_total())
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@api.route('/api/history')
+def api_history():
+    """היסטוריית מחירים של מוצר - עבור גרפים"""
+    price_finder = get_price_finder()
+    if not price_finder:
+        return jsonify({
+            'success': False,
+            'error': 'מערכת החיפוש לא זמינה כרגע'
+        }), 503
+    
+    url = request.args.get('url', '').strip()
+    if not url:
+        return jsonify({
+            'success': False,
+            'error': 'חסר קישור למוצר'
+        }), 400
+    
+    days = request.args.get('days', 90, type=int)
+    history = price_finder.get_price_history(url, request.args.get('store'), days)
+    return jsonify({
+        'success': True,
+        'url': url,
+        'history': history
+    })
+
+@api.route('/api/products/details', methods=['POST'])
+def api_product_details():
+    """פרטי מוצר מעמודי המוצרים (תמונה, מלאי, מותג) - כל מוצר כשורת JSON כשהוא מוכן"""
+    price_finder = get_price_finder()
+    if not price_finder:
+        return jsonify({
+            'success': False,
+            'error': 'מערכת החיפוש לא זמינה כרגע'
+        }), 503
+    
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls')
+    if not isinstance(urls, list) or not urls:
+        return jsonify({
+            'success': False,
+            'error': 'חסרה רשימת קישורים'
+        }), 400
+    if len(urls) > Config.DETAILS_MAX_URLS:
+        return jsonify({
+            'success': False,
+            'error': f'אפשר עד {Config.DETAILS_MAX_URLS} קישורים בבקשה'
+        }), 400
+    
+    urls = [str(url).strip() for url in urls if str(url).strip()]
+    
+    def generate():
+        start_time = time.time()
+        for item in price_finder.enricher.enrich(urls):
+            if item.get('details', {}).get('image_url'):
+                item['thumbnail_url'] = thumbnail_url(item['details']['image_url'], item['store'])
+            yield json.dumps(item, ensure_ascii=False, default=str) + '\n'
+        yield json.dumps({
+            'done': True,
+            'total': len(urls),
+            'elapsed': round(time.time() - start_time, 2)
+        }) + '\n'
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx - בלי לאגור את הזרם
+    return response
+
+@api.route('/api/watches', methods=['GET', 'POST'])
+def api_watches():
+    """
+    רשימת המעקב של owner (GET), או מעקב חדש על קישור / שאילתה עם מחיר יעד (POST).
+    המעקב הראשון של owner מחזיר טוקן - כל בקשה אחרת שולחת אותו ב-Authorization: Bearer
+    """
+    price_finder = get_price_finder()
+    if not price_finder or not price_finder.watchlist:
+        return jsonify({
+            'success': False,
+            'error': 'רשימות המעקב לא זמינות כרגע'
+        }), 503
+    
+    if request.method == 'GET':
+        owner = request.args.get('owner', '').strip()
+        if not owner:
+            return jsonify({
+                'success': False,
+                'error': 'חסר owner'
+            }), 400
+        if not price_finder.watchlist.authorize(owner, bearer_token()):
+            return jsonify({
+                'success': False,
+                'error': 'טוקן לא תקין'
+            }), 401
+        response = jsonify({
+            'success': True,
+            'watches': price_finder.watchlist.watches(owner),
+            'alerts': price_finder.watchlist.alerts(owner, request.args.get('since', 0, type=float))
+        })
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        watch = price_finder.watchlist.add(str(data.get('owner', '')).strip(), data.get('target_price'),
+                                           url=data.get('url'), query=data.get('query'),
+                                           store=data.get('store'), token=bearer_token())
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except PermissionError:
+        return jsonify({
+            'success': False,
+            'error': 'טוקן לא תקין'
+        }), 401
+    
+    logger.info(f"👀 מעקב חדש: {watch['label']} עד {watch['target_price']}")
+    return jsonify({
+        'success': True,
+        'watch': watch
+    }), 201
+
+@api.route('/api/watches/<int:watch_id>', methods=['DELETE'])
+def api_delete_watch(watch_id):
+    """מחיקת מעקב (רק של ה-owner שלו)"""
+    price_finder = get_price_finder()
+    if not price_finder or not price_finder.watchlist:
+        return jsonify({
+            'success': False,
+            'error': 'רשימות המעקב לא זמינות כרגע'
+        }), 503
+    
+    owner = request.args.get('owner', '').strip()
+    if not price_finder.watchlist.authorize(owner, bearer_token()):
+        return jsonify({
+            'success': False,
+            'error': 'טוקן לא תקין'
+        }), 401
+    
+    removed = price_finder.watchlist.remove(watch_id, owner)
+    return jsonify({'success': removed}), 200 if removed else 404
+
+@api.route('/api/export/<dataset>')
+def api_export(dataset):
+    """ייצוא מלא בהזרמה - products / catalog / history כ-CSV, NDJSON או Parquet"""
+    if not Config.ENABLE_EXPORT_API or not Config.EXPORT_API_TOKEN:
+        return jsonify({
+            'success': False,
+            'error': 'הייצוא לא מופעל'
+        }), 404
+    if not bulk_export.token_matches(bearer_token()):
+        logger.warning(f"🔒 ניסיון ייצוא בלי טוקן תקין מ-{request.remote_addr}")
+        return jsonify({
+            'success': False,
+            'error': 'נדרש טוקן ייצוא'
+        }), 401
+    
+    fmt = request.args.get('format', 'csv')
+    if dataset not in bulk_export.DATASETS or fmt not in bulk_export.FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"מאגרים: {', '.join(bulk_export.DATASETS)} | פורמטים: {', '.join(bulk_export.FORMATS)}"
+        }), 400
+    
+    try:
+        filters = bulk_export.ExportFilters(
+            stores=[s for s in request.args.get('store', '').split(',') if s],
+            category=request.args.get('category') or None,
+            since=request.args.get('since'),
+            until=request.args.get('until')
+        )
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'תאריך לא תקין (YYYY-MM-DD, ISO או epoch)'
+        }), 400
+    
+    price_finder = get_price_finder()
+    if dataset == 'history' and price_finder and price_finder.price_history:
+        price_finder.price_history.flush()  # תצפיות שעוד מחכות בזיכרון
+    
+    # החלק הראשון לפני התשובה - מאגר שעוד לא נוצר או pyarrow חסר מחזירים שגיאה ולא קובץ קטוע
+    chunks = bulk_export.export(dataset, fmt, filters)
+    try:
+        first = next(chunks, b'')
+    except (ImportError, sqlite3.Error) as e:
+        logger.error(f"❌ שגיאה בייצוא {dataset}: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'הייצוא לא זמין כרגע'
+        }), 503
+    
+    def generate():
+        yield first
+        yield from chunks
+    
+    logger.info(f"📤 ייצוא {dataset} ({fmt})")
+    mimetype, extension = bulk_export.FORMATS[fmt]
+    filename = f"pricehunter-{dataset}-{datetime.now():%Y%m%d}.{extension}"
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx - בלי לאגור את הזרם
+    return response
+
+@api.route('/api/stats')
+def api_stats():
+    """סטטיסטיקות חיפוש"""
+    price_finder = get_price_finder()
+    if not price_finder:
+        return jsonify({
+            'success': False,
+            'error': 'מערכת החיפוש לא זמינה כרגע'
+        }), 503
+    
+    stats = price_finder.get_stats()
+    if price_finder.stats and request.args.get('top'):
+        stats['top_queries'] = price_finder.stats.top_queries(request.args.get('top', type=int))
+    
+    return jsonify({
+        'success': True,
+        'stats': stats
+    })
+
+@api.route('/api/config')
+def api_config():
+    """ההגדרות החיות של ה-worker - גרסה נוכחית, ערכים והיסטוריית שינויים"""
+    response = jsonify({
+        'success': True,
+        'config': get_runtime_config().status()
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -13,10 +13,12 @@ Flask Web Application - השרת הראשי של PriceHunter
 """
 
 import logging
+import secrets
 import sys
 import os
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import (Blueprint, Flask, Response, current_app, render_template, request, jsonify,
+                   redirect, url_for, stream_with_context)
 
 # הוספת הנתיבים לחיפוש המודולים
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -26,7 +28,17 @@ sys.path.insert(0, project_root)
 # יבוא המודולים שלנו
 try:
     from config import Config
-    from core.price_finder import PriceFinder
+    from core.result_aggregator import paginate_products, validate_page
+    from core.admission import CapacityExceeded
+    from core.runtime_config import get_runtime_config
+    from web.http_cache import (apply_cache_headers, cache_validators, is_not_modified,
+                                not_modified_response, results_validators, variant_etag)
+    from web.compression import init_compression
+    from web.assets import init_assets
+    from web.image_proxy import init_image_proxy
+    from web.throttling import capacity_response, init_rate_limit
+    from web.services import get_price_finder, get_services, init_services
+    from web.api import api
 except ImportError as e:
     print(f"❌ שגיאה בייבוא מודולים: {e}")
     print("🔍 בדוק שכל הקבצים קיימים ובמקום הנכון")
@@ -39,199 +51,80 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# יצירת אפליקציית Flask
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'price-hunter-secret-key-change-in-production'
-app.config['JSON_AS_ASCII'] = False  # תמיכה בעברית ב-JSON
-
-# אתחול מנוע החיפוש
-logger.info("🔍 מאתחל את PriceFinder...")
-try:
-    price_finder = PriceFinder()
-    logger.info("✅ PriceFinder הותחל בהצלחה")
-except Exception as e:
-    logger.error(f"❌ כשלון באתחול PriceFinder: {e}")
-    price_finder = None
+# כל הנתיבים על blueprint - האפליקציה עצמה נבנית ב-create_app()
+main = Blueprint('main', __name__)
 
 # ===== ROUTES (נתיבים) =====
 
-@app.route('/')
+@main.route('/')
 def index():
     """עמוד הבית - מה שהמשתמש רואה כשנכנס לאתר"""
     logger.info("🏠 משתמש נכנס לעמוד הבית")
     
-    return '''
-<!DOCTYPE html>
-<html lang="he" dir="rtl">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>PriceHunter - מציאת המחיר הטוב ביותר</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }
-        .container {
-            background: rgba(255,255,255,0.1);
-            padding: 50px;
-            border-radius: 20px;
-            text-align: center;
-            max-width: 600px;
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.2);
-        }
-        h1 {
-            font-size: 3rem;
-            margin-bottom: 20px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }
-        p {
-            font-size: 1.2rem;
-            margin-bottom: 30px;
-            opacity: 0.9;
-        }
-        .search-form {
-            margin: 30px 0;
-        }
-        input[type="text"] {
-            padding: 15px 20px;
-            font-size: 16px;
-            border: none;
-            border-radius: 25px;
-            width: 350px;
-            text-align: center;
-            margin-bottom: 20px;
-        }
-        button {
-            padding: 15px 30px;
-            font-size: 18px;
-            background: #28a745;
-            color: white;
-            border: none;
-            border-radius: 25px;
-            cursor: pointer;
-            transition: background 0.3s;
-        }
-        button:hover {
-            background: #218838;
-        }
-        .stores {
-            margin-top: 40px;
-            padding: 20px;
-            background: rgba(255,255,255,0.1);
-            border-radius: 15px;
-        }
-        .stores h3 {
-            margin-bottom: 15px;
-        }
-        .store-list {
-            display: flex;
-            justify-content: center;
-            gap: 20px;
-            flex-wrap: wrap;
-        }
-        .store-item {
-            background: rgba(255,255,255,0.2);
-            padding: 10px 15px;
-            border-radius: 10px;
-            font-weight: bold;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🔍 PriceHunter</h1>
-        <p>מוצא את המחיר הטוב ביותר בכל החנויות</p>
-        
-        <div class="search-form">
-            <form action="/search" method="get">
-                <input type="text" 
-                       name="q" 
-                       placeholder="מה אתה מחפש? (iPhone, MacBook, אוזניות...)" 
-                       required>
-                <br>
-                <button type="submit">🔍 חפש עכשיו</button>
-            </form>
-        </div>
-        
-        <div class="stores">
-            <h3>החנויות שאנחנו סורקים:</h3>
-            <div class="store-list">
-                <div class="store-item">KSP</div>
-                <div class="store-item">Bug</div>
-                <div class="store-item">זאפ</div>
-                <div class="store-item">Ivory</div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-    '''
+    return render_template('index.html')
 
-@app.route('/search')
+@main.route('/search')
 def search_page():
     """עמוד תוצאות חיפוש"""
+    price_finder = get_price_finder()
     query = request.args.get('q', '').strip()
     
     if not query:
         logger.warning("⚠️  בקשת חיפוש ללא טקסט")
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
     logger.info(f"🔍 חיפוש דף עבור: '{query}'")
     
     if not price_finder:
-        return '''
-        <!DOCTYPE html>
-        <html lang="he" dir="rtl">
-        <head>
-            <meta charset="UTF-8">
-            <title>שגיאה | PriceHunter</title>
-        </head>
-        <body style="font-family: Arial; text-align: center; padding: 50px; background: #f44336; color: white;">
-            <h1>❌ שגיאה</h1>
-            <p>מערכת החיפוש לא זמינה כרגע</p>
-            <a href="/" style="color: white;">חזור לעמוד הבית</a>
-        </body>
-        </html>
-        '''
+        return render_template('error.html',
+                               title="שגיאה",
+                               message="מערכת החיפוש לא זמינה כרגע"), 503
     
-    try:
-        # ביצוע החיפוש
-        logger.info(f"🚀 מתחיל חיפוש עבור: '{query}'")
-        results = price_finder.search_all_stores(query, max_results_per_store=5)
-        
-        # בניית HTML עם התוצאות
-        return build_results_html(query, results)
-        
-    except Exception as e:
-        logger.error(f"❌ שגיאה בחיפוש: {e}")
-        return f'''
-        <!DOCTYPE html>
-        <html lang="he" dir="rtl">
-        <head>
-            <meta charset="UTF-8">
-            <title>שגיאה בחיפוש | PriceHunter</title>
-        </head>
-        <body style="font-family: Arial; text-align: center; padding: 50px; background: #f44336; color: white;">
-            <h1>❌ שגיאה בחיפוש</h1>
-            <p>אירעה שגיאה בחיפוש עבור "{query}"</p>
-            <p>שגיאה: {str(e)}</p>
-            <a href="/" style="color: white;">חזור לעמוד הבית</a>
-        </body>
-        </html>
-        '''
+    def get_results():
+        """החיפוש עצמו - נקרא מתוך התבנית אחרי שתחילת הדף כבר נשלחה"""
+        try:
+            logger.info(f"🚀 מתחיל חיפוש עבור: '{query}'")
+            return price_finder.search_all_stores(query, max_results_per_store=5)
+        except CapacityExceeded as e:
+            logger.warning(f"🚦 אין מקום לסריקה עבור: '{query}'")
+            return {
+                'query': query,
+                'products': [],
+                'total_products': 0,
+                'search_time': 0,
+                'stores_searched': [],
+                'errors': [f'המערכת עמוסה כרגע - נסה שוב בעוד {e.retry_after} שניות']
+            }
+        except Exception as e:
+            logger.error(f"❌ שגיאה בחיפוש: {e}")
+            return {
+                'query': query,
+                'products': [],
+                'total_products': 0,
+                'search_time': 0,
+                'stores_searched': [],
+                'errors': [f'אירעה שגיאה בחיפוש עבור "{query}": {e}']
+            }
+    
+    # אם התוצאות כבר במטמון - אפשר לענות 304 בלי לחפש בכלל
+    cache_info = price_finder.peek_cached(query, max_results_per_store=5)
+    if cache_info:
+        etag, max_age = cache_validators(cache_info)
+        etag = variant_etag(etag, 'html')
+        if is_not_modified(etag):
+            return not_modified_response(etag, max_age)
+    else:
+        # אין רשומה בתוקף - הדף נבנה בזרימה ועלול להיות שגיאה, עומס או תוצאה ישנה
+        etag, max_age = None, 0
+    
+    response = render_streamed('results.html', query=query, get_results=get_results,
+                               details_top_k=Config.DETAILS_TOP_K)
+    return apply_cache_headers(response, etag, max_age)
 
-@app.route('/api/search', methods=['POST'])
+@main.route('/api/search', methods=['GET', 'POST'])
 def api_search():
-    """API לחיפוש מוצרים - עבור JavaScript"""
+    """API לחיפוש מוצרים - עבור JavaScript (GET ניתן לשמירה במטמון HTTP)"""
+    price_finder = get_price_finder()
     if not price_finder:
         return jsonify({
             'success': False,
@@ -240,7 +133,7 @@ def api_search():
     
     # קבלת הנתונים מהבקשה
     try:
-        data = request.get_json()
+        data = get_search_params()
         if not data:
             raise ValueError("חסר JSON בבקשה")
     except Exception as e:
@@ -259,22 +152,61 @@ def api_search():
     
     max_results = data.get('max_results', 5)
     specific_stores = data.get('stores', [])
+    rank_by = data.get('rank_by', Config.DEFAULT_RANK_KEY)
+    cursor = data.get('cursor')
+    page_size = data.get('page_size')
+    mode = data.get('mode', 'live')  # live / index
+    
+    if cursor or page_size is not None:
+        try:
+            page_size = validate_page(cursor, page_size)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+    
+    # בקשה מותנית על תוצאות שכבר במטמון - 304 בלי לגעת במנוע החיפוש
+    if mode != 'index' and not specific_stores:
+        cache_info = price_finder.peek_cached(query, max_results, rank_by)
+        if cache_info:
+            etag, max_age = cache_validators(cache_info)
+            etag = variant_etag(etag, cursor, page_size)
+            if is_not_modified(etag):
+                return not_modified_response(etag, max_age)
     
     try:
-        logger.info(f"🔍 API חיפוש עבור: '{query}'")
+        logger.info(f"🔍 API חיפוש עבור: '{query}' (mode={mode})")
         
         # ביצוע החיפוש
-        if specific_stores:
-            results = price_finder.search_specific_stores(query, specific_stores, max_results)
+        if mode == 'index':
+            results = price_finder.search_catalog(query, rank_by=rank_by)
+        elif specific_stores:
+            results = price_finder.search_specific_stores(query, specific_stores, max_results, rank_by)
         else:
-            results = price_finder.search_all_stores(query, max_results)
+            results = price_finder.search_all_stores(query, max_results, rank_by)
+        
+        # חיתוך לעמוד לפי cursor
+        if cursor or page_size:
+            page = paginate_products(results['products'], rank_by, cursor, page_size)
+            results['products'] = page['items']
+            results['next_cursor'] = page['next_cursor']
         
         # החזרת התוצאות
-        return jsonify({
+        etag, max_age = results_validators(results)
+        response = jsonify({
             'success': True,
             'data': results
         })
+        return apply_cache_headers(response, variant_etag(etag, cursor, page_size), max_age)
         
+    except CapacityExceeded as e:
+        return capacity_response(e)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"❌ שגיאה ב-API: {e}")
         return jsonify({
@@ -282,263 +214,136 @@ def api_search():
             'error': 'שגיאה בביצוע החיפוש'
         }), 500
 
-@app.route('/api/health')
+@main.route('/api/health')
 def health_check():
     """בדיקת תקינות המערכת"""
+    services = get_services()
+    price_finder = services.price_finder
+    job_manager = services.job_manager
     status = {
-        'status': 'healthy',
+        'status': 'draining' if services.draining else 'healthy',
         'timestamp': datetime.now().isoformat(),
         'version': '1.0.0',
         'price_finder_available': price_finder is not None,
-        'active_scrapers': len(price_finder.scrapers) if price_finder else 0
+        'active_scrapers': len(price_finder.scrapers) if price_finder else 0,
+        'search_jobs': job_manager.stats() if job_manager else None,
+        'admission': price_finder.admission.stats() if price_finder else None,
+        'scheduler': price_finder.scheduler.stats() if price_finder else None,
+        'config_version': get_runtime_config().version if price_finder else None
     }
     
-    return jsonify(status)
+    # בזמן כיבוי - 503 כדי שה-load balancer יפסיק לשלוח לכאן בקשות
+    return jsonify(status), 503 if services.draining else 200
 
 # ===== פונקציות עזר =====
 
-def build_results_html(query, results):
-    """בונה HTML עם תוצאות החיפוש"""
-    
-    # תחילת HTML
-    html = f'''
-<!DOCTYPE html>
-<html lang="he" dir="rtl">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>תוצאות עבור: {query} | PriceHunter</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            margin: 0;
-            padding: 20px;
-            min-height: 100vh;
-        }}
-        .container {{
-            max-width: 1000px;
-            margin: 0 auto;
-        }}
-        .header {{
-            text-align: center;
-            margin-bottom: 30px;
-        }}
-        .back-btn {{
-            display: inline-block;
-            background: rgba(255,255,255,0.2);
-            color: white;
-            padding: 12px 24px;
-            border-radius: 25px;
-            text-decoration: none;
-            margin-bottom: 20px;
-            transition: background 0.3s;
-        }}
-        .back-btn:hover {{
-            background: rgba(255,255,255,0.3);
-        }}
-        .search-info {{
-            background: rgba(255,255,255,0.1);
-            padding: 25px;
-            border-radius: 15px;
-            margin-bottom: 30px;
-            text-align: center;
-            backdrop-filter: blur(10px);
-        }}
-        .product-card {{
-            background: rgba(255,255,255,0.95);
-            color: #333;
-            margin: 20px 0;
-            padding: 25px;
-            border-radius: 15px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            transition: transform 0.3s;
-        }}
-        .product-card:hover {{
-            transform: translateY(-5px);
-        }}
-        .product-info {{
-            flex: 1;
-        }}
-        .product-name {{
-            font-size: 1.3em;
-            font-weight: bold;
-            margin-bottom: 8px;
-            color: #333;
-        }}
-        .store-info {{
-            color: #666;
-            margin-bottom: 5px;
-            font-size: 1.1em;
-        }}
-        .price {{
-            font-size: 2em;
-            font-weight: bold;
-            color: #e74c3c;
-            text-align: left;
-        }}
-        .best-deal {{
-            border: 3px solid #28a745;
-            position: relative;
-        }}
-        .best-deal::before {{
-            content: "🏆 המחיר הטוב ביותר";
-            position: absolute;
-            top: -15px;
-            right: 20px;
-            background: #28a745;
-            color: white;
-            padding: 5px 15px;
-            border-radius: 15px;
-            font-size: 0.9em;
-            font-weight: bold;
-        }}
-        .no-results {{
-            text-align: center;
-            padding: 60px 20px;
-            background: rgba(255,255,255,0.1);
-            border-radius: 15px;
-            backdrop-filter: blur(10px);
-        }}
-        .no-results h3 {{
-            font-size: 2em;
-            margin-bottom: 15px;
-        }}
-        .savings-info {{
-            background: rgba(40, 167, 69, 0.2);
-            border: 2px solid #28a745;
-            padding: 20px;
-            border-radius: 15px;
-            text-align: center;
-            margin: 20px 0;
-        }}
-        .error-info {{
-            background: rgba(220, 53, 69, 0.2);
-            border: 2px solid #dc3545;
-            padding: 15px;
-            border-radius: 10px;
-            margin: 10px 0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🔍 PriceHunter</h1>
-            <a href="/" class="back-btn">🏠 עמוד הבית</a>
-        </div>
-        
-        <div class="search-info">
-            <h2>תוצאות עבור: "{query}"</h2>
-            <p>נמצאו {results['total_products']} מוצרים ב-{results['search_time']} שניות</p>
-            <p>נבדקו החנויות: {', '.join(results['stores_searched'])}</p>
-        </div>
-    '''
-    
-    # אם יש שגיאות - הצג אותן
-    if results.get('errors'):
-        html += '<div class="error-info"><h4>⚠️ התרחשו בעיות:</h4><ul>'
-        for error in results['errors']:
-            html += f'<li>{error}</li>'
-        html += '</ul></div>'
-    
-    # הוספת התוצאות
-    if results['total_products'] == 0:
-        html += '''
-            <div class="no-results">
-                <h3>😔 לא נמצאו תוצאות</h3>
-                <p>נסה מילות חיפוש אחרות או פשוטות יותר</p>
-                <p><strong>טיפים לחיפוש טוב יותר:</strong></p>
-                <ul style="list-style: none; padding: 0;">
-                    <li>✓ נסה רק את שם המוצר: "iPhone" במקום "iPhone 15 Pro Max"</li>
-                    <li>✓ השתמש במילים באנגלית: "MacBook" במקום "מקבוק"</li>
-                    <li>✓ בדוק את הכתיב</li>
-                </ul>
-            </div>
-        '''
-    else:
-        # מציאת המחיר הטוב ביותר
-        best_price = min(p['price'] for p in results['products'])
-        
-        # הוספת כל מוצר
-        for product in results['products']:
-            is_best = (product['price'] == best_price)
-            
-            html += f'''
-                <div class="product-card {'best-deal' if is_best else ''}">
-                    <div class="product-info">
-                        <div class="product-name">{product['name']}</div>
-                        <div class="store-info">🏪 {product['store']} | 📦 {product.get('availability', 'זמין')}</div>
-                    </div>
-                    <div class="price">₪{product['price']:,.0f}</div>
-                </div>
-            '''
-        
-        # הוספת מידע על חיסכון
-        if results.get('best_deal') and results['best_deal'].get('savings'):
-            savings = results['best_deal']['savings']
-            savings_percent = results['best_deal'].get('savings_percent', 0)
-            html += f'''
-                <div class="savings-info">
-                    <h3>💰 חיסכון מעולה!</h3>
-                    <p>המחיר הטוב ביותר חוסך לך <strong>₪{savings:,.0f}</strong></p>
-                    <p>זה <strong>{savings_percent}%</strong> פחות מהחנות הכי יקרה!</p>
-                </div>
-            '''
-    
-    # סגירת HTML
-    html += '''
-        </div>
-    </body>
-    </html>
-    '''
+def get_search_params():
+    """פרמטרי חיפוש מ-JSON (POST) או מה-query string (GET)"""
+    if request.method == 'POST':
+        return request.get_json()
     
-    return html
+    args = request.args
+    return {
+        'query': args.get('q', args.get('query', '')),
+        'max_results': args.get('max_results', 5, type=int),
+        'stores': [s for s in args.get('stores', '').split(',') if s],
+        'rank_by': args.get('rank_by', Config.DEFAULT_RANK_KEY),
+        'cursor': args.get('cursor'),
+        'page_size': args.get('page_size', type=int),
+        'mode': args.get('mode', 'live')
+    }
+
+def render_streamed(template_name, **context):
+    """
+    רינדור תבנית בהזרמה - הדפדפן מקבל את ה-head וה-CSS מיד
+    ומתחיל לטעון אותם בזמן שהחיפוש עוד רץ
+    """
+    template = current_app.jinja_env.get_template(template_name)
+    current_app.update_template_context(context)
+    stream = template.stream(context)
+    stream.enable_buffering(5)
+    return Response(stream_with_context(stream), mimetype='text/html')
+
+@main.app_template_filter('price')
+def format_price(price):
+    """עיצוב מחיר בשקלים"""
+    if price is None:
+        return ''
+    return f"₪{price:,.0f}"
+
+@main.app_template_filter('availability_class')
+def availability_class(availability):
+    """מחלקת CSS לפי מצב המלאי"""
+    return {
+        'אזל מהמלאי': 'unavailable',
+        'הזמנה מראש': 'limited'
+    }.get(availability, 'available')
+
+def precompile_templates(app):
+    """קימפול כל התבניות מראש - נשמרות במטמון של Jinja ולא נקמפלות בבקשה הראשונה"""
+    for template_name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(template_name)
 
 # ===== טיפול בשגיאות =====
 
-@app.errorhandler(404)
+@main.app_errorhandler(404)
 def not_found(error):
     """עמוד לא נמצא"""
-    return '''
-    <!DOCTYPE html>
-    <html lang="he" dir="rtl">
-    <head><meta charset="UTF-8"><title>עמוד לא נמצא</title></head>
-    <body style="font-family: Arial; text-align: center; padding: 50px;">
-        <h1>🔍 עמוד לא נמצא</h1>
-        <p>הדף שחיפשת לא קיים</p>
-        <a href="/">חזור לעמוד הבית</a>
-    </body>
-    </html>
-    ''', 404
+    return render_template('error.html',
+                           title="עמוד לא נמצא",
+                           message="הדף שחיפשת לא קיים"), 404
 
-@app.errorhandler(500)
+@main.app_errorhandler(500)
 def internal_error(error):
     """שגיאת שרת"""
     logger.error(f"שגיאת שרת: {error}")
-    return '''
-    <!DOCTYPE html>
-    <html lang="he" dir="rtl">
-    <head><meta charset="UTF-8"><title>שגיאת שרת</title></head>
-    <body style="font-family: Arial; text-align: center; padding: 50px; background: #f44336; color: white;">
-        <h1>❌ שגיאת שרת</h1>
-        <p>אירעה שגיאה במערכת</p>
-        <a href="/" style="color: white;">חזור לעמוד הבית</a>
-    </body>
-    </html>
-    ''', 500
+    return render_template('error.html',
+                           title="שגיאת שרת",
+                           message="אירעה שגיאה במערכת"), 500
+
+# ===== יצירת האפליקציה =====
+
+def create_app(config=Config):
+    """
+    App factory - בונה אפליקציית Flask חדשה
+    
+    לא יוצר את PriceFinder - הוא נוצר בבקשה הראשונה, או מראש ב-warm_up()
+    של כל worker (ראו web/server.py)
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.config['JSON_AS_ASCII'] = False  # תמיכה בעברית ב-JSON
+    
+    if not app.config.get('SECRET_KEY'):
+        # בלי מפתח מהסביבה - מפתח אקראי (משותף ל-workers רק כשהאפליקציה נטענת לפני ה-fork)
+        logger.warning("⚠️  PRICEHUNTER_SECRET_KEY לא מוגדר - נוצר מפתח אקראי")
+        app.config['SECRET_KEY'] = secrets.token_hex(32)
+    
+    app.register_blueprint(main)
+    app.register_blueprint(api)
+    init_services(app)
+    
+    # דחיסת תגובות וקבצים סטטיים עם טביעת אצבע (python -m web.assets)
+    init_compression(app)
+    init_assets(app)
+    init_image_proxy(app)
+    
+    # הגבלת קצב חיפושים לכל לקוח
+    init_rate_limit(app)
+    
+    precompile_templates(app)
+    return app
 
-# ===== הפעלת השרת =====
+# ===== הפעלת השרת (פיתוח - לפרודקשן: python -m web.server) =====
 
 if __name__ == '__main__':
+    app = create_app()
+    price_finder = get_services(app).price_finder
     logger.info(f"""
 🚀 PriceHunter Web Server Starting...
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-🌐 אתר זמין על: http://127.0.0.1:5000
+🌐 אתר זמין על: http://{Config.FLASK_HOST}:{Config.FLASK_PORT}
 🔍 חנויות זמינות: {len(price_finder.scrapers) if price_finder else 0}
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -546,7 +351,7 @@ if __name__ == '__main__':
     """)
     
     try:
-        app.run(host='127.0.0.1', port=5000, debug=True)
+        app.run(host=Config.FLASK_HOST, port=Config.FLASK_PORT, debug=Config.FLASK_DEBUG)
     except KeyboardInterrupt:
         logger.info("👋 שרת נעצר")
     except Exception as e:
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+בניית קבצים סטטיים לפרודקשן: טביעת אצבע (hash) בשם הקובץ, דחיסה מראש
+(gzip / brotli) ו-manifest.json שהתבניות משתמשות בו דרך asset_url()
+
+הרצה בזמן build:
+    python -m web.assets
+"""
+
+import os
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import logging
+import mimetypes
+from typing import Dict
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+DIST_DIR = 'dist'
+FINGERPRINT_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.html')
+PRECOMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.html')
+# קבצים עם טביעת אצבע לא משתנים לעולם - אפשר לשמור שנה
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_FOLDERS = [
+    os.path.join(PROJECT_ROOT, 'static'),
+    os.path.join(PROJECT_ROOT, 'web', 'static')
+]
+
+
+def fingerprint(path: str) -> str:
+    """hash קצר של תוכן הקובץ"""
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()[:10]
+
+
+def precompress(path: str):
+    """יצירת path.gz ו-path.br לצד הקובץ"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9))
+
+    if brotli:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build_assets(static_folder: str) -> Dict[str, str]:
+    """
+    בניית תיקיית dist/ עם קבצים עם טביעת אצבע ודחוסים מראש
+
+    Returns:
+        ה-manifest: שם מקורי -> שם עם טביעת אצבע
+    """
+    dist_folder = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist_folder):
+        shutil.rmtree(dist_folder)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist_folder]
+
+        for filename in files:
+            if not filename.endswith(FINGERPRINT_EXTENSIONS) or filename == MANIFEST_NAME:
+                continue
+
+            source = os.path.join(root, filename)
+            relative = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            name, ext = os.path.splitext(relative)
+            hashed = f'{DIST_DIR}/{name}.{fingerprint(source)}{ext}'
+
+            target = os.path.join(static_folder, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            if ext in PRECOMPRESS_EXTENSIONS:
+                precompress(target)
+
+            manifest[relative] = hashed
+            logger.info(f"{relative} -> {hashed}")
+
+    with open(os.path.join(static_folder, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    return manifest
+
+
+def load_manifest(static_folder: str) -> Dict[str, str]:
+    """טעינת ה-manifest (אם לא הורץ build - מילון ריק, והקבצים המקוריים ישמשו)"""
+    try:
+        with open(os.path.join(static_folder, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_assets(app):
+    """
+    חיבור ה-manifest לאפליקציה:
+    - asset_url() בתבניות מחזיר את הקובץ עם טביעת האצבע
+    - קבצים סטטיים מוגשים בגרסה הדחוסה מראש אם הדפדפן תומך
+    - קבצים עם טביעת אצבע מקבלים Cache-Control של שנה
+    """
+    manifest = load_manifest(app.static_folder)
+    hashed_files = set(manifest.values())
+
+    @app.context_processor
+    def asset_helpers():
+        def asset_url(filename):
+            return url_for('static', filename=manifest.get(filename, filename))
+        return {'asset_url': asset_url}
+
+    def static_file(filename):
+        response = None
+        encodings = request.accept_encodings
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            compressed = os.path.join(app.static_folder, filename + suffix)
+            if encodings[encoding] and os.path.isfile(compressed):
+                response = send_from_directory(app.static_folder, filename + suffix)
+                response.headers['Content-Encoding'] = encoding
+                response.content_type = _guess_type(filename)
+                break
+
+        if response is None:
+            response = send_from_directory(app.static_folder, filename)
+
+        response.vary.add('Accept-Encoding')
+        if filename in hashed_files:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = static_file
+    logger.info(f"Loaded asset manifest with {len(manifest)} files")
+
+
+def _guess_type(filename: str) -> str:
+    """סוג התוכן של הקובץ המקורי (לא של ה-.gz / .br)"""
+    mimetype, _ = mimetypes.guess_type(filename)
+    if mimetype and mimetype.startswith('text/'):
+        return f'{mimetype}; charset=utf-8'
+    return mimetype or 'application/octet-stream'
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    for folder in sys.argv[1:] or STATIC_FOLDERS:
+        built = build_assets(folder)
+        print(f"✅ {folder}: {len(built)} קבצים")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+דחיסת תגובות דינמיות (brotli / gzip) לפי Accept-Encoding של הדפדפן
+כולל תגובות בהזרמה - כל חלק נדחס ונשלח מיד, בלי לחכות לסוף הדף
+"""
+
+import gzip
+import zlib
+import logging
+
+from flask import request
+
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    # brotli לא מותקן - נשתמש רק ב-gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson'
+}
+
+
+def choose_encoding(accept_encodings) -> str:
+    """בחירת הקידוד הטוב ביותר שהדפדפן תומך בו"""
+    if brotli and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    """דחיסת גוף תגובה שלם"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.GZIP_LEVEL)
+
+
+def compress_stream(chunks, encoding: str):
+    """דחיסה של תגובה בהזרמה - flush אחרי כל חלק כדי שהדפדפן יקבל אותו מיד"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=Config.BROTLI_QUALITY)
+        for chunk in chunks:
+            data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+            yield compressor.process(data) + compressor.flush()
+        yield compressor.finish()
+    else:
+        # wbits=31 = פורמט gzip
+        compressor = zlib.compressobj(Config.GZIP_LEVEL, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+            yield compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+def compress_response(response):
+    """after_request - דחיסת התגובה אם הדפדפן תומך ואם זה משתלם"""
+    response.vary.add('Accept-Encoding')
+
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    encoding = choose_encoding(request.accept_encodings)
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < Config.COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(compress_body(data, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+
+    # אותו תוכן בקידוד אחר - ה-ETag הופך לחלש (RFC 9110)
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+
+    return response
+
+
+def init_compression(app):
+    """הפעלת דחיסה על אפליקציית Flask"""
+    if Config.ENABLE_COMPRESSION:
+        app.after_request(compress_response)
+        logger.info(f"Response compression enabled (brotli={'yes' if brotli else 'no'})")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+כותרות מטמון HTTP (ETag / Cache-Control) לתגובות החיפוש
+משותף לשתי אפליקציות ה-Flask, כדי שדפדפן, proxy או CDN יוכלו לשמור תוצאות
+"""
+
+from typing import Dict, Optional, Tuple
+from flask import request, make_response
+
+from core.result_cache import compute_etag
+
+
+def variant_etag(base_etag: str, *parts) -> str:
+    """ETag לגרסה מסוימת של אותן תוצאות (עמוד, פורמט וכו')"""
+    if not any(parts):
+        return base_etag
+    return compute_etag([base_etag] + [str(part) for part in parts])
+
+
+def cache_validators(cache_info: Dict) -> Tuple[str, int]:
+    """ETag ו-max-age מתוך פרטי רשומת המטמון"""
+    return cache_info['etag'], cache_info['expires_in']
+
+
+def results_validators(results: Dict) -> Tuple[str, int]:
+    """ETag ו-max-age לתוצאות חיפוש לפי רעננות הרשומה במטמון"""
+    if results.get('cache'):
+        return cache_validators(results['cache'])
+    # תוצאות שלא עברו במטמון (למשל מהקטלוג) - ETag לפי תוכן, בלי שמירה
+    return compute_etag({k: v for k, v in results.items() if k != 'search_time'}), 0
+
+
+def is_not_modified(etag: str) -> bool:
+    """האם הבקשה המותנית (If-None-Match) תואמת את ה-ETag הנוכחי"""
+    # השוואה חלשה - תגובה דחוסה מחזירה את ה-ETag כ-W/"..."
+    return request.method in ('GET', 'HEAD') and request.if_none_match.contains_weak(etag)
+
+
+def apply_cache_headers(response, etag: Optional[str], max_age: int, public: bool = True):
+    """הוספת ETag ו-Cache-Control לתגובה"""
+    if etag:
+        response.set_etag(etag)
+    if request.method not in ('GET', 'HEAD'):
+        response.headers['Cache-Control'] = 'no-store'
+    elif max_age > 0:
+        scope = 'public' if public else 'private'
+        response.headers['Cache-Control'] = f'{scope}, max-age={max_age}'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def not_modified_response(etag: str, max_age: int):
+    """תגובת 304 עם אותן כותרות מטמון"""
+    response = make_response('', 304)
+    return apply_cache_headers(response, etag, max_age)
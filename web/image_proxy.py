@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+פרוקסי תמונות - תמונות המוצרים מוגשות מהשרת שלנו כתמונות ממוזערות WebP
+קטנות, במקום קישור ישיר לתמונה המלאה באתר החנות (hotlinking)
+
+- /img?url=...&size=... מוריד את התמונה, מקטין ומקודד ל-WebP
+- מטמון על הדיסק (THUMBNAIL_DIR) לפי hash של הקישור והגודל, מוגבל בגודל
+  (THUMBNAIL_CACHE_MB) - הקבצים שלא נקראו הכי הרבה זמן נמחקים ראשונים
+- הכתובת של תמונה ממוזערת לא משתנה - התשובה נשמרת בדפדפן לזמן ארוך
+- רק תמונות מהחנויות המוגדרות (לא פרוקסי פתוח לכל האינטרנט)
+- Pillow אופציונלי - בלעדיו הכתובת מפנה לתמונה המקורית
+"""
+
+import io
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from flask import abort, current_app, redirect, request, send_file, url_for
+
+from config import Config
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow לא מותקן - בלי הקטנה, הפניה לתמונה המקורית
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+MAX_REDIRECTS = 3
+
+
+def _host(url: str) -> str:
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_allowed_image_url(url: str) -> bool:
+    """תמונה מאתר של אחת החנויות (או מתת-דומיין שלו / THUMBNAIL_EXTRA_HOSTS)"""
+    if urlparse(url).scheme not in ('http', 'https'):
+        return False
+    host = _host(url)
+    if not host:
+        return False
+    allowed = {_host(store['base_url']) for store in Config.ACTIVE_STORES.values()}
+    allowed.update(extra.lower() for extra in Config.THUMBNAIL_EXTRA_HOSTS)
+    return any(host == domain or host.endswith('.' + domain) for domain in allowed)
+
+
+def absolute_image_url(image_url: str, store: Optional[str] = None) -> str:
+    """קישור מלא לתמונה - קישורים יחסיים לפי כתובת החנות (לפי המפתח או שם התצוגה)"""
+    if urlparse(image_url).scheme or not store:
+        return image_url
+    for key, store_config in Config.ACTIVE_STORES.items():
+        if store in (key, store_config['name']):
+            return urljoin(store_config['base_url'], image_url)
+    return image_url
+
+
+class ThumbnailCache:
+    """
+    מטמון LRU על הדיסק - קובץ לכל (קישור, גודל). סדר השימוש נשמר בזיכרון,
+    ובזמן שינוי הקובץ (mtime) כדי שיישמר גם אחרי הפעלה מחדש. כמה workers
+    יכולים לחלוק את התיקייה - קובץ שנמחק על ידי worker אחר פשוט נוצר שוב
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or Config.THUMBNAIL_DIR
+        self.max_bytes = max_bytes or Config.THUMBNAIL_CACHE_MB * 1024 * 1024
+        self._files: 'OrderedDict[str, int]' = OrderedDict()  # שם קובץ -> גודל, מהישן לחדש
+        self._total = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """הקבצים שכבר בתיקייה, לפי זמן השימוש האחרון"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.webp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total += size
+
+    @staticmethod
+    def key(url: str, size: int) -> str:
+        return hashlib.sha1(f'{size}:{url}'.encode('utf-8')).hexdigest() + '.webp'
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get(self, name: str) -> Optional[str]:
+        """הנתיב לקובץ אם הוא במטמון (ומסמן אותו כמשומש)"""
+        path = self.path(name)
+        try:
+            os.utime(path)
+            size = os.path.getsize(path)
+        except OSError:
+            with self._lock:
+                self._total -= self._files.pop(name, 0)
+            return None
+
+        with self._lock:
+            if name not in self._files:  # נוצר על ידי worker אחר
+                self._files[name] = size
+                self._total += size
+            self._files.move_to_end(name)
+        return path
+
+    def put(self, name: str, data: bytes) -> str:
+        """שמירת קובץ חדש ופינוי הישנים עד שהמטמון חוזר לגבול שלו"""
+        path = self.path(name)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        evicted = []
+        with self._lock:
+            self._total += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old_name, old_size = self._files.popitem(last=False)
+                self._total -= old_size
+                evicted.append(old_name)
+
+        for old_name in evicted:
+            try:
+                os.remove(self.path(old_name))
+            except OSError:
+                pass
+        return path
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'files': len(self._files), 'bytes': self._total, 'max_bytes': self.max_bytes}
+
+
+def fetch_image(url: str) -> Optional[bytes]:
+    """
+    הורדת התמונה המקורית - רק מהחנויות (גם אחרי הפניות), ועד
+    THUMBNAIL_MAX_SOURCE_MB כדי שתמונה ענקית לא תמלא את הזיכרון
+    """
+    max_bytes = Config.THUMBNAIL_MAX_SOURCE_MB * 1024 * 1024
+    headers = {'User-Agent': Config.USER_AGENTS[0], 'Accept': 'image/*'}
+    for _ in range(MAX_REDIRECTS + 1):
+        if not is_allowed_image_url(url):
+            logger.warning(f"Refusing to proxy image from {url}")
+            return None
+        try:
+            with requests.get(url, headers=headers, timeout=Config.REQUEST_TIMEOUT,
+                              stream=True, allow_redirects=False) as response:
+                if response.is_redirect:
+                    url = urljoin(url, response.headers['Location'])
+                    continue
+                if response.status_code != 200:
+                    logger.warning(f"HTTP {response.status_code} for image {url}")
+                    return None
+                if not response.headers.get('Content-Type', '').startswith('image/'):
+                    return None
+
+                data = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    data.extend(chunk)
+                    if len(data) > max_bytes:
+                        logger.warning(f"Image too large to proxy: {url}")
+                        return None
+                return bytes(data)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Image download failed for {url}: {e}")
+            return None
+    return None
+
+
+def make_thumbnail(data: bytes, size: int) -> Optional[bytes]:
+    """הקטנה (הצלע הארוכה = size, בלי הגדלה) וקידוד ל-WebP"""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft('RGB', (size, size))  # JPEG - פענוח מוקטן מראש, הרבה יותר מהיר
+            image.thumbnail((size, size))
+            if image.mode not in ('RGB', 'RGBA'):
+                transparent = 'transparency' in image.info or image.mode in ('LA', 'PA')
+                image = image.convert('RGBA' if transparent else 'RGB')
+            output = io.BytesIO()
+            image.save(output, 'WEBP', quality=Config.THUMBNAIL_QUALITY, method=4)
+            return output.getvalue()
+    except Exception as e:
+        logger.warning(f"Failed to create thumbnail: {e}")
+        return None
+
+
+def thumbnail_url(image_url: Optional[str], store: Optional[str] = None, size: Optional[int] = None) -> str:
+    """
+    כתובת התמונה הממוזערת (בתבניות ובתשובות API) - או הקישור המקורי כשהפרוקסי
+    כבוי או שהתמונה לא מאחת החנויות
+    """
+    if not image_url:
+        return ''
+    image_url = absolute_image_url(image_url, store)
+    if current_app.extensions.get('thumbnail_cache') is None or not is_allowed_image_url(image_url):
+        return image_url
+    return url_for('image_proxy', url=image_url, size=size or Config.THUMBNAIL_SIZE)
+
+
+def init_image_proxy(app):
+    """
+    חיבור הפרוקסי לאפליקציה:
+    - /img?url=...&size=... - התמונה הממוזערת
+    - thumbnail_url(image_url, store) בתבניות
+    """
+    cache = ThumbnailCache() if Config.ENABLE_IMAGE_PROXY else None
+    if cache and Image is None:
+        logger.warning("Pillow is not installed - image proxy will redirect to original images")
+
+    @app.context_processor
+    def image_helpers():
+        return {'thumbnail_url': thumbnail_url}
+
+    def image_proxy():
+        if cache is None:
+            abort(404)
+
+        url = request.args.get('url', '').strip()
+        size = request.args.get('size', Config.THUMBNAIL_SIZE, type=int)
+        if not url or size not in Config.THUMBNAIL_SIZES or not is_allowed_image_url(url):
+            abort(400)
+        if Image is None:
+            return redirect(url)
+
+        name = ThumbnailCache.key(url, size)
+        path = cache.get(name)
+        if path is None:
+            data = fetch_image(url)
+            thumbnail = make_thumbnail(data, size) if data else None
+            if thumbnail is None:
+                # בלי שמירה בדיסק - אולי התמונה תחזור, אבל הדפדפן לא ינסה שוב מיד
+                response = app.response_class(status=404)
+                response.cache_control.public = True
+                response.cache_control.max_age = 300
+                return response
+            path = cache.put(name, thumbnail)
+
+        response = send_file(path, mimetype='image/webp', conditional=True, etag=name[:-5])
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = Config.THUMBNAIL_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+    app.add_url_rule('/img', 'image_proxy', image_proxy)
+    app.extensions['thumbnail_cache'] = cache
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+שרת פרודקשן - gunicorn עם כמה workers מחוממים מראש
+
+    python -m web.server                 # לפי SERVER_BIND / SERVER_WORKERS
+    python -m web.server --workers 4 --bind 0.0.0.0:8080
+
+איך זה עובד:
+1. האפליקציה (והמודולים הכבדים - Flask, selenium, ...) נטענת פעם אחת בתהליך
+   הראשי, לפני ה-fork, כך ש-worker חדש עולה מהר ומשתף את הזיכרון
+2. כל worker בונה PriceFinder משלו אחרי ה-fork ומחמם אותו (דפדפנים, קטלוג)
+   לפני שהוא מתחיל לקבל בקשות - אין "בקשה ראשונה איטית"
+3. כיבוי worker מחכה לסריקות שרצות וכותב סטטיסטיקות והיסטוריה לפני יציאה
+
+פריסה בלי השבתה:
+- kill -HUP <master>   ← workers חדשים (מחוממים) עולים, הישנים מסיימים בקשות ויוצאים
+- kill -USR2 <master>  ← עדכון קוד: master חדש עם הקוד החדש, ואז kill -TERM לישן
+- kill -TERM <master>  ← כיבוי מסודר (עד SERVER_GRACEFUL_TIMEOUT שניות)
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+# הוספת נתיב הפרויקט
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from web.app import create_app
+from web.services import get_services
+
+logger = logging.getLogger(__name__)
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    # gunicorn לא מותקן (למשל ב-Windows) - אפשר רק שרת הפיתוח
+    BaseApplication = None
+
+
+def post_fork(server, worker):
+    """בכל worker אחרי ה-fork - יצירת השירותים וחימום לפני קבלת בקשות"""
+    get_services(server.app.application).warm_up()
+
+
+def worker_exit(server, worker):
+    """worker יוצא (כיבוי / HUP / max_requests) - סיום מסודר של הסריקות"""
+    get_services(server.app.application).drain(Config.SERVER_GRACEFUL_TIMEOUT)
+
+
+def on_reload(server):
+    logger.info("🔄 טעינה מחדש - workers חדשים יעלו מחוממים לפני שהישנים ייסגרו")
+
+
+if BaseApplication is not None:
+    class PriceHunterServer(BaseApplication):
+        """gunicorn עם האפליקציה שלנו - בלי קובץ הגדרות חיצוני"""
+
+        def __init__(self, application, options=None):
+            self.application = application
+            self.options = options or {}
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+
+def server_options(args) -> dict:
+    """הגדרות gunicorn"""
+    return {
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': 'gthread',
+        'threads': args.threads,  # long-poll של עבודות חיפוש מחזיק thread
+        'preload_app': True,  # טעינה אחת לפני fork
+        'timeout': Config.SERVER_TIMEOUT,
+        'graceful_timeout': Config.SERVER_GRACEFUL_TIMEOUT,
+        'max_requests': Config.SERVER_MAX_REQUESTS,
+        'max_requests_jitter': Config.SERVER_MAX_REQUESTS // 10,  # שלא כל ה-workers יתחלפו יחד
+        'accesslog': '-',
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+        'on_reload': on_reload
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PriceHunter production server')
+    parser.add_argument('--bind', default=Config.SERVER_BIND)
+    parser.add_argument('--workers', type=int, default=Config.SERVER_WORKERS)
+    parser.add_argument('--threads', type=int, default=Config.SERVER_THREADS)
+    args = parser.parse_args()
+
+    if BaseApplication is None:
+        print("❌ gunicorn לא מותקן - pip install gunicorn")
+        print("💡 לפיתוח: python web/app.py")
+        sys.exit(1)
+
+    logger.info(f"🚀 PriceHunter: {args.workers} workers × {args.threads} threads על {args.bind}")
+    PriceHunterServer(create_app(), server_options(args)).run()
+
+
+if __name__ == '__main__':
+    main()
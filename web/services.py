@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+השירותים של האפליקציה (PriceFinder ומנהל עבודות החיפוש) - נוצרים בעצלות,
+אף פעם לא בזמן import. בשרת עם כמה workers הם נוצרים ומחוממים בכל worker
+אחרי ה-fork (ראו web/server.py), ולא בתהליך הראשי
+"""
+
+import time
+import logging
+import threading
+
+from flask import current_app
+
+from config import Config
+from core.price_finder import PriceFinder
+from core.search_jobs import SearchJobManager
+from core.runtime_config import get_runtime_config
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_NAME = 'pricehunter'
+
+
+class Services:
+    """מחזיק את מנוע החיפוש ומנהל העבודות של תהליך אחד"""
+
+    def __init__(self):
+        self._price_finder = None
+        self._job_manager = None
+        self._failed = False
+        self._lock = threading.Lock()
+        self.draining = False
+
+    @property
+    def price_finder(self):
+        """PriceFinder - נוצר בשימוש הראשון (None אם האתחול נכשל)"""
+        if self._price_finder is None and not self._failed:
+            with self._lock:
+                if self._price_finder is None and not self._failed:
+                    logger.info("🔍 מאתחל את PriceFinder...")
+                    try:
+                        self._price_finder = PriceFinder()
+                        # מעקב אחרי קובץ ההגדרות והסריקה המוקדמת - בכל worker בנפרד (אחרי ה-fork)
+                        get_runtime_config().start_watching()
+                        if self._price_finder.prescraper:
+                            self._price_finder.prescraper.start()
+                        logger.info(f"✅ PriceFinder מוכן עם {len(self._price_finder.scrapers)} חנויות")
+                    except Exception as e:
+                        logger.error(f"❌ כשלון באתחול PriceFinder: {e}")
+                        self._failed = True
+        return self._price_finder
+
+    @property
+    def job_manager(self):
+        """מנהל עבודות החיפוש - הסריקות רצות במאגר threads נפרד"""
+        if self._job_manager is None and self.price_finder:
+            with self._lock:
+                if self._job_manager is None:
+                    self._job_manager = SearchJobManager(self._price_finder)
+        return self._job_manager
+
+    def warm_up(self):
+        """חימום ה-worker לפני שהוא מקבל בקשות"""
+        start_time = time.time()
+        if self.price_finder:
+            self.price_finder.warm_up()
+            _ = self.job_manager
+        logger.info(f"🔥 worker מוכן תוך {time.time() - start_time:.2f} שניות")
+
+    def drain(self, timeout: float = None):
+        """
+        כיבוי מסודר - הפסקת קבלת חיפושים, המתנה לסריקות שרצות, כתיבת
+        הנתונים שבזיכרון וסגירת הדפדפנים
+        """
+        timeout = Config.SERVER_GRACEFUL_TIMEOUT if timeout is None else timeout
+        self.draining = True
+        deadline = time.time() + timeout
+
+        if self._job_manager and not self._job_manager.drain(timeout):
+            logger.warning("⚠️  עבודות חיפוש לא הסתיימו בזמן הכיבוי")
+
+        if self._price_finder:
+            admission = self._price_finder.admission
+            while admission.active and time.time() < deadline:
+                time.sleep(0.1)
+            self._price_finder.close()
+            get_runtime_config().stop_watching()
+
+        logger.info("👋 worker כובה בצורה מסודרת")
+
+
+def init_services(app) -> Services:
+    """רישום השירותים על האפליקציה"""
+    services = Services()
+    app.extensions[EXTENSION_NAME] = services
+    return services
+
+
+def get_services(app=None) -> Services:
+    """השירותים של האפליקציה הנוכחית"""
+    return (app or current_app).extensions[EXTENSION_NAME]
+
+
+def get_price_finder():
+    return get_services().price_finder
+
+
+def get_job_manager():
+    return get_services().job_manager
@@ -5,10 +5,16 @@
 
 // Global variables
 let searchInProgress = false;
+let currentJobUrl = null;
+let currentCancelUrl = null;
+
+const JOB_POLL_WAIT = 20;  // שניות ל-long-poll
+const JOB_FINISHED_STATES = ['done', 'failed', 'cancelled'];
 
 // Initialize when page loads
 document.addEventListener('DOMContentLoaded', function() {
     initializePriceHunter();
+    loadProductDetails();
 });
 
 /**
@@ -49,10 +55,237 @@ function handleSearchSubmit(e) {
         return;
     }
     
-    // Redirect to search page
-    window.location.href = `/search?q=${encodeURIComponent(query)}`;
+    startSearch(query);
+}
+
+/**
+ * התחלת חיפוש - בעמוד עם אזור תוצאות חי דרך עבודת חיפוש, אחרת מעבר לעמוד התוצאות
+ */
+function startSearch(query) {
+    const container = document.getElementById('liveResults');
+    if (container && window.fetch) {
+        runSearchJob(query, container);
+    } else {
+        window.location.href = `/search?q=${encodeURIComponent(query)}`;
+    }
+}
+
+/**
+ * חיפוש אסינכרוני - שליחת עבודה ו-long-poll עד שהיא מסתיימת
+ * התוצאות מוצגות כל פעם שחנות מסיימת
+ */
+async function runSearchJob(query, container) {
+    if (searchInProgress) {
+        return;
+    }
+    searchInProgress = true;
+    setSearchButtonLoading(true);
+    
+    try {
+        const submitResponse = await fetch('/api/jobs', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ query: query })
+        });
+        if (submitResponse.status === 429 || submitResponse.status === 503) {
+            // עומס - לא עוברים לעמוד התוצאות, רק מבקשים לנסות שוב
+            const retryAfter = submitResponse.headers.get('Retry-After') || 5;
+            showMessage(`המערכת עמוסה - נסה שוב בעוד ${retryAfter} שניות`, 'warning', 5000);
+            return;
+        }
+        if (!submitResponse.ok) {
+            throw new Error(`submit failed: ${submitResponse.status}`);
+        }
+        
+        const submitted = await submitResponse.json();
+        currentJobUrl = submitted.poll_url;
+        currentCancelUrl = submitted.cancel_url;
+        renderJob(container, { query: query, status: 'queued', stores_done: [], partial_products: [] });
+        
+        let version = -1;
+        while (true) {
+            const pollResponse = await fetch(`${currentJobUrl}?wait=${JOB_POLL_WAIT}&since=${version}`);
+            if (!pollResponse.ok) {
+                throw new Error(`poll failed: ${pollResponse.status}`);
+            }
+            
+            const job = (await pollResponse.json()).job;
+            version = job.version;
+            renderJob(container, job);
+            
+            if (JOB_FINISHED_STATES.includes(job.status)) {
+                if (job.status === 'failed') {
+                    showMessage(job.retry_after
+                        ? `המערכת עמוסה - נסה שוב בעוד ${job.retry_after} שניות`
+                        : 'אירעה שגיאה בחיפוש', 'error', 5000);
+                }
+                break;
+            }
+        }
+    } catch (error) {
+        // ה-API לא זמין - חוזרים לעמוד התוצאות הרגיל
+        console.log('Search job failed, falling back to results page:', error);
+        window.location.href = `/search?q=${encodeURIComponent(query)}`;
+    } finally {
+        currentJobUrl = null;
+        currentCancelUrl = null;
+        searchInProgress = false;
+        setSearchButtonLoading(false);
+    }
+}
+
+/**
+ * הצגת מצב העבודה - תוצאות חלקיות בזמן הריצה, תוצאות מדורגות בסוף
+ */
+function renderJob(container, job) {
+    const finished = job.status === 'done';
+    const results = job.results || {};
+    const products = finished ? results.products : job.partial_products;
+    const storesInfo = job.stores_total
+        ? `${job.stores_done.length}/${job.stores_total} חנויות`
+        : '';
+    
+    const info = finished
+        ? `נמצאו ${results.total_products} מוצרים ב-${results.search_time} שניות`
+        : `מחפש... ${storesInfo}`;
+    
+    const bestPrice = finished && results.best_deal ? results.best_deal.price : null;
+    
+    container.hidden = false;
+    container.innerHTML = `
+        <section class="results-header">
+            <h2 class="results-title">תוצאות עבור: "${escapeHtml(job.query)}"</h2>
+            <p class="results-info">${info}</p>
+        </section>
+        <section class="results-grid">
+            ${(products || []).map(product => renderProduct(product, product.price === bestPrice)).join('')}
+        </section>
+    `;
 }
 
+function renderProduct(product, isBest) {
+    const link = product.url
+        ? `<a href="${escapeHtml(product.url)}" class="btn btn-primary btn-block" target="_blank" rel="noopener">🛒 לרכישה ב-${escapeHtml(product.store)}</a>`
+        : '';
+    
+    return `
+        <div class="product-card${isBest ? ' best-deal' : ''}">
+            ${isBest ? '<div class="best-deal-badge">🏆 המחיר הטוב ביותר</div>' : ''}
+            <div class="product-header">
+                <div class="product-info">
+                    <div class="product-name">${escapeHtml(product.name)}</div>
+                    <div class="store-info">
+                        <div class="store-logo">${escapeHtml(product.store_logo || '')}</div>
+                        <span class="store-name">${escapeHtml(product.store)}</span>
+                        <span class="availability ${availabilityClass(product.availability)}">${escapeHtml(product.availability || 'זמין')}</span>
+                    </div>
+                </div>
+                <div class="price-section">
+                    <div class="current-price">${product.price != null ? formatPrice(product.price) : ''}</div>
+                </div>
+            </div>
+            ${link}
+        </div>
+    `;
+}
+
+/**
+ * פרטים מעמודי המוצרים (תמונה, מלאי, מותג) לכרטיסים המסומנים ב-data-details-url.
+ * נטען אחרי שהרשימה כבר מוצגת - כל כרטיס מתעדכן כשהשורה שלו מגיעה בזרם
+ */
+async function loadProductDetails() {
+    const cards = document.querySelectorAll('.product-card[data-details-url]');
+    if (!cards.length) {
+        return;
+    }
+    
+    const cardsByUrl = new Map();
+    cards.forEach(card => cardsByUrl.set(card.dataset.detailsUrl, card));
+    
+    try {
+        const response = await fetch('/api/products/details', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ urls: [...cardsByUrl.keys()] })
+        });
+        if (!response.ok || !response.body) {
+            return;
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => {
+                const item = JSON.parse(line);
+                const card = cardsByUrl.get(item.url);
+                if (card && item.details) {
+                    applyProductDetails(card, item.details, item.thumbnail_url);
+                }
+            });
+        }
+    } catch (error) {
+        // הפרטים הם תוספת - הדף עובד גם בלעדיהם
+        console.warn('Product details unavailable:', error);
+    }
+}
+
+function applyProductDetails(card, details, thumbnailUrl) {
+    if (details.image_url && !card.querySelector('.product-image')) {
+        const image = document.createElement('img');
+        image.className = 'product-image';
+        image.src = thumbnailUrl || details.image_url;
+        image.alt = '';
+        image.loading = 'lazy';
+        card.querySelector('.product-header').prepend(image);
+    }
+    
+    if (details.brand && !card.querySelector('.product-brand')) {
+        const brand = document.createElement('div');
+        brand.className = 'product-brand';
+        brand.textContent = details.brand;
+        card.querySelector('.product-name').after(brand);
+    }
+    
+    const availability = card.querySelector('.availability');
+    if (details.availability && availability) {
+        availability.textContent = details.availability;
+        availability.className = `availability ${availabilityClass(details.availability)}`;
+    }
+}
+
+function availabilityClass(availability) {
+    return { 'אזל מהמלאי': 'unavailable', 'הזמנה מראש': 'limited' }[availability] || 'available';
+}
+
+function setSearchButtonLoading(loading) {
+    const button = document.getElementById('searchButton');
+    if (button) {
+        button.disabled = loading;
+    }
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text == null ? '' : String(text);
+    return div.innerHTML;
+}
+
+// ניתוק מעבודת החיפוש כשעוזבים את הדף - כדי שלא תחכה ל-TTL
+// (רק המנוי שלנו - לקוחות אחרים עם אותו חיפוש ממשיכים לקבל תוצאות)
+window.addEventListener('pagehide', function() {
+    if (currentCancelUrl) {
+        fetch(currentCancelUrl, { method: 'DELETE', keepalive: true });
+    }
+});
+
 /**
  * הגדרת תגיות חיפוש מהיר
  */
@@ -68,8 +301,7 @@ function setupQuickSearchTags() {
                 searchInput.value = query;
             }
             
-            // Navigate to search
-            window.location.href = `/search?q=${encodeURIComponent(query)}`;
+            startSearch(query);
         });
     });
 }
@@ -207,7 +439,7 @@ window.quickSearch = function(query) {
     if (searchInput) {
         searchInput.value = query;
     }
-    window.location.href = `/search?q=${encodeURIComponent(query)}`;
+    startSearch(query);
 };
 
 window.shareProduct = function(name, price, store) {
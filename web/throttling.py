@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+הגבלת קצב לכל לקוח ותגובות עומס (429 / 503 עם Retry-After)
+משותף לשתי אפליקציות ה-Flask
+"""
+
+import logging
+from typing import Optional
+
+from flask import request, jsonify, make_response, render_template
+
+from config import Config
+from core.admission import RateLimiter
+from core.runtime_config import subscribe
+
+logger = logging.getLogger(__name__)
+
+# נקודות קצה שמפעילות סריקה - רק הן נספרות (polling של עבודה קיימת לא)
+RATE_LIMITED_ENDPOINTS = {'search', 'search_page', 'api_search', 'api_batch_search', 'api_submit_job',
+                          'api_product_details', 'api_export'}
+
+
+def client_id() -> str:
+    """זיהוי הלקוח - כתובת IP (או X-Forwarded-For מאחורי proxy מהימן)"""
+    if Config.TRUST_PROXY_HEADERS and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or 'unknown'
+
+
+def bearer_token() -> Optional[str]:
+    """הטוקן מכותרת Authorization: Bearer (לייצוא ולרשימות המעקב)"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer':
+        return None
+    return token.strip() or None
+
+
+def retry_response(message: str, status: int, retry_after: int):
+    """תגובה עם Retry-After - JSON ל-API, עמוד שגיאה לדפים"""
+    if request.path.startswith('/api/'):
+        response = jsonify({
+            'success': False,
+            'error': message,
+            'retry_after': retry_after
+        })
+    else:
+        response = make_response(render_template('error.html', title='נסה שוב בעוד רגע', message=message))
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def capacity_response(error):
+    """503 כשאין מקום לסריקה (CapacityExceeded)"""
+    return retry_response('המערכת עמוסה כרגע, נסה שוב בעוד מספר שניות', 503, error.retry_after)
+
+
+def init_rate_limit(app, endpoints=RATE_LIMITED_ENDPOINTS):
+    """הפעלת הגבלת קצב על נקודות הקצה של החיפוש"""
+    if not Config.ENABLE_RATE_LIMIT:
+        return None
+
+    limiter = RateLimiter()
+
+    def apply_runtime_config(changes):
+        if {'RATE_LIMIT_PER_MINUTE', 'RATE_LIMIT_BURST'} & set(changes):
+            limiter.configure(Config.RATE_LIMIT_PER_MINUTE, Config.RATE_LIMIT_BURST)
+
+    subscribe(apply_runtime_config)
+
+    @app.before_request
+    def check_rate_limit():
+        # שם נקודת הקצה בלי ה-blueprint (main.search_page -> search_page)
+        endpoint = (request.endpoint or '').rpartition('.')[2]
+        if endpoint not in endpoints or request.method in ('HEAD', 'OPTIONS'):
+            return None
+
+        client = client_id()
+        allowed, retry_after = limiter.allow(client)
+        if allowed:
+            return None
+
+        logger.warning(f"Rate limit exceeded for {client} on {request.endpoint}")
+        return retry_response('יותר מדי חיפושים, נסה שוב בעוד מספר שניות', 429, retry_after)
+
+    return limiter